@@ -1,26 +1,95 @@
 # ganti nama file nya dengan app.py kalau ingin berjalan normal untuk file backup ini
 
 import flask
-from flask import Flask, request, jsonify, render_template
-from bs4 import BeautifulSoup
+from flask import Blueprint, Flask, request, jsonify, render_template
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 import requests
+from requests.adapters import HTTPAdapter
 import re
 import json
 from flask_cors import CORS
 import logging
 import time
 import urllib.parse
-from threading import Thread
+from threading import Thread, Lock, Event, local
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict, deque
 import os
+import random
+import sqlite3
+import sys
+import tempfile
+import asyncio
+import contextvars
+import base64
+import hashlib
+import functools
+import hmac
+import math
+import secrets
+from contextlib import contextmanager
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:  # aiohttp is only needed for the async server
+    aiohttp = None
+    web = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn there, the single dev server process always warms
+    fcntl = None
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# All HTTP routes live on this blueprint; create_app() builds the Flask app around it
+api = Blueprint('api', __name__)
+
+class TracedJSONProvider(flask.json.provider.DefaultJSONProvider):
+    """Time jsonify() as the 'serialize' span of the request trace"""
+
+    def response(self, *args, **kwargs):
+        with trace_span('serialize'):
+            return super().response(*args, **kwargs)
+
+@api.before_app_request
+def start_request_timer():
+    cache_warmer.start()
+    flask.g.request_started = time.perf_counter()
+    flask.g.trace, flask.g.trace_token = start_trace(request.headers)
+
+@api.after_app_request
+def record_request_metrics(response):
+    started = getattr(flask.g, 'request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - started, route=route)
+        metrics.inc('http_requests_total', route=route, method=request.method, status=response.status_code)
+    trace = getattr(flask.g, 'trace', None)
+    if trace is not None:
+        trace.root.finish()
+        response.headers['X-Trace-Id'] = trace.trace_id
+        response.headers['Server-Timing'] = trace.server_timing()
+        response.headers['Timing-Allow-Origin'] = '*'
+        if trace_debug_requested(request.args) and response.is_json and not response.direct_passthrough:
+            payload = response.get_json(silent=True)
+            if isinstance(payload, dict):
+                payload['trace'] = trace.to_dict()
+                response.set_data(json.dumps(payload))
+    return response
+
+@api.teardown_app_request
+def end_request_trace(exc):
+    token = getattr(flask.g, 'trace_token', None)
+    if token is not None:
+        end_trace(token)
+        flask.g.trace_token = None
 
 # App version data storage
 APP_VERSION_FILE = 'app_version.json'
@@ -48,8 +117,11 @@ def load_app_version():
 def save_app_version(version_data):
     """Save app version data to file"""
     try:
-        with open(APP_VERSION_FILE, 'w') as f:
+        # Write then rename, so other server workers never read a half-written file
+        temp_file = f"{APP_VERSION_FILE}.{os.getpid()}.tmp"
+        with open(temp_file, 'w') as f:
             json.dump(version_data, f, indent=2)
+        os.replace(temp_file, APP_VERSION_FILE)
         return True
     except Exception as e:
         logger.error(f"Error saving app version: {e}")
@@ -59,20 +131,2169 @@ def save_app_version(version_data):
 app_version_data = load_app_version()
 
 def keep_alive():
-    """Run Flask app in a separate thread for keep-alive"""
+    """Run Flask app in a separate thread for keep-alive (development server; use gunicorn.conf.py in production)"""
     t = Thread(target=lambda: app.run(host='0.0.0.0', port=8080, use_reloader=False))
     t.start()
 
-class WinbuScraper:
+# Histogram bucket upper bounds in seconds, from a cache hit to a stuck hoster
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25)
+
+class MetricsRegistry:
+    """Counters and histograms rendered in the Prometheus text format at /metrics.
+
+    Recording is a dict update under one lock, cheap enough to leave on under load.
+    Callback collectors add values that live elsewhere (cache and pool counters) at
+    render time instead of being tracked twice.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = Lock()
+        self._descriptions = {}
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+
+    def describe(self, name, kind, help_text):
+        self._descriptions[name] = (kind, help_text)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def add_collector(self, collect):
+        """Register collect() -> iterable of (name, labels dict, value) read at render time"""
+        self._collectors.append(collect)
+
+    @staticmethod
+    def format_labels(labels):
+        if not labels:
+            return ''
+        pairs = ','.join(
+            f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+            for key, value in labels
+        )
+        return '{' + pairs + '}'
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(value[0]), value[1], value[2]) for key, value in self._histograms.items()}
+
+        samples = {}
+        for (name, labels), value in counters.items():
+            samples.setdefault(name, []).append(f"{name}{self.format_labels(labels)} {value}")
+        for (name, labels), (bucket_counts, total, count) in histograms.items():
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{self.format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{self.format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{self.format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{self.format_labels(labels)} {count}")
+        for collect in self._collectors:
+            try:
+                for name, labels, value in collect():
+                    samples.setdefault(name, []).append(f"{name}{self.format_labels(tuple(sorted(labels.items())))} {value}")
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {e}")
+
+        output = []
+        for name in sorted(samples):
+            kind, help_text = self._descriptions.get(name, ('untyped', ''))
+            output.append(f"# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(samples[name])
+        return '\n'.join(output) + '\n'
+
+metrics = MetricsRegistry()
+metrics.describe('http_requests_total', 'counter', 'API requests by route, method and status code')
+metrics.describe('http_request_duration_seconds', 'histogram', 'API request latency by route')
+metrics.describe('upstream_requests_total', 'counter', 'Requests sent to upstream hosts by outcome')
+metrics.describe('upstream_request_duration_seconds', 'histogram', 'Upstream request latency by host')
+metrics.describe('upstream_response_bytes_total', 'counter', 'Response body bytes received from upstream hosts')
+metrics.describe('upstream_retries_total', 'counter', 'get_page retries by upstream host')
+metrics.describe('upstream_rate_limit_wait_seconds', 'histogram', 'Time upstream requests queued for a rate limit token by host')
+metrics.describe('upstream_rate_limited_total', 'counter', 'Upstream requests delayed by the per-host rate limiter')
+metrics.describe('upstream_rate_limit_rejected_total', 'counter', 'Upstream requests refused because their rate limit wait exceeded the maximum')
+metrics.describe('resolver_results_total', 'counter', 'Hoster resolutions by hoster and result')
+metrics.describe('resolver_duration_seconds', 'histogram', 'Hoster resolution time by hoster')
+metrics.describe('parse_duration_seconds', 'histogram', 'HTML extraction time by extractor')
+metrics.describe('cache_events_total', 'counter', 'Cache hits, misses, evictions and refreshes by cache')
+metrics.describe('cache_entries', 'gauge', 'Entries currently held by each cache')
+metrics.describe('cache_bytes', 'gauge', 'Bytes currently held by each sized cache')
+metrics.describe('coalesced_calls_total', 'counter', 'Single-flight calls, upstream executions and merged callers')
+metrics.describe('coalesced_in_flight', 'gauge', 'Single-flight calls currently running')
+metrics.describe('cache_warm_total', 'counter', 'Background cache warmer refreshes by target and outcome')
+metrics.describe('batch_items_total', 'counter', 'Sub-requests answered by POST /batch by status code')
+metrics.describe('circuit_breaker_state', 'gauge', 'Circuit breaker state (0 closed, 1 half-open, 2 open)')
+metrics.describe('circuit_breaker_transitions_total', 'counter', 'Circuit breaker state changes by breaker and new state')
+metrics.describe('circuit_breaker_rejections_total', 'counter', 'Calls skipped because their circuit breaker was open')
+
+class Span:
+    """One timed stage of a request (fetch, parse, ajax, resolve:<host>, serialize)"""
+    __slots__ = ('name', 'attributes', 'start', 'end', 'children')
+
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.perf_counter()
+        self.end = None
+        self.children = []
+
+    def finish(self):
+        if self.end is None:
+            self.end = time.perf_counter()
+
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin):
+        span = {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 2),
+            'duration_ms': round(self.duration_ms(), 2)
+        }
+        if self.attributes:
+            span['attributes'] = self.attributes
+        if self.children:
+            span['children'] = [child.to_dict(origin) for child in self.children]
+        return span
+
+class RequestTrace:
+    """Span tree of one API request. Spans may be added from worker threads and tasks."""
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.root = Span('request')
+        self.spans = []
+        self._lock = Lock()
+
+    def add(self, parent, span):
+        with self._lock:
+            parent.children.append(span)
+            self.spans.append(span)
+
+    def stage_timings(self):
+        """Wall-clock milliseconds per span name; overlapping spans (parallel resolves) count once"""
+        with self._lock:
+            spans = list(self.spans)
+        intervals = {}
+        for span in spans:
+            intervals.setdefault(span.name, []).append((span.start, span.end if span.end is not None else time.perf_counter()))
+        timings = []
+        for name, ranges in intervals.items():
+            ranges.sort()
+            total, current_start, current_end = 0.0, None, None
+            for start, end in ranges:
+                if current_end is None or start > current_end:
+                    if current_end is not None:
+                        total += current_end - current_start
+                    current_start, current_end = start, end
+                else:
+                    current_end = max(current_end, end)
+            total += current_end - current_start
+            timings.append((name, total * 1000, len(ranges)))
+        return timings
+
+    def server_timing(self):
+        """Server-Timing header value: one metric per stage plus the request total"""
+        entries = []
+        for name, duration, count in self.stage_timings():
+            metric = re.sub(r'[^A-Za-z0-9_.-]', '-', name)
+            entries.append(f'{metric};dur={duration:.1f};desc="{name} x{count}"')
+        entries.append(f'total;dur={self.root.duration_ms():.1f}')
+        return ', '.join(entries)
+
+    def to_dict(self):
+        return {'trace_id': self.trace_id, 'spans': self.root.to_dict(self.root.start)}
+
+# (trace, current span) of the request being handled; unset outside requests, which makes spans no-ops
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+TRACE_ID_PATTERN = re.compile(r'^[0-9a-f]{8,64}$')
+
+def incoming_trace_id(headers):
+    """Reuse a caller's X-Trace-Id or W3C traceparent trace id so client and server logs line up"""
+    trace_id = (headers.get('X-Trace-Id') or '').strip().lower()
+    if not trace_id:
+        parts = (headers.get('traceparent') or '').split('-')
+        trace_id = parts[1] if len(parts) == 4 else ''
+    return trace_id if TRACE_ID_PATTERN.match(trace_id) else None
+
+def start_trace(headers):
+    """Begin a request trace; returns (trace, token) where token is for end_trace"""
+    trace = RequestTrace(incoming_trace_id(headers))
+    return trace, current_trace.set((trace, trace.root))
+
+def end_trace(token):
+    current_trace.reset(token)
+
+@contextmanager
+def trace_span(name, **attributes):
+    """Time a block as a child of the current span; does nothing outside a traced request"""
+    current = current_trace.get()
+    if current is None:
+        yield None
+        return
+    trace, parent = current
+    span = Span(name, attributes)
+    trace.add(parent, span)
+    token = current_trace.set((trace, span))
+    try:
+        yield span
+    finally:
+        span.finish()
+        current_trace.reset(token)
+
+def submit_traced(executor, fn, *args):
+    """executor.submit that keeps the caller's trace context in the worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+def trace_debug_requested(args):
+    """?debug=1 (or debug=trace) asks for the span tree in the JSON body"""
+    return args.get('debug', '').lower() in ('1', 'true', 'trace')
+
+def timed_parse(parse):
+    """Record how long an extractor's parse_* method takes in parse_duration_seconds"""
+    extractor = parse.__name__[len('parse_'):]
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            with trace_span('parse', extractor=extractor):
+                return parse(*args, **kwargs)
+        finally:
+            metrics.observe('parse_duration_seconds', time.perf_counter() - start, extractor=extractor)
+
+    wrapper.__name__ = parse.__name__
+    wrapper.__doc__ = parse.__doc__
+    wrapper.__wrapped__ = parse
+    return wrapper
+
+def host_of(url):
+    return urllib.parse.urlparse(url).netloc.lower()
+
+# HTTP connection pool settings (shared by all scrapers)
+HTTP_POOL_HOSTS = int(os.environ.get('HTTP_POOL_HOSTS', 20))  # number of per-host pools kept open
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))  # max connections kept per host
+HTTP_POOL_BLOCK = os.environ.get('HTTP_POOL_BLOCK', 'false').lower() in ('1', 'true', 'yes')
+
+def parse_host_overrides(value):
+    """Parse 'winbu.tv=http://127.0.0.1:8800,*=http://127.0.0.1:8800' into {host: base URL}"""
+    overrides = {}
+    for item in value.split(','):
+        host, _, target = item.partition('=')
+        if host.strip() and target.strip():
+            overrides[host.strip().lower()] = target.strip().rstrip('/')
+    return overrides
+
+# Host table for load tests: send requests for these upstream hosts ('*' = every host)
+# to another server, e.g. benchmarks/mock_upstream.py. The original host goes in the Host header.
+UPSTREAM_HOST_OVERRIDES = parse_host_overrides(os.environ.get('UPSTREAM_HOST_OVERRIDES', ''))
+
+def redirect_upstream(url, headers=None):
+    """Apply UPSTREAM_HOST_OVERRIDES to a request URL, returning (url, headers)"""
+    if not UPSTREAM_HOST_OVERRIDES:
+        return url, headers
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.netloc.lower()
+    target = UPSTREAM_HOST_OVERRIDES.get(host) or UPSTREAM_HOST_OVERRIDES.get('*')
+    if not target:
+        return url, headers
+    redirected = target + urllib.parse.urlunsplit(('', '', parsed.path or '/', parsed.query, ''))
+    return redirected, dict(headers or {}, Host=host)
+
+def parse_rate_limits(value):
+    """Parse 'komikindo.ch=2/5,winbu.tv=10' into {host: (requests per second, burst)}"""
+    limits = {}
+    for item in value.split(','):
+        host, _, limit = item.partition('=')
+        if not host.strip() or not limit.strip():
+            continue
+        rate, _, burst = limit.partition('/')
+        try:
+            rate = float(rate)
+            burst = float(burst) if burst.strip() else max(1.0, rate)
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit {item!r}")
+            continue
+        if rate > 0:
+            limits[host.strip().lower()] = (rate, max(1.0, burst))
+    return limits
+
+# Per-host upstream request budgets: 'host=rate/burst' pairs, rate in requests per second.
+# Requests only wait once a host's burst is used up; hosts not listed are not limited.
+UPSTREAM_RATE_LIMITS = parse_rate_limits(os.environ.get('UPSTREAM_RATE_LIMITS', 'komikindo.ch=2/6'))
+UPSTREAM_RATE_LIMIT_MAX_WAIT = float(os.environ.get('UPSTREAM_RATE_LIMIT_MAX_WAIT', 10))  # longest a request may queue; beyond it the API answers 503
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    reserve() takes a token, letting the balance go negative, and returns how long the
+    caller has to wait before its turn. Waiters are therefore spaced 1/rate apart in
+    arrival order, and the caller picks how to wait (thread or event loop). A caller
+    whose wait would exceed max_wait gets its token back, so the queue stays bounded.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self, max_wait=None):
+        """Return the seconds to wait for a token; when that exceeds max_wait no token is taken"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            if max_wait is not None and delay > max_wait:
+                self.tokens += 1
+            return delay
+
+    def available(self):
+        with self._lock:
+            return min(self.burst, self.tokens + (time.monotonic() - self.updated) * self.rate)
+
+class UpstreamBusyError(Exception):
+    """Raised instead of queueing an upstream request longer than the rate limiter's max_wait"""
+
+    def __init__(self, host, retry_after):
+        super().__init__(f"Too many requests queued for {host}, retry in {retry_after} seconds")
+        self.host = host
+        self.retry_after = retry_after
+
+class HostRateLimiter:
+    """Per-host token buckets shared by the sync and async HTTP pools"""
+
+    def __init__(self, limits, max_wait=UPSTREAM_RATE_LIMIT_MAX_WAIT):
+        self.buckets = {host: TokenBucket(rate, burst) for host, (rate, burst) in limits.items()}
+        self.max_wait = max_wait
+        self._lock = Lock()
+        self._stats = {}
+
+    def reserve(self, host):
+        """Take a request slot for host and return the seconds to wait before sending.
+
+        Raises UpstreamBusyError when the wait would exceed max_wait.
+        """
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            return 0.0
+        delay = bucket.reserve(self.max_wait)
+        rejected = delay > self.max_wait
+        with self._lock:
+            stats = self._stats.setdefault(host, {'requests': 0, 'delayed': 0, 'rejected': 0, 'wait_seconds': 0.0})
+            if rejected:
+                stats['rejected'] += 1
+            else:
+                stats['requests'] += 1
+                if delay:
+                    stats['delayed'] += 1
+                    stats['wait_seconds'] += delay
+        if rejected:
+            metrics.inc('upstream_rate_limit_rejected_total', host=host)
+            raise UpstreamBusyError(host, max(1, math.ceil(delay - self.max_wait)))
+        metrics.observe('upstream_rate_limit_wait_seconds', delay, host=host)
+        if delay:
+            metrics.inc('upstream_rate_limited_total', host=host)
+        return delay
+
+    def wait(self, host):
+        delay = self.reserve(host)
+        if delay:
+            with trace_span('rate-limit', host=host):
+                time.sleep(delay)
+
+    async def wait_async(self, host):
+        delay = self.reserve(host)
+        if delay:
+            with trace_span('rate-limit', host=host):
+                await asyncio.sleep(delay)
+
+    def info(self):
+        with self._lock:
+            stats = {host: dict(values) for host, values in self._stats.items()}
+        hosts = {}
+        for host, bucket in self.buckets.items():
+            host_stats = stats.get(host, {'requests': 0, 'delayed': 0, 'rejected': 0, 'wait_seconds': 0.0})
+            host_stats['wait_seconds'] = round(host_stats['wait_seconds'], 3)
+            hosts[host] = dict(host_stats, rate=bucket.rate, burst=bucket.burst, available=round(bucket.available(), 2))
+        return hosts
+
+rate_limiter = HostRateLimiter(UPSTREAM_RATE_LIMITS)
+
+# Circuit breaker settings, shared by the per-host and per-hoster breakers
+CIRCUIT_WINDOW_SECONDS = float(os.environ.get('CIRCUIT_WINDOW_SECONDS', 60))  # failure rate is measured over this sliding window
+CIRCUIT_MIN_REQUESTS = int(os.environ.get('CIRCUIT_MIN_REQUESTS', 5))  # calls needed in the window before a breaker can open
+CIRCUIT_FAILURE_RATIO = float(os.environ.get('CIRCUIT_FAILURE_RATIO', 0.5))
+CIRCUIT_OPEN_SECONDS = float(os.environ.get('CIRCUIT_OPEN_SECONDS', 30))  # how long an open breaker rejects calls before probing
+CIRCUIT_HALF_OPEN_PROBES = int(os.environ.get('CIRCUIT_HALF_OPEN_PROBES', 1))  # successful probes needed to close again
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised by the HTTP pools instead of contacting a host whose breaker is open"""
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised by the HTTP pool instead of making an upstream call after upstream_deadline"""
+
+# time.monotonic() after which the current request's upstream calls are abandoned (set by /batch items)
+upstream_deadline = contextvars.ContextVar('upstream_deadline', default=None)
+# A list the HTTP pools append a host to whenever a call to it fails (set while resolving a hoster link)
+upstream_failures = contextvars.ContextVar('upstream_failures', default=None)
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker driven by the failure ratio over a sliding time window.
+
+    Closed: calls go through and their outcomes are recorded. Once the window holds at
+    least min_requests calls and failure_ratio of them failed, the breaker opens and
+    rejects calls for open_seconds. It then lets half_open_probes trial calls through:
+    if they all succeed it closes, and any failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, window=CIRCUIT_WINDOW_SECONDS, min_requests=CIRCUIT_MIN_REQUESTS,
+                 failure_ratio=CIRCUIT_FAILURE_RATIO, open_seconds=CIRCUIT_OPEN_SECONDS, half_open_probes=CIRCUIT_HALF_OPEN_PROBES):
+        self.name = name
+        self.window = window
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = self.CLOSED
+        self.changed_at = time.monotonic()
+        self.outcomes = deque()  # (monotonic time, failed)
+        self.probes_started = 0
+        self.probes_succeeded = 0
+        self.rejected = 0
+        self.opened = 0
+        self._lock = Lock()
+
+    def _transition(self, state, now):
+        logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+        metrics.inc('circuit_breaker_transitions_total', breaker=self.name, state=state)
+        self.state = state
+        self.changed_at = now
+        self.probes_started = 0
+        self.probes_succeeded = 0
+        if state == self.OPEN:
+            self.opened += 1
+        else:
+            self.outcomes.clear()
+
+    def _prune(self, now):
+        while self.outcomes and now - self.outcomes[0][0] > self.window:
+            self.outcomes.popleft()
+
+    def _cooled_down(self, now):
+        return now - self.changed_at >= self.open_seconds
+
+    def available(self):
+        """Whether a call would currently be let through, without taking a probe slot"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                return self._cooled_down(now)
+            if self.state == self.HALF_OPEN:
+                return self.probes_started < self.half_open_probes or self._cooled_down(now)
+            return True
+
+    def allow(self):
+        """Take permission for one call; False means skip the call (the breaker is open)"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and self._cooled_down(now):
+                self._transition(self.HALF_OPEN, now)
+            if self.state == self.HALF_OPEN and self.probes_started >= self.half_open_probes and self._cooled_down(now):
+                # Probes that never reported back (killed worker, abandoned task) must not wedge the breaker
+                self._transition(self.HALF_OPEN, now)
+            if self.state == self.OPEN or (self.state == self.HALF_OPEN and self.probes_started >= self.half_open_probes):
+                self.rejected += 1
+                metrics.inc('circuit_breaker_rejections_total', breaker=self.name)
+                return False
+            if self.state == self.HALF_OPEN:
+                self.probes_started += 1
+            return True
+
+    def record(self, failed):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                if failed:
+                    self._transition(self.OPEN, now)
+                else:
+                    self.probes_succeeded += 1
+                    if self.probes_succeeded >= self.half_open_probes:
+                        self._transition(self.CLOSED, now)
+                return
+            if self.state == self.OPEN:
+                return  # late result of a call started before the breaker opened
+            self.outcomes.append((now, failed))
+            self._prune(now)
+            failures = sum(1 for _, outcome_failed in self.outcomes if outcome_failed)
+            if len(self.outcomes) >= self.min_requests and failures >= self.failure_ratio * len(self.outcomes):
+                self._transition(self.OPEN, now)
+
+    def release(self):
+        """Give back the probe slot of a call allowed through but abandoned before it had an outcome"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.probes_started > 0:
+                self.probes_started -= 1
+
+    def info(self):
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            failures = sum(1 for _, failed in self.outcomes if failed)
+            info = {
+                'state': self.state,
+                'since_seconds': round(now - self.changed_at, 1),
+                'window_calls': len(self.outcomes),
+                'window_failures': failures,
+                'times_opened': self.opened,
+                'rejected': self.rejected
+            }
+            if self.state == self.OPEN:
+                info['retry_in_seconds'] = round(max(0.0, self.open_seconds - (now - self.changed_at)), 1)
+            return info
+
+class CircuitBreakerRegistry:
+    """Lazily created CircuitBreaker per key (an upstream host or a file hoster name)"""
+
+    STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+    def __init__(self, kind, **settings):
+        self.kind = kind
+        self.settings = settings
+        self._breakers = {}
+        self._lock = Lock()
+
+    def breaker(self, key):
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(f"{self.kind}:{key}", **self.settings)
+            return breaker
+
+    def available(self, key):
+        return self.breaker(key).available()
+
+    def allow(self, key):
+        return self.breaker(key).allow()
+
+    def record(self, key, failed):
+        self.breaker(key).record(failed)
+
+    def release(self, key):
+        self.breaker(key).release()
+
+    def is_open(self, key):
+        with self._lock:
+            breaker = self._breakers.get(key)
+        return breaker is not None and breaker.state == CircuitBreaker.OPEN
+
+    def info(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {key: breaker.info() for key, breaker in sorted(breakers.items())}
+
+    def collect_metrics(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            yield 'circuit_breaker_state', {'breaker': breaker.name}, self.STATE_VALUES[breaker.state]
+
+def upstream_failed(status_code):
+    """Responses that count against a host's breaker: server errors and rate limiting"""
+    return status_code >= 500 or status_code == 429
+
+# Breakers per upstream host (checked by the HTTP pools) and per file hoster (checked by resolve_download_url)
+host_breakers = CircuitBreakerRegistry('host')
+hoster_breakers = CircuitBreakerRegistry('hoster')
+metrics.add_collector(host_breakers.collect_metrics)
+metrics.add_collector(hoster_breakers.collect_metrics)
+
+def record_upstream(host, failed):
+    """Record a finished upstream call on the host's breaker, and note a failure for the caller collecting them"""
+    host_breakers.record(host, failed=failed)
+    failures = upstream_failures.get()
+    if failed and failures is not None:
+        failures.append(host)
+
+def circuit_breaker_status():
+    return {
+        'settings': {
+            'window_seconds': CIRCUIT_WINDOW_SECONDS,
+            'min_requests': CIRCUIT_MIN_REQUESTS,
+            'failure_ratio': CIRCUIT_FAILURE_RATIO,
+            'open_seconds': CIRCUIT_OPEN_SECONDS,
+            'half_open_probes': CIRCUIT_HALF_OPEN_PROBES
+        },
+        'hosts': host_breakers.info(),
+        'hosters': hoster_breakers.info()
+    }
+
+class HttpSessionPool:
+    """Keep-alive HTTP sessions sharing one bounded connection pool per host.
+
+    Each thread gets its own requests.Session (sessions are not thread-safe),
+    but every session mounts the same HTTPAdapter, so TCP/TLS connections to
+    winbu.tv, komikindo.ch and the file hosts are reused across requests and threads.
+    """
+
+    def __init__(self, pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE, pool_block=HTTP_POOL_BLOCK):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0  # retries are handled by the scrapers' get_page
+        )
+        self._local = local()
+        self._lock = Lock()
+        self._host_stats = {}
+
+    def session(self):
+        """Return the calling thread's session, creating it on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the shared pool and record per-host statistics"""
+        host = urllib.parse.urlparse(url).netloc.lower()
+        url, headers = redirect_upstream(url, kwargs.pop('headers', None))
+        deadline = upstream_deadline.get()
+        cut_short = False
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Request deadline passed, skipping {method} {url}")
+            if kwargs.get('timeout') is None or kwargs['timeout'] > remaining:
+                kwargs['timeout'] = remaining
+                cut_short = True
+        if not host_breakers.allow(host):
+            raise CircuitOpenError(f"Circuit breaker open for {host}, skipping {method} {url}")
+        try:
+            rate_limiter.wait(host)
+        except UpstreamBusyError:
+            host_breakers.release(host)
+            raise
+        start = time.perf_counter()
+        try:
+            with trace_span('fetch', host=host, method=method):
+                response = self.session().request(method, url, headers=headers, **kwargs)
+        except Exception as e:
+            if cut_short and isinstance(e, requests.exceptions.Timeout):
+                # Our deadline, not the host, ended the call
+                host_breakers.release(host)
+                raise DeadlineExceeded(f"Request deadline passed during {method} {url}") from e
+            record_upstream(host, True)
+            if isinstance(e, requests.exceptions.RequestException):
+                self._record(host, error=True)
+                metrics.inc('upstream_requests_total', host=host, outcome='error')
+            raise
+        finally:
+            metrics.observe('upstream_request_duration_seconds', time.perf_counter() - start, host=host)
+        record_upstream(host, upstream_failed(response.status_code))
+        self._record(host, error=False)
+        metrics.inc('upstream_requests_total', host=host, outcome='ok' if response.status_code < 400 else f"http_{response.status_code}")
+        if not kwargs.get('stream'):
+            metrics.inc('upstream_response_bytes_total', len(response.content), host=host)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _record(self, host, error):
+        with self._lock:
+            stats = self._host_stats.setdefault(host, {'requests': 0, 'errors': 0})
+            stats['requests'] += 1
+            if error:
+                stats['errors'] += 1
+
+    def stats(self):
+        """Return pool configuration plus per-host request and connection counters"""
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self._host_stats.items()}
+
+        poolmanager = self.adapter.poolmanager
+        for pool_key in list(poolmanager.pools.keys()):
+            pool = poolmanager.pools.get(pool_key)
+            if pool is None:
+                continue
+            host = pool.host.lower()
+            if pool.port and pool.port not in (80, 443):
+                host = f"{host}:{pool.port}"
+            stats = hosts.setdefault(host, {'requests': 0, 'errors': 0})
+            # num_connections counts new TCP connections; the rest were reused keep-alive connections
+            stats['connections_opened'] = pool.num_connections
+            stats['pooled_requests'] = pool.num_requests
+            # The urllib3 queue is pre-filled with None placeholders, only count real connections
+            stats['idle_connections'] = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0
+
+        return {
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'pool_block': self.pool_block,
+            'hosts': hosts
+        }
+
+# Shared pool used by all scrapers
+http_pool = HttpSessionPool()
+
+# Response cache settings for the listing endpoints
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+RESPONSE_CACHE_STALE_SECONDS = int(os.environ.get('RESPONSE_CACHE_STALE_SECONDS', 1800))  # serve expired entries this long while refreshing
+CACHE_REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', 4))  # stale-while-revalidate refreshes run at once
+CACHE_TTLS = {
+    'top-anime': 600,
+    'latest-anime': 300,
+    'genres': 3600,
+    'popular-comics': 600,
+    'latest-collections': 600,
+}
+
+class InFlightCall:
+    __slots__ = ('done', 'result', 'error', 'merged')
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+        self.merged = 0
+
+class SingleFlight:
+    """Coalesce concurrent identical scraper calls into one upstream fetch.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait for and share its result (or exception). Nothing is kept afterwards.
+    """
+
     def __init__(self):
-        self.base_url = "https://winbu.tv"
+        self._calls = {}
+        self._tasks = {}
+        self._lock = Lock()
+        self._stats = {
+            'calls': 0,
+            'executions': 0,
+            'merged_callers': 0
+        }
+
+    def _join(self, calls, key, start):
+        """Return (call, leader): the in-flight call for key, or a new one from start() if the caller leads"""
+        with self._lock:
+            self._stats['calls'] += 1
+            call = calls.get(key)
+            if call is None:
+                self._stats['executions'] += 1
+                call = calls[key] = start()
+                return call, True
+            self._stats['merged_callers'] += 1
+            if isinstance(call, InFlightCall):
+                call.merged += 1
+            return call, False
+
+    def do(self, key, compute):
+        call, leader = self._join(self._calls, key, InFlightCall)
+        if not leader:
+            with trace_span('coalesced', key=str(key)):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                merged = call.merged
+            call.done.set()
+            if merged:
+                logger.info(f"Coalesced {merged} concurrent request(s) for {key}")
+
+    async def do_async(self, key, compute):
+        task, leader = self._join(self._tasks, key, lambda: asyncio.ensure_future(compute()))
+        if leader:
+            task.add_done_callback(lambda done: self._tasks.pop(key, None))
+        # A disconnecting client must not cancel the fetch the other callers are waiting on
+        return await asyncio.shield(task)
+
+    def info(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls) + len(self._tasks))
+
+class CacheEntry:
+    __slots__ = ('value', 'size', 'expires_at', 'stale_until')
+
+    def __init__(self, value, size, expires_at, stale_until):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+class ResponseCache:
+    """In-process TTL cache with byte-size-aware LRU eviction and stale-while-revalidate.
+
+    Entry sizes are measured as the length of their JSON encoding, which is what the
+    endpoints send anyway. Once an entry expires it is still served for stale_seconds
+    while a single background refresh replaces it. Concurrent misses for one key share
+    a single compute.
+    """
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES, stale_seconds=RESPONSE_CACHE_STALE_SECONDS):
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._refresh_tasks = set()  # asyncio keeps only weak references to tasks
+        self._flights = SingleFlight()
+        self._lock = Lock()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'refreshes': 0,
+            'refresh_failures': 0
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def lookup(self, key):
+        """Return (state, value) where state is 'fresh', 'stale' or 'miss'"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry.stale_until:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return 'miss', None
+            self._entries.move_to_end(key)
+            if now < entry.expires_at:
+                self._stats['hits'] += 1
+                return 'fresh', entry.value
+            self._stats['stale_hits'] += 1
+            return 'stale', entry.value
+
+    def set(self, key, value, ttl, stale_seconds=None):
+        """Store a value, evicting least recently used entries until it fits"""
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {key}: {size} bytes exceeds cache size {self.max_bytes}")
+            return
+        now = time.monotonic()
+        stale_seconds = self.stale_seconds if stale_seconds is None else stale_seconds
+        with self._lock:
+            self._remove(key)
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats['evictions'] += 1
+            self._entries[key] = CacheEntry(value, size, now + ttl, now + ttl + stale_seconds)
+            self.current_bytes += size
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+
+    def _claim_refresh(self, key):
+        """Mark key as refreshing; False if another caller already is"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def _store_refreshed(self, key, value, ttl, cacheable):
+        if cacheable(value):
+            self.set(key, value, ttl)
+            self._count('refreshes')
+        else:
+            # Keep serving the last good value until it falls out of the stale window
+            self._count('refresh_failures')
+            logger.warning(f"Background refresh of {key} returned no data, keeping stale value")
+
+    def _refresh(self, key, compute, ttl, cacheable):
+        try:
+            self._store_refreshed(key, compute(), ttl, cacheable)
+        except Exception as e:
+            self._count('refresh_failures')
+            logger.error(f"Background refresh of {key} failed: {e}")
+        finally:
+            self._release_refresh(key)
+
+    def _compute_and_store(self, key, value, ttl, cacheable):
+        if cacheable(value):
+            self.set(key, value, ttl)
+        return value
+
+    def _compute_miss(self, key, compute, ttl, cacheable):
+        return self._compute_and_store(key, compute(), ttl, cacheable)
+
+    async def _compute_miss_async(self, key, compute, ttl, cacheable):
+        return self._compute_and_store(key, await compute(), ttl, cacheable)
+
+    def get_or_compute(self, key, compute, ttl, cacheable=bool):
+        """Return the cached value for key, computing it on a miss and refreshing it in the background once stale.
+
+        Only results for which cacheable(value) is true are stored, so upstream failures
+        (empty results) are never cached. Refreshes run on the shared 'cache-refresh' pool,
+        at most one per key.
+        """
+        state, value = self.lookup(key)
+        if state == 'fresh':
+            return value
+        if state == 'stale':
+            if self._claim_refresh(key):
+                shared_executor('cache-refresh', CACHE_REFRESH_WORKERS).submit(self._refresh, key, compute, ttl, cacheable)
+            return value
+        return self._flights.do(key, lambda: self._compute_miss(key, compute, ttl, cacheable))
+
+    async def get_or_compute_async(self, key, compute, ttl, cacheable=bool):
+        """get_or_compute for coroutine functions, refreshing stale entries in an asyncio task"""
+        state, value = self.lookup(key)
+        if state == 'fresh':
+            return value
+        if state == 'stale':
+            if self._claim_refresh(key):
+                task = asyncio.ensure_future(self._refresh_async(key, compute, ttl, cacheable))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return value
+        return await self._flights.do_async(key, lambda: self._compute_miss_async(key, compute, ttl, cacheable))
+
+    async def _refresh_async(self, key, compute, ttl, cacheable):
+        try:
+            self._store_refreshed(key, await compute(), ttl, cacheable)
+        except Exception as e:
+            self._count('refresh_failures')
+            logger.error(f"Background refresh of {key} failed: {e}")
+        finally:
+            self._release_refresh(key)
+
+    def expires_in(self, key):
+        """Seconds until key's entry expires (negative while it is stale), or None if it is not cached"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now >= entry.stale_until:
+                return None
+            return entry.expires_at - now
+
+    def extend_stale(self, key, seconds):
+        """Keep serving key's current value for at least another `seconds` without marking it fresh"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stale_until = max(entry.stale_until, time.monotonic() + seconds)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def info(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self.current_bytes, max_bytes=self.max_bytes)
+
+# Cross-process cache (one SQLite file in WAL mode shared by every worker on the host).
+# Empty keeps the per-process ResponseCache; gunicorn.conf.py turns it on for multi-worker servers.
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH', '')
+SHARED_CACHE_LEASE_SECONDS = float(os.environ.get('SHARED_CACHE_LEASE_SECONDS', 30))  # max time one worker may hold a compute lease
+SHARED_CACHE_POLL_SECONDS = 0.05
+
+class SharedCache(ResponseCache):
+    """ResponseCache stored in a SQLite database that every worker process on the host opens.
+
+    Entries are JSON rows with wall-clock expiry, so all workers see one copy with the same
+    TTL and stale window. The byte limit covers the whole namespace: when a write would
+    exceed it, dead entries go first, then the entries closest to expiry.
+    A row in cache_leases makes get-or-compute atomic across processes. The
+    worker that takes the lease computes the value, and the others wait for its result
+    instead of fetching the same page. Hit and miss counters stay per process.
+    SQLite errors are logged and treated as misses, so a broken cache file never fails a request.
+    """
+
+    def __init__(self, path, namespace, max_bytes=RESPONSE_CACHE_MAX_BYTES, stale_seconds=RESPONSE_CACHE_STALE_SECONDS,
+                 lease_seconds=SHARED_CACHE_LEASE_SECONDS):
+        super().__init__(max_bytes=max_bytes, stale_seconds=stale_seconds)
+        self.path = path
+        self.namespace = namespace
+        self.lease_seconds = lease_seconds
+        self._local = local()
+        self._owner = None
+        self._owner_pid = None
+        self._ensure_schema()
+
+    def connection(self):
+        """Return this thread's connection, reopening it after a fork"""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def _ensure_schema(self):
+        connection = self.connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+            'size INTEGER NOT NULL, expires_at REAL NOT NULL, stale_until REAL NOT NULL, PRIMARY KEY (namespace, key)) WITHOUT ROWID'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS cache_entries_expiry ON cache_entries (namespace, expires_at)')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache_leases (namespace TEXT NOT NULL, key TEXT NOT NULL, owner TEXT NOT NULL, '
+            'expires_at REAL NOT NULL, PRIMARY KEY (namespace, key)) WITHOUT ROWID'
+        )
+
+    @staticmethod
+    def encode_key(key):
+        return json.dumps(key, default=str)
+
+    def lookup(self, key):
+        now = time.time()
+        try:
+            row = self.connection().execute(
+                'SELECT value, expires_at, stale_until FROM cache_entries WHERE namespace = ? AND key = ?',
+                (self.namespace, self.encode_key(key))
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache lookup of {key} failed: {e}")
+            row = None
+        if row is None or now >= row[2]:
+            self._count('misses')
+            return 'miss', None
+        if now < row[1]:
+            self._count('hits')
+            return 'fresh', json.loads(row[0])
+        self._count('stale_hits')
+        return 'stale', json.loads(row[0])
+
+    def set(self, key, value, ttl, stale_seconds=None):
+        encoded = json.dumps(value, default=str)
+        size = len(encoded)
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {key}: {size} bytes exceeds cache size {self.max_bytes}")
+            return
+        now = time.time()
+        stale_seconds = self.stale_seconds if stale_seconds is None else stale_seconds
+        encoded_key = self.encode_key(key)
+        connection = self.connection()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                connection.execute('DELETE FROM cache_entries WHERE namespace = ? AND (key = ? OR stale_until <= ?)', (self.namespace, encoded_key, now))
+                used = connection.execute('SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?', (self.namespace,)).fetchone()[0]
+                if used + size > self.max_bytes:
+                    evicted = 0
+                    for evict_key, evict_size in connection.execute(
+                        'SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY expires_at', (self.namespace,)
+                    ).fetchall():
+                        if used + size <= self.max_bytes:
+                            break
+                        connection.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (self.namespace, evict_key))
+                        used -= evict_size
+                        evicted += 1
+                    with self._lock:
+                        self._stats['evictions'] += evicted
+                connection.execute(
+                    'INSERT INTO cache_entries (namespace, key, value, size, expires_at, stale_until) VALUES (?, ?, ?, ?, ?, ?)',
+                    (self.namespace, encoded_key, encoded, size, now + ttl, now + ttl + stale_seconds)
+                )
+                connection.execute('COMMIT')
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache write of {key} failed: {e}")
+
+    def _lease_owner(self):
+        # One owner per process: background refresh threads release leases their request thread took
+        if self._owner_pid != os.getpid():
+            self._owner = uuid.uuid4().hex
+            self._owner_pid = os.getpid()
+        return self._owner
+
+    def _claim_refresh(self, key):
+        """Take the cross-process compute lease for key; False if another worker holds it"""
+        now = time.time()
+        try:
+            cursor = self.connection().execute(
+                'INSERT INTO cache_leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (namespace, key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at '
+                'WHERE cache_leases.expires_at <= ?',
+                (self.namespace, self.encode_key(key), self._lease_owner(), now + self.lease_seconds, now)
+            )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache lease of {key} failed: {e}")
+            return True  # compute locally rather than wait on a broken cache
+
+    def _release_refresh(self, key):
+        try:
+            self.connection().execute(
+                'DELETE FROM cache_leases WHERE namespace = ? AND key = ? AND owner = ?',
+                (self.namespace, self.encode_key(key), self._lease_owner())
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache lease release of {key} failed: {e}")
+
+    def _peek(self, key):
+        """lookup() without touching the hit/miss counters, for callers waiting on a lease"""
+        try:
+            row = self.connection().execute(
+                'SELECT value, stale_until FROM cache_entries WHERE namespace = ? AND key = ?',
+                (self.namespace, self.encode_key(key))
+            ).fetchone()
+        except sqlite3.Error:
+            return False, None
+        if row is None or time.time() >= row[1]:
+            return False, None
+        return True, json.loads(row[0])
+
+    def _compute_miss(self, key, compute, ttl, cacheable):
+        """Compute a missing key in only one worker at a time"""
+        deadline = time.monotonic() + self.lease_seconds
+        while not self._claim_refresh(key):
+            # Another worker is computing this key: use its result once it lands
+            time.sleep(SHARED_CACHE_POLL_SECONDS)
+            found, value = self._peek(key)
+            if found:
+                return value
+            if time.monotonic() >= deadline:
+                return self._compute_and_store(key, compute(), ttl, cacheable)
+        try:
+            # The previous lease holder may have stored the value just before we took over
+            found, value = self._peek(key)
+            return value if found else self._compute_and_store(key, compute(), ttl, cacheable)
+        finally:
+            self._release_refresh(key)
+
+    async def _compute_miss_async(self, key, compute, ttl, cacheable):
+        deadline = time.monotonic() + self.lease_seconds
+        while not self._claim_refresh(key):
+            await asyncio.sleep(SHARED_CACHE_POLL_SECONDS)
+            found, value = self._peek(key)
+            if found:
+                return value
+            if time.monotonic() >= deadline:
+                return self._compute_and_store(key, await compute(), ttl, cacheable)
+        try:
+            found, value = self._peek(key)
+            return value if found else self._compute_and_store(key, await compute(), ttl, cacheable)
+        finally:
+            self._release_refresh(key)
+
+    def expires_in(self, key):
+        try:
+            row = self.connection().execute(
+                'SELECT expires_at, stale_until FROM cache_entries WHERE namespace = ? AND key = ?',
+                (self.namespace, self.encode_key(key))
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache lookup of {key} failed: {e}")
+            return None
+        now = time.time()
+        if row is None or now >= row[1]:
+            return None
+        return row[0] - now
+
+    def extend_stale(self, key, seconds):
+        try:
+            self.connection().execute(
+                'UPDATE cache_entries SET stale_until = MAX(stale_until, ?) WHERE namespace = ? AND key = ?',
+                (time.time() + seconds, self.namespace, self.encode_key(key))
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache update of {key} failed: {e}")
+
+    def clear(self):
+        try:
+            self.connection().execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache clear failed: {e}")
+
+    def info(self):
+        try:
+            entries, size = self.connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ? AND stale_until > ?',
+                (self.namespace, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Shared cache info failed: {e}")
+            entries, size = 0, 0
+        with self._lock:
+            stats = dict(self._stats)
+        return dict(stats, entries=entries, bytes=size, max_bytes=self.max_bytes, backend='sqlite', path=self.path)
+
+def make_cache(namespace, **settings):
+    """SharedCache when SHARED_CACHE_PATH is set, otherwise the per-process ResponseCache"""
+    if SHARED_CACHE_PATH:
+        try:
+            return SharedCache(SHARED_CACHE_PATH, namespace, **settings)
+        except sqlite3.Error as e:
+            logger.error(f"Cannot open shared cache {SHARED_CACHE_PATH}, using a per-process cache: {e}")
+    return ResponseCache(**settings)
+
+def has_list_items(key):
+    """cacheable() predicate for paginated results: only cache pages that returned items"""
+    return lambda result: isinstance(result, dict) and bool(result.get(key))
+
+# Cache in front of the listing endpoints
+response_cache = make_cache('response')
+
+# Resolved hoster URL -> direct URL. Pixeldrain IDs never change, while Filemoon and
+# VidHidePro hand out signed links that expire within minutes.
+STREAM_CACHE_TTLS = {
+    'pixeldrain': 86400,
+    'krakenfiles': 3600,
+    'mega': 3600,
+    'vidhidepro': 600,
+    'filemoon': 300
+}
+STREAM_CACHE_DEFAULT_TTL = 600
+STREAM_CACHE_NEGATIVE_TTL = int(os.environ.get('STREAM_CACHE_NEGATIVE_TTL', 60))
+STREAM_CACHE_MAX_BYTES = int(os.environ.get('STREAM_CACHE_MAX_BYTES', 4 * 1024 * 1024))
+
+def stream_cache_ttl(hoster, direct_url):
+    """How long a resolution result may be reused; failed resolutions are retried sooner"""
+    if not direct_url:
+        return STREAM_CACHE_NEGATIVE_TTL
+    return STREAM_CACHE_TTLS.get(hoster, STREAM_CACHE_DEFAULT_TTL)
+
+# Signed links must not be served after they expire, so no stale window here
+stream_cache = make_cache('stream', max_bytes=STREAM_CACHE_MAX_BYTES, stale_seconds=0)
+
+# Background refresh of hot listing keys (see WARM_TARGETS). '' turns the warmer off.
+CACHE_WARM_KEYS = os.environ.get('CACHE_WARM_KEYS', 'top-anime,latest-anime:1,popular-comics,latest-collections')
+CACHE_WARM_WORKERS = int(os.environ.get('CACHE_WARM_WORKERS', 2))  # refreshes running at once
+CACHE_WARM_LEAD_FRACTION = float(os.environ.get('CACHE_WARM_LEAD_FRACTION', 0.2))  # refresh once this much of the TTL is left
+CACHE_WARM_JITTER = float(os.environ.get('CACHE_WARM_JITTER', 0.5))  # spread refreshes over up to this share of the lead time
+CACHE_WARM_RETRY_SECONDS = float(os.environ.get('CACHE_WARM_RETRY_SECONDS', 30))  # first retry after a failed refresh, doubled per failure
+CACHE_WARM_ELECTION_SECONDS = float(os.environ.get('CACHE_WARM_ELECTION_SECONDS', 30))  # how often a standby worker retries the warmer lock
+
+class WarmTarget:
+    __slots__ = ('name', 'key', 'compute', 'ttl', 'cacheable', 'next_run', 'running', 'failures',
+                 'refreshes', 'skipped', 'last_refresh', 'last_duration', 'last_error')
+
+    def __init__(self, name, key, compute, ttl, cacheable):
+        self.name = name
+        self.key = key
+        self.compute = compute
+        self.ttl = ttl
+        self.cacheable = cacheable
+        self.next_run = 0.0
+        self.running = False
+        self.failures = 0
+        self.refreshes = 0
+        self.skipped = 0
+        self.last_refresh = None
+        self.last_duration = None
+        self.last_error = None
+
+class CacheWarmer:
+    """Refreshes hot cache keys shortly before they expire, so their endpoints never scrape on a request.
+
+    A target becomes due when less than lead_fraction of its TTL is left (minus random
+    jitter, which spreads targets and workers apart). Due targets run on a small thread pool,
+    at most `workers` at a time, and each refresh takes the cache's refresh lease. With the
+    shared cache, one worker process per cache file runs the warmer: it holds an flock on
+    `<cache path>.warmer.lock`, and the others retry the lock every election_seconds
+    so a replacement takes over when that worker exits. With per-process caches it
+    only runs outside gunicorn, since a warmer in every worker would multiply the
+    upstream scrapes by the worker count. A failed or empty refresh never replaces the
+    cached value. It keeps the last good value in the stale window and retries with backoff.
+    """
+
+    def __init__(self, cache, workers=CACHE_WARM_WORKERS, lead_fraction=CACHE_WARM_LEAD_FRACTION,
+                 jitter=CACHE_WARM_JITTER, retry_seconds=CACHE_WARM_RETRY_SECONDS, election_seconds=CACHE_WARM_ELECTION_SECONDS):
+        self.cache = cache
+        self.workers = workers
+        self.lead_fraction = lead_fraction
+        self.jitter = jitter
+        self.retry_seconds = retry_seconds
+        self.election_seconds = election_seconds
+        self.targets = {}
+        self._lock = Lock()
+        self._wake = Event()
+        self._thread = None
+        self._pid = None
+        self._lock_file = None
+        self._next_election = 0.0
+
+    def add(self, name, key, compute, ttl, cacheable=bool):
+        with self._lock:
+            self.targets[name] = WarmTarget(name, key, compute, ttl, cacheable)
+        self._wake.set()
+
+    def _elect(self):
+        """Whether this process should run the warmer (called with self._lock held)"""
+        path = getattr(self.cache, 'path', None)
+        if path is None:
+            return 'gunicorn' not in sys.modules
+        if fcntl is None:
+            return True
+        now = time.monotonic()
+        if now < self._next_election:
+            return False
+        self._next_election = now + self.election_seconds
+        try:
+            lock_file = open(f"{path}.warmer.lock", 'a')
+        except OSError as e:
+            logger.error(f"Cannot open the cache warmer lock next to {path}: {e}")
+            return False
+        try:
+            # Released by the OS when this worker exits, so a standby worker can take over
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def start(self):
+        """Start the scheduler thread once per process if it wins the election (safe to call on every request)"""
+        if self._pid == os.getpid() or not self.targets:
+            return
+        with self._lock:
+            if self._pid == os.getpid() or not self._elect():
+                return
+            self._pid = os.getpid()
+            self._thread = Thread(target=self._run, name='cache-warmer', daemon=True)
+            self._thread.start()
+        logger.info(f"Cache warmer started for {', '.join(self.targets)}")
+
+    def lead_time(self, target):
+        return target.ttl * self.lead_fraction
+
+    def _schedule(self, target, now):
+        """Set when the target is next due, based on how long its cached value has left"""
+        remaining = self.cache.expires_in(target.key)
+        lead = self.lead_time(target)
+        if remaining is None or remaining <= lead:
+            target.next_run = now
+        else:
+            target.next_run = now + remaining - lead * (1 + random.uniform(0, self.jitter))
+
+    def _run(self):
+        executor = shared_executor('warmer', self.workers)
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            with self._lock:
+                due = [target for target in self.targets.values() if not target.running and target.next_run <= now]
+                in_flight = sum(1 for target in self.targets.values() if target.running)
+            for target in due:
+                if target.next_run == 0.0:
+                    self._schedule(target, now)  # first pass: warm only what is missing or nearly expired
+                    if target.next_run > now:
+                        continue
+                if in_flight >= self.workers:
+                    break
+                target.running = True
+                in_flight += 1
+                try:
+                    executor.submit(self._refresh, target)
+                except RuntimeError:
+                    return  # the interpreter is shutting down
+            with self._lock:
+                upcoming = [target.next_run for target in self.targets.values() if not target.running]
+            self._wake.wait(max(0.05, min(upcoming, default=now + 60) - time.monotonic()))
+
+    def _refresh(self, target):
+        now = time.monotonic()
+        try:
+            # Another thread or worker may have refreshed it since it was scheduled
+            remaining = self.cache.expires_in(target.key)
+            if remaining is not None and remaining > self.lead_time(target):
+                target.skipped += 1
+                self._schedule(target, now)
+                return
+            if not self.cache._claim_refresh(target.key):
+                target.skipped += 1
+                target.next_run = now + min(self.retry_seconds, self.lead_time(target) / 2)
+                return
+            try:
+                with trace_span('warm', target=target.name):
+                    value = target.compute()
+            finally:
+                self.cache._release_refresh(target.key)
+            target.last_duration = round(time.monotonic() - now, 3)
+            if not target.cacheable(value):
+                raise ValueError("refresh returned no data")
+            self.cache.set(target.key, value, target.ttl)
+            target.refreshes += 1
+            target.failures = 0
+            target.last_error = None
+            target.last_refresh = datetime.now().isoformat(timespec='seconds')
+            metrics.inc('cache_warm_total', target=target.name, outcome='refreshed')
+            self._schedule(target, time.monotonic())
+        except Exception as e:
+            target.failures += 1
+            target.last_error = str(e)
+            metrics.inc('cache_warm_total', target=target.name, outcome='failed')
+            logger.warning(f"Cache warm of {target.name} failed ({target.failures} in a row): {e}")
+            retry_in = min(self.retry_seconds * 2 ** (target.failures - 1), max(self.retry_seconds, target.ttl))
+            # Keep the last good value servable until the next attempt has had a chance
+            self.cache.extend_stale(target.key, retry_in + self.retry_seconds)
+            target.next_run = time.monotonic() + retry_in
+        finally:
+            target.running = False
+            self._wake.set()
+
+    def info(self):
+        now = time.monotonic()
+        with self._lock:
+            targets = list(self.targets.values())
+        return {
+            'running': self._pid == os.getpid(),
+            'workers': self.workers,
+            'targets': {
+                target.name: {
+                    'ttl': target.ttl,
+                    'expires_in': None if (remaining := self.cache.expires_in(target.key)) is None else round(remaining, 1),
+                    'next_refresh_in': round(max(0.0, target.next_run - now), 1) if target.next_run else None,
+                    'refreshes': target.refreshes,
+                    'skipped': target.skipped,
+                    'failures': target.failures,
+                    'last_refresh': target.last_refresh,
+                    'last_duration': target.last_duration,
+                    'last_error': target.last_error
+                } for target in targets
+            }
+        }
+
+cache_warmer = CacheWarmer(response_cache)
+
+def record_resolution(hoster, direct_url, seconds):
+    metrics.inc('resolver_results_total', hoster=hoster, result='success' if direct_url else 'failure')
+    metrics.observe('resolver_duration_seconds', seconds, hoster=hoster)
+
+# Shared by /episode-streams and /chapter-images, keyed by (endpoint, url)
+scrape_flights = SingleFlight()
+
+PAGE_DOCUMENT_TTL = int(os.environ.get('PAGE_DOCUMENT_TTL', 30))
+PAGE_DOCUMENT_MAX_ENTRIES = int(os.environ.get('PAGE_DOCUMENT_MAX_ENTRIES', 16))
+
+def canonical_page_url(url):
+    """Normalise a page URL so 'https://winbu.tv' and 'https://WINBU.tv/#top' share one entry"""
+    parsed = urllib.parse.urlsplit(url)
+    return urllib.parse.urlunsplit((
+        parsed.scheme.lower(),
+        parsed.netloc.lower(),
+        parsed.path or '/',
+        parsed.query,
+        ''
+    ))
+
+# HTML parser backend: 'auto' picks lxml when installed, otherwise Python's html.parser.
+# WINBU_HTML_PARSER / KOMIKINDO_HTML_PARSER override it per scraper.
+HTML_PARSER = os.environ.get('HTML_PARSER', 'auto')
+CHARSET_PATTERN = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+
+def resolve_html_parser(name):
+    """Map a configured parser name to one BeautifulSoup can actually use here"""
+    if not name or name == 'auto':
+        return 'lxml' if builder_registry.lookup('lxml') else 'html.parser'
+    if builder_registry.lookup(name) is None:
+        logger.warning(f"HTML parser '{name}' is not installed, falling back to html.parser")
+        return 'html.parser'
+    return name
+
+class PageMarkup(bytes):
+    """Raw page body plus the charset the server declared, decoded once by the parser itself"""
+
+    def __new__(cls, content, encoding=None):
+        markup = super().__new__(cls, content)
+        markup.encoding = encoding
+        return markup
+
+def declared_charset(content_type):
+    match = CHARSET_PATTERN.search(content_type or '')
+    return match.group(1) if match else None
+
+def page_markup(response):
+    """Body of a fetched page without decoding it to str first"""
+    return PageMarkup(response.content, declared_charset(response.headers.get('Content-Type', '')))
+
+SIMPLE_SELECTOR_PART_PATTERN = re.compile(r'([#.])([\w-]+)|\[([\w-]+)=([^\]]+)\]')
+
+def parse_simple_selector(selector):
+    """Split 'div#downloadb', '.movieplay' or 'meta[property=og:title]' into (name, id, classes, attrs)"""
+    name = re.match(r'[\w-]*', selector).group(0) or None
+    element_id, classes, attrs = None, set(), {}
+    for marker, value, attr, attr_value in SIMPLE_SELECTOR_PART_PATTERN.findall(selector[len(name or ''):]):
+        if marker == '#':
+            element_id = value
+        elif marker == '.':
+            classes.add(value)
+        else:
+            attrs[attr] = attr_value
+    return name, element_id, classes, attrs
+
+class SectionStrainer(SoupStrainer):
+    """parse_only filter keeping just the subtrees an extractor reads.
+
+    Tags matching one of the simple selectors are built with everything inside them;
+    all other markup (navigation, sidebars, comments) never becomes a Tag.
+    """
+
+    def __init__(self, *selectors):
+        super().__init__()
+        self.selectors = selectors
+        self.sections = [parse_simple_selector(selector) for selector in selectors]
+
+    def matches_section(self, name, attrs):
+        attrs = attrs or {}
+        for section_name, element_id, classes, section_attrs in self.sections:
+            if section_name and section_name != name:
+                continue
+            if element_id and attrs.get('id') != element_id:
+                continue
+            if classes:
+                tag_classes = attrs.get('class') or ''
+                if isinstance(tag_classes, str):
+                    tag_classes = tag_classes.split()
+                if not classes.issubset(tag_classes):
+                    continue
+            if any(attrs.get(key) != value for key, value in section_attrs.items()):
+                continue
+            return True
+        return False
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.matches_section(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        # Used instead of allow_tag_creation by BeautifulSoup < 4.13
+        return self.matches_section(markup_name, markup_attrs)
+
+    def __repr__(self):
+        return f"SectionStrainer{self.selectors}"
+
+# Sections each extractor reads; the rest of the page is skipped while parsing
+EPISODE_PAGE_SECTIONS = SectionStrainer(
+    'div.list-title', 'meta[property=og:title]', 'h2', '.movieplay', 'div.player-modes', 'div#downloadb', 'script'
+)
+GENRE_CONTENT_SECTIONS = SectionStrainer('div.movies-list', 'div#pagination')
+CHAPTER_PAGE_SECTIONS = SectionStrainer(
+    'h1.entry-title', 'div.chapter-desc', 'div.chapter-image', 'div.navig', 'div.listeps'
+)
+HOSTER_PAGE_SECTIONS = SectionStrainer('video', 'iframe', 'script')
+
+def make_soup(markup, parser='html.parser', sections=None):
+    """Parse HTML with the given backend unless it is already a parsed document.
+
+    sections (a SectionStrainer) limits parsing to the subtrees an extractor needs;
+    html5lib cannot parse partially and always builds the full tree.
+    """
+    if isinstance(markup, BeautifulSoup):
+        return markup
+    parse_only = sections if parser != 'html5lib' else None
+    if isinstance(markup, PageMarkup):
+        return BeautifulSoup(markup, parser, from_encoding=markup.encoding, parse_only=parse_only)
+    return BeautifulSoup(markup, parser, parse_only=parse_only)
+
+class PageDocumentCache:
+    """Short-lived cache of parsed pages shared by every extractor reading the same URL.
+
+    The homepage feeds both top anime and genres, and /komik-terbaru/ feeds both the
+    first latest-comics page and popular comics. Documents are only read by the
+    parse_* methods, so one parsed tree can be handed to several threads at once.
+    """
+
+    def __init__(self, ttl=PAGE_DOCUMENT_TTL, max_entries=PAGE_DOCUMENT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._documents = OrderedDict()
+        self._flights = SingleFlight()
+        self._lock = Lock()
+        self._stats = {
+            'hits': 0,
+            'fetches': 0
+        }
+
+    def _cached(self, key):
+        with self._lock:
+            cached = self._documents.get(key)
+            if cached is None:
+                return None
+            document, expires_at = cached
+            if time.monotonic() >= expires_at:
+                del self._documents[key]
+                return None
+            self._documents.move_to_end(key)
+            self._stats['hits'] += 1
+            return document
+
+    def _store(self, key, html, parse):
+        if not html:
+            return None
+        document = parse(html)
+        with self._lock:
+            self._stats['fetches'] += 1
+            self._documents[key] = (document, time.monotonic() + self.ttl)
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+        return document
+
+    def get(self, url, fetch, parse):
+        """Return the parsed document for url, calling parse(fetch(url)) on a miss"""
+        key = canonical_page_url(url)
+        document = self._cached(key)
+        if document is not None:
+            return document
+        return self._flights.do(key, lambda: self._cached(key) or self._store(key, fetch(url), parse))
+
+    async def get_async(self, url, fetch, parse):
+        key = canonical_page_url(url)
+        document = self._cached(key)
+        if document is not None:
+            return document
+
+        async def load():
+            return self._cached(key) or self._store(key, await fetch(url), parse)
+
+        return await self._flights.do_async(key, load)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def info(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._documents), ttl=self.ttl)
+
+page_documents = PageDocumentCache()
+
+def collect_cache_metrics():
+    """Expose the cache and coalescing counters the caches already keep"""
+    for cache_name, cache in (('response', response_cache), ('stream', stream_cache)):
+        info = cache.info()
+        for event in ('hits', 'stale_hits', 'misses', 'evictions', 'refreshes', 'refresh_failures'):
+            yield 'cache_events_total', {'cache': cache_name, 'event': event}, info[event]
+        yield 'cache_entries', {'cache': cache_name}, info['entries']
+        yield 'cache_bytes', {'cache': cache_name}, info['bytes']
+    documents = page_documents.info()
+    yield 'cache_events_total', {'cache': 'page_documents', 'event': 'hits'}, documents['hits']
+    yield 'cache_events_total', {'cache': 'page_documents', 'event': 'misses'}, documents['fetches']
+    yield 'cache_entries', {'cache': 'page_documents'}, documents['entries']
+    flights = scrape_flights.info()
+    for event in ('calls', 'executions', 'merged_callers'):
+        yield 'coalesced_calls_total', {'event': event}, flights[event]
+    yield 'coalesced_in_flight', {}, flights['in_flight']
+
+metrics.add_collector(collect_cache_metrics)
+
+# /image-proxy: comic images served from a size-bounded on-disk cache shared by all workers on the host
+IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'aniwantv-image-cache')
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+IMAGE_CACHE_MAX_FILE_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_FILE_BYTES', 20 * 1024 * 1024))
+IMAGE_CACHE_TTL = int(os.environ.get('IMAGE_CACHE_TTL', 7 * 86400))  # chapter images never change once uploaded
+IMAGE_PROXY_TIMEOUT = float(os.environ.get('IMAGE_PROXY_TIMEOUT', 20))
+IMAGE_CHUNK_BYTES = 64 * 1024
+IMAGE_EVICT_GRACE_SECONDS = 60  # images looked up this recently are never evicted, so a worker can still open what it just found
+# Only these hosts (and their subdomains) are proxied, so /image-proxy is not an open proxy
+IMAGE_PROXY_HOSTS = tuple(
+    host.strip().lower() for host in os.environ.get('IMAGE_PROXY_HOSTS', 'komikindo.ch,i0.wp.com,i1.wp.com,i2.wp.com,i3.wp.com').split(',')
+    if host.strip()
+)
+IMAGE_PROXY_REWRITE = os.environ.get('IMAGE_PROXY_REWRITE', '').lower() in ('1', 'true')  # /chapter-images default for ?proxy_images=
+IMAGE_PROXY_BASE_URL = os.environ.get('IMAGE_PROXY_BASE_URL', '').rstrip('/')  # public API URL when behind a proxy; defaults to the request's host
+
+def image_proxy_allowed(url):
+    parsed = urllib.parse.urlsplit(url)
+    host = (parsed.hostname or '').lower()
+    return parsed.scheme in ('http', 'https') and any(host == allowed or host.endswith('.' + allowed) for allowed in IMAGE_PROXY_HOSTS)
+
+class ImageFetchError(Exception):
+    """The image proxy could not get an image; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=502):
+        super().__init__(message)
+        self.status = status
+
+class ImageDownload:
+    """One image being written into the cache under a temporary name"""
+
+    def __init__(self, cache, url):
+        self.cache = cache
+        self.url = url
+        self.body_path, self.meta_path = cache.paths(url)
+        self.tmp_path = f"{self.body_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        self.file = open(self.tmp_path, 'wb')
+        self.size = 0
+
+    def check(self, status_code, content_type):
+        if status_code == 404:
+            raise ImageFetchError("Image not found upstream", status=404)
+        if status_code >= 400:
+            raise ImageFetchError(f"Upstream answered {status_code}")
+        if status_code >= 300:
+            raise ImageFetchError(f"Upstream redirected ({status_code}), not following it")
+        if not content_type.lower().startswith('image/'):
+            raise ImageFetchError(f"Upstream did not return an image ({content_type or 'no Content-Type'})")
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.cache.max_file_bytes:
+            raise ImageFetchError(f"Image is larger than {self.cache.max_file_bytes} bytes")
+        try:
+            self.file.write(chunk)
+        except OSError as e:
+            raise ImageFetchError(f"Could not store image: {e}")
+
+    def commit(self, content_type):
+        """Move the finished download into place and return (path, meta)"""
+        meta = {'url': self.url, 'content_type': content_type, 'size': self.size, 'fetched_at': time.time()}
+        try:
+            self.file.close()
+            with open(self.tmp_path + '.meta', 'w') as f:
+                json.dump(meta, f)
+            os.replace(self.tmp_path, self.body_path)
+            os.replace(self.tmp_path + '.meta', self.meta_path)
+        except OSError as e:
+            raise ImageFetchError(f"Could not store image: {e}")
+        self.cache.stored(self.size)
+        return self.body_path, meta
+
+    def discard(self):
+        self.file.close()
+        for path in (self.tmp_path, self.tmp_path + '.meta'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class ImageDiskCache:
+    """Size-bounded on-disk image cache, shared by every worker process on the host.
+
+    Each image is a body file named by the SHA-256 of its URL plus a small .meta JSON file.
+    Downloads are written to a temporary file and renamed into place, so readers never see a
+    partial image, and they go to disk chunk by chunk instead of being held in memory. Once
+    the directory passes max_bytes, the least recently used images (by .meta mtime, touched
+    on every hit) are deleted until it is back under 90%, except those used in the last
+    IMAGE_EVICT_GRACE_SECONDS, which another worker may be about to send.
+    Disk errors surface as ImageFetchError (502).
+    """
+
+    def __init__(self, directory, max_bytes, max_file_bytes, ttl):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.ttl = ttl
+        self._lock = Lock()
+        self._bytes = None  # this process's estimate, rescanned from disk when it passes max_bytes
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'errors': 0}
+
+    def paths(self, url):
+        body_path = os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest())
+        return body_path, body_path + '.meta'
+
+    def _count(self, event):
+        with self._lock:
+            self._stats[event] += 1
+
+    def lookup(self, url):
+        """Return (path, meta) for a fresh cached image, or None"""
+        body_path, meta_path = self.paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['fetched_at'] + self.ttl > time.time() and os.path.exists(body_path):
+                os.utime(meta_path)  # recency for eviction; the body's mtime stays put for Last-Modified/ETag
+                self._count('hits')
+                return body_path, meta
+        except (OSError, ValueError, KeyError):
+            pass
+        self._count('misses')
+        return None
+
+    def download(self, url):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            return ImageDownload(self, url)
+        except OSError as e:
+            self._count('errors')
+            raise ImageFetchError(f"Could not store image: {e}")
+
+    def fetch(self, url, headers):
+        """Download url into the cache through http_pool and return (path, meta)"""
+        download = self.download(url)
+        try:
+            # Redirects are not followed: image_proxy_allowed() only vetted this URL's host
+            response = http_pool.get(url, headers=headers, stream=True, timeout=IMAGE_PROXY_TIMEOUT, allow_redirects=False)
+            try:
+                content_type = response.headers.get('Content-Type', '')
+                download.check(response.status_code, content_type)
+                for chunk in response.iter_content(IMAGE_CHUNK_BYTES):
+                    download.write(chunk)
+            finally:
+                response.close()
+            return download.commit(content_type)
+        except requests.exceptions.RequestException as e:
+            self._count('errors')
+            raise ImageFetchError(f"Could not fetch image: {e}")
+        except ImageFetchError:
+            self._count('errors')
+            raise
+        finally:
+            download.discard()
+
+    async def fetch_async(self, url, headers):
+        """fetch() through async_http_pool, writing chunks to disk as they arrive"""
+        download = self.download(url)
+        try:
+            response = await async_http_pool.get(url, headers=headers, timeout=IMAGE_PROXY_TIMEOUT, allow_redirects=False,
+                                                 check=download.check, sink=download.write)
+            return download.commit(response.headers.get('Content-Type', ''))
+        except ASYNC_FETCH_ERRORS as e:
+            self._count('errors')
+            raise ImageFetchError(f"Could not fetch image: {e}")
+        except ImageFetchError:
+            self._count('errors')
+            raise
+        finally:
+            download.discard()
+
+    def stored(self, size):
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += size
+            if self._bytes is None or self._bytes > self.max_bytes:
+                try:
+                    self._bytes = self._evict()
+                except OSError as e:
+                    logger.error(f"Image cache eviction failed: {e}")
+
+    def _evict(self):
+        """Rescan the directory, delete least recently used images down to 90% of max_bytes and return the bytes left"""
+        images = []
+        total = 0
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith('.tmp'):
+                    if entry.stat().st_mtime < now - 3600:  # left behind by a killed worker
+                        os.remove(entry.path)
+                    continue
+                if entry.name.endswith('.meta'):
+                    continue
+                size = entry.stat().st_size
+                try:
+                    last_used = os.stat(entry.path + '.meta').st_mtime
+                except OSError:
+                    last_used = 0
+            except OSError:
+                continue
+            images.append((last_used, entry.path, size))
+            total += size
+        if total <= self.max_bytes:
+            return total
+        images.sort()
+        for last_used, path, size in images:
+            if total <= self.max_bytes * 0.9 or last_used > now - IMAGE_EVICT_GRACE_SECONDS:
+                break
+            for stale in (path + '.meta', path):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+            self._stats['evictions'] += 1
+        return total
+
+    def info(self):
+        with self._lock:
+            return dict(self._stats, directory=self.directory, bytes=self._bytes, max_bytes=self.max_bytes)
+
+image_cache = ImageDiskCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES, IMAGE_CACHE_MAX_FILE_BYTES, IMAGE_CACHE_TTL)
+
+def collect_image_cache_metrics():
+    info = image_cache.info()
+    for event in ('hits', 'misses', 'evictions', 'errors'):
+        yield 'cache_events_total', {'cache': 'images', 'event': event}, info[event]
+    if info['bytes'] is not None:
+        yield 'cache_bytes', {'cache': 'images'}, info['bytes']
+
+metrics.add_collector(collect_image_cache_metrics)
+
+# Media detection shared by the hoster resolvers
+STREAM_CONTENT_TYPES = ('video', 'application/vnd.apple.mpegurl', 'application/octet-stream')
+DIRECT_SOURCE_TYPES = ('video/mp4', 'application/vnd.apple.mpegurl')
+MEDIA_URL_PATTERN = re.compile(r'(https?://[^\s\'\"]+\.(mp4|m3u8))')
+QUOTED_MEDIA_URL_PATTERN = re.compile(r'["\']([^"\'\']+\.(mp4|m3u8))["\']')
+
+# Download hosts recognised in episode pages, checked in order against the link text and URL
+HOSTER_MARKERS = (
+    ('filemoon', 'filemoon'),
+    ('vidhidepro', 'vidhidepro'),
+    ('krakenfiles', 'krakenfiles'),
+    ('mega', 'mega.'),
+    ('pixeldrain', 'pixeldrain'),
+    ('hellabyte', 'hellabyte'),
+    ('buzzheavier', 'buzzheavier'),
+)
+# Hellabyte biasanya direct link, Buzzheavier sementara gunakan direct
+DIRECT_LINK_HOSTERS = ('hellabyte', 'buzzheavier')
+
+# Upstream fan-out for get_episode_streams
+RESOLVER_WORKERS = int(os.environ.get('RESOLVER_WORKERS', 8))  # concurrent resolve_*_url calls per process
+EPISODE_RESOLVE_DEADLINE = float(os.environ.get('EPISODE_RESOLVE_DEADLINE', 12))  # seconds per /episode-streams call
+AJAX_WORKERS = int(os.environ.get('AJAX_WORKERS', 8))  # concurrent admin-ajax.php player lookups per process
+AJAX_TIMEOUT = float(os.environ.get('AJAX_TIMEOUT', 8))  # seconds per player lookup
+
+# Lazy resolution: /episode-streams?resolve=lazy hands out signed tokens instead of resolving every
+# download link, and /resolve turns one token into a direct URL when the viewer picks that link
+EPISODE_RESOLVE_MODE = os.environ.get('EPISODE_RESOLVE_MODE', 'eager')  # default when ?resolve= is absent
+RESOLVE_TOKEN_TTL = int(os.environ.get('RESOLVE_TOKEN_TTL', 6 * 3600))
+RESOLVE_TOKEN_SECRET = os.environ.get('RESOLVE_TOKEN_SECRET', '').encode()
+if not RESOLVE_TOKEN_SECRET:
+    # Tokens then only verify in the process that issued them; gunicorn.conf.py sets a shared secret
+    RESOLVE_TOKEN_SECRET = secrets.token_bytes(32)
+
+def _token_b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+def _token_unb64(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def make_resolve_token(quality, host, download_url, now=None):
+    """Sign a download link so /resolve will fetch it; /resolve never touches URLs it did not hand out"""
+    expires = int((now or time.time()) + RESOLVE_TOKEN_TTL)
+    payload = json.dumps([quality, host, download_url, expires], separators=(',', ':')).encode()
+    signature = hmac.new(RESOLVE_TOKEN_SECRET, payload, hashlib.sha256).digest()[:16]
+    return f"{_token_b64(payload)}.{_token_b64(signature)}"
+
+def read_resolve_token(token, now=None):
+    """Return (quality, host, download_url) from a token, raising ValueError if it is forged, malformed or expired"""
+    try:
+        payload_text, signature_text = token.split('.')
+        payload = _token_unb64(payload_text)
+        signature = _token_unb64(signature_text)
+    except (ValueError, AttributeError):
+        raise ValueError("Malformed resolve token")
+    if not hmac.compare_digest(signature, hmac.new(RESOLVE_TOKEN_SECRET, payload, hashlib.sha256).digest()[:16]):
+        raise ValueError("Invalid resolve token")
+    quality, host, download_url, expires = json.loads(payload)
+    if expires < (now or time.time()):
+        raise ValueError("Resolve token expired, fetch the episode again")
+    return quality, host, download_url
+
+# Release schedule: all days are fetched at once and each day is cached until the schedule
+# rolls over at midnight WIB (capped, so upstream corrections still show up the same day)
+WIB = timezone(timedelta(hours=7), 'WIB')
+SCHEDULE_WORKERS = int(os.environ.get('SCHEDULE_WORKERS', 7))
+SCHEDULE_MAX_TTL = int(os.environ.get('SCHEDULE_MAX_TTL', 3600))
+SCHEDULE_EMPTY_TTL = int(os.environ.get('SCHEDULE_EMPTY_TTL', 60))  # days with no entries (or a failed API call) are retried sooner
+
+def seconds_until_schedule_rollover(now=None):
+    """Seconds until the next midnight in WIB, when winbu.tv's active schedule day changes"""
+    now = now or datetime.now(WIB)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+def schedule_ttl(day_schedule):
+    if not day_schedule:
+        return SCHEDULE_EMPTY_TTL
+    return max(1, min(SCHEDULE_MAX_TTL, seconds_until_schedule_rollover()))
+
+_executors = {}
+_executors_lock = Lock()
+
+def shared_executor(name, max_workers):
+    """Return the named shared thread pool, created on first use so forked workers get their own"""
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return _executors[name]
+
+# ?pages=1-5 on the paginated listings fetches a page range concurrently and merges it
+PAGE_RANGE_MAX = int(os.environ.get('PAGE_RANGE_MAX', 10))  # pages one request may ask for
+PAGE_RANGE_WORKERS = int(os.environ.get('PAGE_RANGE_WORKERS', 6))  # listing pages fetched at once
+
+def parse_page_range(value):
+    """Parse ?pages=3 or ?pages=1-5 into a list of page numbers (None when absent), raising ValueError for the client"""
+    if value is None or not value.strip():
+        return None
+    match = re.fullmatch(r'\s*(\d+)\s*(?:-\s*(\d+)\s*)?', value)
+    if not match:
+        raise ValueError("'pages' must be a page number or a range like 1-5")
+    first = int(match.group(1))
+    last = int(match.group(2) or first)
+    if first < 1 or last < first:
+        raise ValueError("'pages' must be an ascending range starting at 1 or later")
+    if last - first + 1 > PAGE_RANGE_MAX:
+        raise ValueError(f"At most {PAGE_RANGE_MAX} pages per request")
+    return list(range(first, last + 1))
+
+def merge_page_results(results, list_key, pages):
+    """Concatenate listing pages in page order, dropping items already listed on an earlier page.
+
+    Items shift between pages while the site publishes, so the same title can show up twice
+    in a range. current_page is the last page fetched, so clients continue from current_page + 1.
+    """
+    items = []
+    seen_urls = set()
+    total_pages = 1
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        for item in result.get(list_key) or []:
+            url = item.get('url')
+            if url:
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+            items.append(item)
+        total_pages = max(total_pages, result.get('total_pages') or 1)
+    return {
+        list_key: items,
+        'current_page': pages[-1],
+        'pages': pages,
+        'total_pages': total_pages
+    }
+
+def fetch_page_range(fetch_page, pages, list_key):
+    """Fetch every page with fetch_page(page) on the shared 'pages' pool and merge them"""
+    executor = shared_executor('pages', PAGE_RANGE_WORKERS)
+    futures = [submit_traced(executor, fetch_page, page) for page in pages]
+    return merge_page_results([future.result() for future in futures], list_key, pages)
+
+async def fetch_page_range_async(fetch_page, pages, list_key):
+    """fetch_page_range for coroutine fetchers, at most PAGE_RANGE_WORKERS pages in flight"""
+    semaphore = asyncio.Semaphore(PAGE_RANGE_WORKERS)
+
+    async def fetch(page):
+        async with semaphore:
+            return await fetch_page(page)
+
+    return merge_page_results(await asyncio.gather(*(fetch(page) for page in pages)), list_key, pages)
+
+class EpisodeStreamProgress:
+    """Results of one episode's player lookups and download resolutions as they arrive.
+
+    Used by the streaming /episode-streams mode: each finished lookup becomes an event
+    record right away, and summary() assembles the same data get_episode_streams returns.
+    """
+
+    def __init__(self, scraper, page, lazy=False):
+        self.scraper = scraper
+        self.page = page
+        self.lazy = lazy
+        self.jobs = scraper.download_link_jobs(page)
+        self.stream_url = None
+        self.ajax_urls = [None] * len(page['ajax_requests'])
+        self.resolved_urls = scraper.cached_download_urls(page) if lazy else [None] * len(self.jobs)
+
+    def episode(self):
+        download_links = {}
+        for section in self.page['download_sections']:
+            download_links[section['quality']] = [
+                {'host': link['host'], 'url': link['url']} for link in section['links'] if link['url']
+            ]
+        if self.lazy:
+            self.scraper.attach_resolve_tokens(download_links, self.jobs, self.resolved_urls)
+        return {
+            'title': self.page['title'],
+            'download_links': download_links,
+            'player_options': self.page['player_options']
+        }
+
+    def ajax_stream(self, index, ajax_url):
+        self.ajax_urls[index] = ajax_url
+        if ajax_url:
+            return {'player': self.page['ajax_requests'][index]['player'], 'url': ajax_url}
+        return None
+
+    def direct_stream(self, index, direct_url):
+        self.resolved_urls[index] = direct_url
+        if direct_url:
+            quality, host, _, _ = self.jobs[index]
+            return {'quality': quality, 'host': host if host else 'Unknown', 'url': direct_url}
+        return None
+
+    def summary(self, pending_indexes):
+        ajax_stream_urls = self.scraper.collect_ajax_stream_urls(self.page['ajax_requests'], self.ajax_urls)
+        stream_url = self.stream_url or (ajax_stream_urls[0]['url'] if ajax_stream_urls else None)
+        episode_data = self.scraper.build_episode_data(self.page, stream_url, ajax_stream_urls, self.resolved_urls)
+        if self.lazy:
+            self.scraper.attach_resolve_tokens(episode_data['download_links'], self.jobs, self.resolved_urls)
+        episode_data['pending_resolutions'] = [
+            self.scraper.pending_resolution(quality, host, download_url)
+            for quality, host, download_url, _ in (self.jobs[index] for index in sorted(pending_indexes))
+        ]
+        episode_data['skipped_hosters'] = self.scraper.skipped_hosters(self.page)
+        return episode_data
+
+class WinbuScraper:
+    def __init__(self, http=None, html_parser=None):
+        self.base_url = os.environ.get('WINBU_BASE_URL', "https://winbu.tv").rstrip('/')
+        self.http = http or http_pool
+        self.html_parser = resolve_html_parser(html_parser or os.environ.get('WINBU_HTML_PARSER', HTML_PARSER))
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-            'Referer': 'https://winbu.tv/'
+            'Referer': f'{self.base_url}/'
         }
 
     def get_page(self, url):
@@ -82,12 +2303,16 @@ class WinbuScraper:
 
         for attempt in range(max_retries):
             try:
-                response = requests.get(url, headers=self.headers, timeout=10)
+                response = self.http.get(url, headers=self.headers, timeout=10)
                 response.raise_for_status()
-                return response.text
+                return page_markup(response)
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                logger.warning(f"Not fetching {url}: {e}")
+                return None
             except requests.exceptions.RequestException as e:
                 logger.error(f"Error fetching {url}: {e}")
                 if attempt < max_retries - 1:
+                    metrics.inc('upstream_retries_total', host=host_of(url))
                     logger.info(f"Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
                     retry_delay *= 2
@@ -95,6 +2320,76 @@ class WinbuScraper:
                     logger.error(f"Failed to fetch {url} after {max_retries} Wattempts")
                     return None
 
+    def get_document(self, url):
+        """Fetch and parse a page through the shared page document cache"""
+        return page_documents.get(url, self.get_page, self.soup)
+
+    def soup(self, markup, sections=None):
+        """Parse a fetched page with this scraper's configured parser backend"""
+        return make_soup(markup, self.html_parser, sections)
+
+    def is_stream_content_type(self, content_type):
+        """Check whether a Content-Type header points to playable media"""
+        return any(stream_type in content_type for stream_type in STREAM_CONTENT_TYPES)
+
+    def check_stream_url(self, stream_url):
+        """HEAD a candidate stream URL and return its Content-Type if it is playable media, else None"""
+        response = self.http.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
+        content_type = response.headers.get('Content-Type', '').lower()
+        if self.is_stream_content_type(content_type):
+            return content_type
+        logger.warning(f"Invalid Content-Type for {stream_url}: {content_type}")
+        return None
+
+    def find_video_source(self, soup):
+        """Return (src, type) of the first <video><source> tag, or (None, None)"""
+        video_tag = soup.find('video')
+        if video_tag:
+            source = video_tag.find('source')
+            if source and source.get('src'):
+                return source['src'], source.get('type', '').lower()
+        return None, None
+
+    def find_script_stream_urls(self, soup):
+        """Return the first .mp4/.m3u8 URL found in each inline script, in document order"""
+        candidates = []
+        for script in soup.find_all('script'):
+            if script.string:
+                matches = MEDIA_URL_PATTERN.findall(script.string)
+                if matches:
+                    candidates.append(matches[0][0])
+        return candidates
+
+    def resolve_video_tag(self, soup, label):
+        """Resolve a <video><source> tag, verifying its Content-Type when the tag does not declare one"""
+        stream_url, source_type = self.find_video_source(soup)
+        if not stream_url:
+            return None
+        if source_type in DIRECT_SOURCE_TYPES:
+            logger.info(f"Found {label} video source: {stream_url}")
+            return stream_url
+        content_type = self.check_stream_url(stream_url)
+        if content_type:
+            logger.info(f"Found {label} video source (Content-Type: {content_type}): {stream_url}")
+            return stream_url
+        return None
+
+    def resolve_script_urls(self, soup, label):
+        """Return the first script-embedded media URL that answers with a playable Content-Type"""
+        for stream_url in self.find_script_stream_urls(soup):
+            content_type = self.check_stream_url(stream_url)
+            if content_type:
+                logger.info(f"Found {label} stream URL in script (Content-Type: {content_type}): {stream_url}")
+                return stream_url
+        return None
+
+    def find_krakenfiles_embed(self, soup):
+        """Return the Krakenfiles embed-video iframe URL, if any"""
+        embed_iframe = soup.find('iframe', src=re.compile(r'https?://krakenfiles\.com/embed-video'))
+        if embed_iframe and embed_iframe.get('src'):
+            return embed_iframe['src']
+        return None
+
     def resolve_krakenfiles_url(self, url):
         """Extract direct stream URL in .mp4 or .m3u8 format from Krakenfiles link"""
         try:
@@ -103,78 +2398,28 @@ class WinbuScraper:
                 logger.warning(f"Failed to fetch Krakenfiles page: {url}")
                 return None
 
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = self.soup(html, HOSTER_PAGE_SECTIONS)
 
             # Cari tag <video> dan <source>
-            video_tag = soup.find('video')
-            if video_tag:
-                source = video_tag.find('source')
-                if source and source.get('src'):
-                    stream_url = source['src']
-                    # Periksa tipe dari tag <source>
-                    source_type = source.get('type', '').lower()
-                    if source_type == 'video/mp4' or source_type == 'application/vnd.apple.mpegurl':
-                        logger.info(f"Found Krakenfiles video source: {stream_url}")
-                        return stream_url
-                    # Verifikasi Content-Type sebagai cadangan
-                    response = requests.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'application/octet-stream' in content_type:
-                        logger.info(f"Found Krakenfiles video source (Content-Type: {content_type}): {stream_url}")
-                        return stream_url
-                    logger.warning(f"Invalid Content-Type for Krakenfiles video source: {content_type}")
+            stream_url = self.resolve_video_tag(soup, 'Krakenfiles')
+            if stream_url:
+                return stream_url
 
             # Cari iframe embed
-            embed_iframe = soup.find('iframe', src=re.compile(r'https?://krakenfiles\.com/embed-video'))
-            if embed_iframe and embed_iframe.get('src'):
-                embed_url = embed_iframe['src']
+            embed_url = self.find_krakenfiles_embed(soup)
+            if embed_url:
                 embed_html = self.get_page(embed_url)
                 if embed_html:
-                    embed_soup = BeautifulSoup(embed_html, 'html.parser')
-                    # Cari tag <video> di halaman embed
-                    embed_video_tag = embed_soup.find('video')
-                    if embed_video_tag:
-                        source = embed_video_tag.find('source')
-                        if source and source.get('src'):
-                            stream_url = source['src']
-                            source_type = source.get('type', '').lower()
-                            if source_type == 'video/mp4' or source_type == 'application/vnd.apple.mpegurl':
-                                logger.info(f"Found Krakenfiles embed video source: {stream_url}")
-                                return stream_url
-                            response = requests.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
-                            content_type = response.headers.get('Content-Type', '').lower()
-                            if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'application/octet-stream' in content_type:
-                                logger.info(f"Found Krakenfiles embed video source (Content-Type: {content_type}): {stream_url}")
-                                return stream_url
-                            logger.warning(f"Invalid Content-Type for Krakenfiles embed video source: {content_type}")
-
-                    # Cari URL di script pada halaman embed
-                    scripts = embed_soup.find_all('script')
-                    for script in scripts:
-                        if script.string:
-                            matches = re.findall(r'(https?://[^\s\'\"]+\.(mp4|m3u8))', script.string)
-                            if matches:
-                                stream_url = matches[0][0]
-                                response = requests.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
-                                content_type = response.headers.get('Content-Type', '').lower()
-                                if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'application/octet-stream' in content_type:
-                                    logger.info(f"Found Krakenfiles stream URL in embed script (Content-Type: {content_type}): {stream_url}")
-                                    return stream_url
-                                logger.warning(f"Invalid Content-Type for Krakenfiles embed script URL: {content_type}")
+                    embed_soup = self.soup(embed_html, HOSTER_PAGE_SECTIONS)
+                    # Cari tag <video> lalu URL di script pada halaman embed
+                    stream_url = self.resolve_video_tag(embed_soup, 'Krakenfiles embed') or self.resolve_script_urls(embed_soup, 'Krakenfiles embed')
+                    if stream_url:
+                        return stream_url
 
             # Cari URL di script pada halaman utama sebagai cadangan
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string:
-                    matches = re.findall(r'(https?://[^\s\'\"]+\.(mp4|m3u8))', script.string)
-                    if matches:
-                        stream_url = matches[0][0]
-                        response = requests.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
-                        content_type = response.headers.get('Content-Type', '').lower()
-                        if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'application/octet-stream' in content_type:
-                            logger.info(f"Found Krakenfiles stream URL in main page script (Content-Type: {content_type}): {stream_url}")
-                            return stream_url
-                        logger.warning(f"Invalid Content-Type for Krakenfiles main page script URL: {content_type}")
+            stream_url = self.resolve_script_urls(soup, 'Krakenfiles main page')
+            if stream_url:
+                return stream_url
 
             logger.warning(f"No .mp4 or .m3u8 URL found for Krakenfiles: {url}")
             return None
@@ -190,36 +2435,12 @@ class WinbuScraper:
                 logger.warning(f"Failed to fetch Mega page: {url}")
                 return None
 
-            soup = BeautifulSoup(html, 'html.parser')
-            video_tag = soup.find('video')
-            if video_tag:
-                source = video_tag.find('source')
-                if source and source.get('src'):
-                    stream_url = source['src']
-                    source_type = source.get('type', '').lower()
-                    if source_type == 'video/mp4' or source_type == 'application/vnd.apple.mpegurl':
-                        logger.info(f"Found Mega video source: {stream_url}")
-                        return stream_url
-                    response = requests.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'application/octet-stream' in content_type:
-                        logger.info(f"Found Mega video source (Content-Type: {content_type}): {stream_url}")
-                        return stream_url
-                    logger.warning(f"Invalid Content-Type for Mega video source: {content_type}")
+            soup = self.soup(html, HOSTER_PAGE_SECTIONS)
 
-            # Cari URL streaming di script
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string:
-                    matches = re.findall(r'(https?://[^\s\'\"]+\.(mp4|m3u8))', script.string)
-                    if matches:
-                        stream_url = matches[0][0]
-                        response = requests.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
-                        content_type = response.headers.get('Content-Type', '').lower()
-                        if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'application/octet-stream' in content_type:
-                            logger.info(f"Found Mega direct URL in script (Content-Type: {content_type}): {stream_url}")
-                            return stream_url
-                        logger.warning(f"Invalid Content-Type for Mega script URL: {content_type}")
+            # Cari tag <video> lalu URL streaming di script
+            stream_url = self.resolve_video_tag(soup, 'Mega') or self.resolve_script_urls(soup, 'Mega')
+            if stream_url:
+                return stream_url
 
             logger.warning(f"No .mp4 or .m3u8 URL found for Mega: {url}")
             return None
@@ -227,22 +2448,32 @@ class WinbuScraper:
             logger.error(f"Error resolving Mega URL {url}: {e}")
             return None
 
+    def pixeldrain_api_url(self, url):
+        """Convert a pixeldrain.com/u/<id> share link to its API file URL, or None"""
+        if 'pixeldrain.com/u/' in url:
+            file_id = url.split('/u/')[-1].split('?')[0]
+            return f"https://pixeldrain.com/api/file/{file_id}"
+        return None
+
+    def check_pixeldrain_response(self, direct_url, status_code, content_type):
+        """Validate the HEAD response of a PixelDrain API file URL"""
+        if status_code == 200:
+            if self.is_stream_content_type(content_type):
+                logger.info(f"Found PixelDrain direct URL (Content-Type: {content_type}): {direct_url}")
+                return direct_url
+            logger.warning(f"PixelDrain URL not streamable: {direct_url} (Content-Type: {content_type})")
+        else:
+            logger.warning(f"Failed to access PixelDrain URL: {direct_url} (Status: {status_code})")
+        return None
+
     def resolve_pixeldrain_url(self, url):
         """Extract direct stream URL in .mp4 or .m3u8 format from PixelDrain link"""
         try:
-            if 'pixeldrain.com/u/' in url:
-                file_id = url.split('/u/')[-1].split('?')[0]
-                direct_url = f"https://pixeldrain.com/api/file/{file_id}"
-                response = requests.head(direct_url, headers=self.headers, allow_redirects=True, timeout=10)
-                if response.status_code == 200:
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    if 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type or 'application/octet-stream' in content_type:
-                        logger.info(f"Found PixelDrain direct URL (Content-Type: {content_type}): {direct_url}")
-                        return direct_url
-                    logger.warning(f"PixelDrain URL not streamable: {direct_url} (Content-Type: {content_type})")
-                else:
-                    logger.warning(f"Failed to access PixelDrain URL: {direct_url} (Status: {response.status_code})")
-                return None
+            direct_url = self.pixeldrain_api_url(url)
+            if direct_url:
+                response = self.http.head(direct_url, headers=self.headers, allow_redirects=True, timeout=10)
+                content_type = response.headers.get('Content-Type', '').lower()
+                return self.check_pixeldrain_response(direct_url, response.status_code, content_type)
             logger.warning(f"Invalid PixelDrain URL format: {url}")
             return None
         except Exception as e:
@@ -252,11 +2483,15 @@ class WinbuScraper:
     def get_top_anime(self):
         """Extract top anime list from homepage"""
         logger.info("Fetching top anime list...")
-        html = self.get_page(self.base_url)
-        if not html:
+        document = self.get_document(self.base_url)
+        if not document:
             return []
+        return self.parse_top_anime(document)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_top_anime(self, html):
+        """Parse the top anime list from homepage HTML (or its cached document)"""
+        soup = self.soup(html)
         top_anime_section = soup.find('div', class_='movies-list-wrap mlw-category')
 
         top_anime_list = []
@@ -296,20 +2531,25 @@ class WinbuScraper:
         logger.info(f"Found {len(top_anime_list)} top anime")
         return top_anime_list
 
+    def latest_anime_url(self, page):
+        return f"{self.base_url}/animedonghua/" if page == 1 else f"{self.base_url}/animedonghua/page/{page}/"
+
     def get_latest_anime(self, page=1):
         """Extract latest anime releases from homepage with pagination support"""
         logger.info(f"Fetching latest anime releases from page {page}...")
-        url = f"{self.base_url}/animedonghua/" if page == 1 else f"{self.base_url}/animedonghua/page/{page}/"
-
-        html = self.get_page(url)
+        html = self.get_page(self.latest_anime_url(page))
         if not html:
             return {
                 'anime_list': [],
                 'current_page': page,
                 'total_pages': 1
             }
+        return self.parse_latest_anime(html, page)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_latest_anime(self, html, page):
+        """Parse an /animedonghua/ listing page"""
+        soup = self.soup(html)
         latest_anime_list = []
 
         try:
@@ -391,8 +2631,12 @@ class WinbuScraper:
         if not html:
             logger.error("Failed to fetch page content")
             return {}
+        return self.parse_anime_details(html)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_anime_details(self, html):
+        """Parse an anime detail page"""
+        soup = self.soup(html)
 
         try:
             title = 'Unknown Title'
@@ -481,37 +2725,66 @@ class WinbuScraper:
             logger.error(f"Error extracting anime details: {e}")
             return {}
 
-    def get_ajax_stream_url(self, post_id, nume, stream_type="urliframe"):
+    def ajax_request_data(self, post_id, nume, stream_type):
+        """Build the admin-ajax.php form data for a player option"""
+        return {
+            'action': 'doo_player_ajax',
+            'post': post_id,
+            'nume': nume,
+            'type': stream_type
+        }
+
+    def parse_ajax_stream_response(self, status_code, text, post_id, nume):
+        """Extract the embed URL from an admin-ajax.php player response"""
+        if status_code == 200:
+            try:
+                json_response = json.loads(text)
+                if isinstance(json_response, dict) and 'embed_url' in json_response:
+                    embed_url = json_response['embed_url']
+                    logger.info(f"Found AJAX embed URL: {embed_url}")
+                    return embed_url
+            except json.JSONDecodeError:
+                # Sometimes the response is just the URL
+                if text.startswith('http'):
+                    logger.info(f"Found AJAX direct URL: {text}")
+                    return text.strip()
+
+        logger.warning(f"Failed to get AJAX stream URL for post {post_id}, nume {nume}")
+        return None
+
+    def get_ajax_stream_url(self, post_id, nume, stream_type="urliframe", timeout=10):
         """Get streaming URL from AJAX endpoint"""
         try:
             ajax_url = f"{self.base_url}/wp-admin/admin-ajax.php"
-            ajax_data = {
-                'action': 'doo_player_ajax',
-                'post': post_id,
-                'nume': nume,
-                'type': stream_type
-            }
-            
-            response = requests.post(ajax_url, data=ajax_data, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                try:
-                    json_response = response.json()
-                    if 'embed_url' in json_response:
-                        embed_url = json_response['embed_url']
-                        logger.info(f"Found AJAX embed URL: {embed_url}")
-                        return embed_url
-                except json.JSONDecodeError:
-                    # Sometimes the response is just the URL
-                    if response.text.startswith('http'):
-                        logger.info(f"Found AJAX direct URL: {response.text}")
-                        return response.text.strip()
-            
-            logger.warning(f"Failed to get AJAX stream URL for post {post_id}, nume {nume}")
-            return None
+            ajax_data = self.ajax_request_data(post_id, nume, stream_type)
+
+            with trace_span('ajax', nume=nume):
+                response = self.http.post(ajax_url, data=ajax_data, headers=self.headers, timeout=timeout)
+                return self.parse_ajax_stream_response(response.status_code, response.text, post_id, nume)
         except Exception as e:
             logger.error(f"Error getting AJAX stream URL: {e}")
             return None
 
+    @timed_parse
+    def parse_filemoon_page(self, html):
+        """Find the stream URL in a Filemoon page's player scripts"""
+        soup = self.soup(html, HOSTER_PAGE_SECTIONS)
+
+        # Cari script yang mengandung eval atau file URL
+        scripts = soup.find_all('script')
+        for script in scripts:
+            if script.string:
+                # Cari pattern untuk file URL
+                if 'eval(' in script.string or 'file:' in script.string:
+                    # Cari URL .mp4 atau .m3u8
+                    matches = QUOTED_MEDIA_URL_PATTERN.findall(script.string)
+                    if matches:
+                        stream_url = matches[0][0]
+                        if stream_url.startswith('http'):
+                            logger.info(f"Found Filemoon stream URL: {stream_url}")
+                            return stream_url
+        return None
+
     def resolve_filemoon_url(self, url):
         """Extract direct stream URL from Filemoon link"""
         try:
@@ -520,28 +2793,39 @@ class WinbuScraper:
                 logger.warning(f"Failed to fetch Filemoon page: {url}")
                 return None
 
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Cari script yang mengandung eval atau file URL
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string:
-                    # Cari pattern untuk file URL
-                    if 'eval(' in script.string or 'file:' in script.string:
-                        # Cari URL .mp4 atau .m3u8
-                        matches = re.findall(r'["\']([^"\'\']+\.(mp4|m3u8))["\']', script.string)
-                        if matches:
-                            stream_url = matches[0][0]
-                            if stream_url.startswith('http'):
-                                logger.info(f"Found Filemoon stream URL: {stream_url}")
-                                return stream_url
-            
+            stream_url = self.parse_filemoon_page(html)
+            if stream_url:
+                return stream_url
+
             logger.warning(f"No stream URL found for Filemoon: {url}")
             return None
         except Exception as e:
             logger.error(f"Error resolving Filemoon URL {url}: {e}")
             return None
 
+    @timed_parse
+    def parse_vidhidepro_page(self, html):
+        """Find the stream URL in a VidHidePro page's video tag or scripts"""
+        soup = self.soup(html, HOSTER_PAGE_SECTIONS)
+
+        # Cari tag video atau source
+        stream_url, _ = self.find_video_source(soup)
+        if stream_url:
+            logger.info(f"Found VidHidePro video source: {stream_url}")
+            return stream_url
+
+        # Cari di script
+        scripts = soup.find_all('script')
+        for script in scripts:
+            if script.string:
+                matches = QUOTED_MEDIA_URL_PATTERN.findall(script.string)
+                if matches:
+                    stream_url = matches[0][0]
+                    if stream_url.startswith('http'):
+                        logger.info(f"Found VidHidePro stream URL: {stream_url}")
+                        return stream_url
+        return None
+
     def resolve_vidhidepro_url(self, url):
         """Extract direct stream URL from VidHidePro link"""
         try:
@@ -550,245 +2834,511 @@ class WinbuScraper:
                 logger.warning(f"Failed to fetch VidHidePro page: {url}")
                 return None
 
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Cari tag video atau source
-            video_tag = soup.find('video')
-            if video_tag:
-                source = video_tag.find('source')
-                if source and source.get('src'):
-                    stream_url = source['src']
-                    logger.info(f"Found VidHidePro video source: {stream_url}")
-                    return stream_url
-            
-            # Cari di script
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string:
-                    matches = re.findall(r'["\']([^"\'\']+\.(mp4|m3u8))["\']', script.string)
-                    if matches:
-                        stream_url = matches[0][0]
-                        if stream_url.startswith('http'):
-                            logger.info(f"Found VidHidePro stream URL: {stream_url}")
-                            return stream_url
-            
+            stream_url = self.parse_vidhidepro_page(html)
+            if stream_url:
+                return stream_url
+
             logger.warning(f"No stream URL found for VidHidePro: {url}")
             return None
         except Exception as e:
             logger.error(f"Error resolving VidHidePro URL {url}: {e}")
             return None
 
-    def get_episode_streams(self, url):
-        """Extract streaming links for an episode, prioritizing .mp4 or .m3u8 formats with PixelDrain as the preferred host"""
-        logger.info(f"Fetching episode streams from {url}...")
-        html = self.get_page(url)
-        if not html:
-            return {}
+    @timed_parse
+    def parse_episode_page(self, html):
+        """Parse an episode page into its title, player options, download links and script URLs"""
+        soup = self.soup(html, EPISODE_PAGE_SECTIONS)
+
+        # Prioritize title from list-title section
+        title = 'Unknown Episode'
+        title_container = soup.find('div', class_='list-title')
+        if title_container:
+            title_element = title_container.find('h2')
+            if title_element:
+                title = title_element.text.strip()
+                logger.info(f"Title found in list-title: {title}")
+            else:
+                logger.warning("No <h2> found in list-title container")
+
+        # Fallback to meta og:title
+        if title == 'Unknown Episode':
+            meta_title = soup.find('meta', property='og:title')
+            if meta_title and meta_title.get('content'):
+                title = meta_title['content'].strip()
+                logger.info(f"Title found in meta og:title: {title}")
+
+        # Final fallback to first h2 with 'Episode' in text
+        if title == 'Unknown Episode':
+            title_element = soup.find('h2', string=lambda text: text and 'Episode' in text)
+            if title_element:
+                title = title_element.text.strip()
+                logger.info(f"Title found in h2 with Episode: {title}")
+
+        # Cari iframe stream URL dari movieplay
+        iframe_element = soup.select_one('.movieplay iframe')
+        iframe_src = iframe_element['src'] if iframe_element and iframe_element.get('src') else None
+
+        # Cari player options untuk AJAX requests
+        player_options = []
+        ajax_requests = []
+        player_section = soup.find('div', class_='player-modes')
+        if player_section:
+            option_elements = player_section.select('.east_player_option')
+            for option in option_elements:
+                option_text = option.find('span')
+                if option_text:
+                    player_name = option_text.text.strip()
+                    player_options.append(player_name)
+
+                    # Ambil data untuk AJAX request
+                    post_id = option.get('data-post')
+                    nume = option.get('data-nume')
+                    stream_type = option.get('data-type', 'urliframe')
+
+                    if post_id and nume:
+                        ajax_requests.append({
+                            'player': player_name,
+                            'post_id': post_id,
+                            'nume': nume,
+                            'type': stream_type
+                        })
+
+        # Kumpulkan link download per kualitas
+        download_sections = []
+        download_section = soup.find('div', id='downloadb')
+        if download_section:
+            quality_sections = download_section.find_all('li')
+
+            for section in quality_sections:
+                quality_text = section.find('strong')
+                if not quality_text:
+                    continue
+
+                quality = quality_text.text.strip()
+                links = []
+                for link in section.find_all('a'):
+                    links.append({
+                        'host': link.text.strip(),
+                        'url': link.get('href', '')
+                    })
+                download_sections.append({
+                    'quality': quality,
+                    'links': links
+                })
+
+        # Cari URL tambahan di script
+        script_urls = []
+        scripts = soup.find_all('script')
+        for script in scripts:
+            if script.string:
+                matches = MEDIA_URL_PATTERN.findall(script.string)
+                for match in matches:
+                    script_urls.append(match[0])
 
-        soup = BeautifulSoup(html, 'html.parser')
+        return {
+            'title': title,
+            'iframe_src': iframe_src,
+            'player_options': player_options,
+            'ajax_requests': ajax_requests,
+            'download_sections': download_sections,
+            'script_urls': script_urls
+        }
 
+    def check_iframe_response(self, final_url, content_type):
+        """Accept the movieplay iframe as the stream URL if it redirects to playable media"""
+        if final_url.endswith(('.mp4', '.m3u8')) or 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type:
+            logger.info(f"Found iframe stream URL: {final_url}")
+            return final_url
+        return None
+
+    def resolve_iframe_stream(self, iframe_src):
+        """Follow the movieplay iframe and return it if it serves media directly"""
+        response = self.http.head(iframe_src, headers=self.headers, allow_redirects=True, timeout=10)
+        content_type = response.headers.get('Content-Type', '').lower()
+        return self.check_iframe_response(response.url, content_type)
+
+    def classify_download_host(self, host, download_url):
+        """Map a download link to the resolver key used by resolve_download_url, or None"""
+        host = host.lower()
+        download_url = download_url.lower()
+        for key, marker in HOSTER_MARKERS:
+            if marker in host or marker in download_url:
+                return key
+        return None
+
+    def resolve_download_url(self, host, download_url):
+        """Resolve a download link to a direct stream URL using the matching resolve_<hoster>_url method"""
+        hoster = self.classify_download_host(host, download_url)
+        if hoster in DIRECT_LINK_HOSTERS:
+            return download_url
+        if not hoster:
+            return None
+        state, direct_url = stream_cache.lookup((hoster, download_url))
+        if state == 'fresh':
+            return direct_url
+        if not hoster_breakers.allow(hoster):
+            logger.warning(f"Skipping {hoster} link, circuit breaker open: {download_url}")
+            return None
+        start = time.perf_counter()
+        failures = []
+        token = upstream_failures.set(failures)
         try:
-            # Prioritize title from list-title section
-            title = 'Unknown Episode'
-            title_container = soup.find('div', class_='list-title')
-            if title_container:
-                title_element = title_container.find('h2')
-                if title_element:
-                    title = title_element.text.strip()
-                    logger.info(f"Title found in list-title: {title}")
-                else:
-                    logger.warning("No <h2> found in list-title container")
+            with trace_span(f"resolve:{hoster}", url=download_url):
+                direct_url = getattr(self, f"resolve_{hoster}_url")(download_url)
+        except Exception:
+            hoster_breakers.record(hoster, failed=True)
+            raise
+        finally:
+            upstream_failures.reset(token)
+        # Only upstream errors, timeouts, 5xx and 429s count against the hoster. A page without
+        # a stream URL (removed file, markup the resolver does not know) says nothing about its health
+        hoster_breakers.record(hoster, failed=bool(failures) and not direct_url)
+        record_resolution(hoster, direct_url, time.perf_counter() - start)
+        stream_cache.set((hoster, download_url), direct_url, stream_cache_ttl(hoster, direct_url))
+        return direct_url
+
+    def collect_ajax_stream_urls(self, ajax_requests, ajax_urls):
+        """Pair player options with their AJAX results, keeping the page order and dropping failures"""
+        ajax_stream_urls = []
+        for option, ajax_url in zip(ajax_requests, ajax_urls):
+            if ajax_url:
+                ajax_stream_urls.append({
+                    'player': option['player'],
+                    'url': ajax_url
+                })
+        return ajax_stream_urls
+
+    def fetch_ajax_stream_urls(self, ajax_requests):
+        """Query every player option's AJAX endpoint concurrently; lookups slower than AJAX_TIMEOUT count as failed"""
+        if not ajax_requests:
+            return []
+        executor = shared_executor('ajax', AJAX_WORKERS)
+        futures = [
+            submit_traced(executor, self.get_ajax_stream_url, option['post_id'], option['nume'], option['type'], AJAX_TIMEOUT)
+            for option in ajax_requests
+        ]
+        done, not_done = wait(futures, timeout=AJAX_TIMEOUT)
+        self.cancel_ajax_lookups(not_done)
 
-            # Fallback to meta og:title
-            if title == 'Unknown Episode':
-                meta_title = soup.find('meta', property='og:title')
-                if meta_title and meta_title.get('content'):
-                    title = meta_title['content'].strip()
-                    logger.info(f"Title found in meta og:title: {title}")
+        ajax_urls = []
+        for option, future in zip(ajax_requests, futures):
+            if future in done and future.exception() is None:
+                ajax_urls.append(future.result())
+            else:
+                if future in done:
+                    logger.error(f"Error getting AJAX stream URL for post {option['post_id']}, nume {option['nume']}: {future.exception()}")
+                ajax_urls.append(None)
+        return self.collect_ajax_stream_urls(ajax_requests, ajax_urls)
+
+    def cancel_ajax_lookups(self, futures):
+        """Drop AJAX lookups past their deadline: queued ones are cancelled, running ones finish unobserved"""
+        if not futures:
+            return
+        cancelled = sum(1 for future in futures if future.cancel())
+        if cancelled:
+            logger.warning(f"{cancelled} AJAX stream URL lookups cancelled before starting (deadline passed)")
+        if len(futures) > cancelled:
+            logger.warning(f"{len(futures) - cancelled} AJAX stream URL lookups timed out while running")
+
+    def download_link_jobs(self, page):
+        """Flatten the page's download links into (quality, host, url, hoster) tuples in page order"""
+        jobs = []
+        for section in page['download_sections']:
+            for link in section['links']:
+                hoster = self.classify_download_host(link['host'], link['url'])
+                jobs.append((section['quality'], link['host'], link['url'], hoster))
+        return jobs
+
+    def needs_resolving(self, hoster):
+        """Whether a hoster requires upstream requests to resolve (direct links and unknown hosts do not)"""
+        return hoster is not None and hoster not in DIRECT_LINK_HOSTERS
+
+    def skipped_hosters(self, page):
+        """Hosters on the page whose circuit breaker is open; their uncached links were not resolved"""
+        return sorted({hoster for _, _, _, hoster in self.download_link_jobs(page) if hoster and hoster_breakers.is_open(hoster)})
+
+    def pending_resolution(self, quality, host, download_url):
+        return {
+            'quality': quality,
+            'host': host if host else 'Unknown',
+            'url': download_url
+        }
 
-            # Final fallback to first h2 with 'Episode' in text
-            if title == 'Unknown Episode':
-                title_element = soup.find('h2', string=lambda text: text and 'Episode' in text)
-                if title_element:
-                    title = title_element.text.strip()
-                    logger.info(f"Title found in h2 with Episode: {title}")
+    def cached_download_urls(self, page):
+        """Lazy mode: direct URLs known without an upstream request (direct-link hosters, fresh stream cache), None elsewhere"""
+        resolved_urls = []
+        for _, _, download_url, hoster in self.download_link_jobs(page):
+            direct_url = None
+            if hoster in DIRECT_LINK_HOSTERS:
+                direct_url = download_url
+            elif hoster:
+                state, cached_url = stream_cache.lookup((hoster, download_url))
+                if state == 'fresh':
+                    direct_url = cached_url
+            resolved_urls.append(direct_url)
+        return resolved_urls
+
+    def attach_resolve_tokens(self, download_links, jobs, resolved_urls):
+        """Give every link still needing a resolver a resolve_token for /resolve"""
+        tokens = {
+            (quality, download_url): make_resolve_token(quality, host, download_url)
+            for (quality, host, download_url, hoster), direct_url in zip(jobs, resolved_urls)
+            if not direct_url and self.needs_resolving(hoster)
+        }
+        for quality, links in download_links.items():
+            for link in links:
+                token = tokens.get((quality, link['url']))
+                if token:
+                    link['resolve_token'] = token
+        return download_links
+
+    def resolve_download_links(self, page, deadline):
+        """Resolve every download link on the shared worker pool until the deadline (monotonic time).
+
+        Returns (resolved_urls, pending_resolutions): resolved_urls has one entry per link in page
+        order (None when unresolved), pending_resolutions lists links still resolving at the deadline.
+        """
+        jobs = self.download_link_jobs(page)
+        resolved_urls = [None] * len(jobs)
+        futures = {}
+        for index, (quality, host, download_url, hoster) in enumerate(jobs):
+            if self.needs_resolving(hoster) and hoster_breakers.available(hoster):
+                futures[submit_traced(shared_executor('resolver', RESOLVER_WORKERS), self.resolve_download_url, host, download_url)] = index
+            else:
+                resolved_urls[index] = self.resolve_download_url(host, download_url)
 
-            # Cari iframe stream URL dari movieplay
-            iframe_element = soup.select_one('.movieplay iframe')
-            stream_url = None
-            if iframe_element and iframe_element.get('src'):
-                iframe_src = iframe_element['src']
-                response = requests.head(iframe_src, headers=self.headers, allow_redirects=True, timeout=10)
-                final_url = response.url
-                content_type = response.headers.get('Content-Type', '').lower()
-                if final_url.endswith(('.mp4', '.m3u8')) or 'video' in content_type or 'application/vnd.apple.mpegurl' in content_type:
-                    stream_url = final_url
-                    logger.info(f"Found iframe stream URL: {stream_url}")
-
-            # Cari player options untuk AJAX requests
-            player_options = []
-            ajax_stream_urls = []
-            player_section = soup.find('div', class_='player-modes')
-            if player_section:
-                option_elements = player_section.select('.east_player_option')
-                for option in option_elements:
-                    option_text = option.find('span')
-                    if option_text:
-                        player_name = option_text.text.strip()
-                        player_options.append(player_name)
-                        
-                        # Ambil data untuk AJAX request
-                        post_id = option.get('data-post')
-                        nume = option.get('data-nume')
-                        stream_type = option.get('data-type', 'urliframe')
-                        
-                        if post_id and nume:
-                            ajax_url = self.get_ajax_stream_url(post_id, nume, stream_type)
-                            if ajax_url:
-                                ajax_stream_urls.append({
-                                    'player': player_name,
-                                    'url': ajax_url
-                                })
-                                
-                                # Jika belum ada stream_url, gunakan yang pertama
-                                if not stream_url:
-                                    stream_url = ajax_url
-                                    logger.info(f"Using AJAX stream URL as primary: {stream_url}")
-
-            download_links = {}
-            direct_stream_urls = []
-            all_stream_sources = []
-            download_section = soup.find('div', id='downloadb')
-
-            if download_section:
-                quality_sections = download_section.find_all('li')
-
-                for section in quality_sections:
-                    quality_text = section.find('strong')
-                    if not quality_text:
-                        continue
+        done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+        for future in done:
+            if future.exception() is None:
+                resolved_urls[futures[future]] = future.result()
+            else:
+                logger.error(f"Error resolving download link: {future.exception()}")
+
+        pending_resolutions = []
+        for future in sorted(not_done, key=futures.get):
+            quality, host, download_url, _ = jobs[futures[future]]
+            pending_resolutions.append(self.pending_resolution(quality, host, download_url))
+        if pending_resolutions:
+            logger.warning(f"{len(pending_resolutions)} download links still resolving after the deadline")
+
+        return resolved_urls, pending_resolutions
+
+    def build_episode_data(self, page, stream_url, ajax_stream_urls, resolved_urls):
+        """Assemble the episode response from the parsed page and the resolved URLs.
+
+        resolved_urls holds one direct URL (or None) per download link, in page order.
+        """
+        download_links = {}
+        direct_stream_urls = []
+        all_stream_sources = []
+
+        resolved = iter(resolved_urls)
+        for section in page['download_sections']:
+            quality = section['quality']
+            links = []
+            for link in section['links']:
+                host = link['host']
+                download_url = link['url']
+                direct_url = next(resolved, None)
+
+                if direct_url:
+                    direct_stream_urls.append({
+                        'quality': quality,
+                        'host': host if host else 'Unknown',
+                        'url': direct_url
+                    })
+                    all_stream_sources.append(direct_url)
+
+                if download_url:
+                    links.append({
+                        'host': host,
+                        'url': download_url
+                    })
+
+            download_links[quality] = links
 
-                    quality = quality_text.text.strip()
-                    links = []
-
-                    link_elements = section.find_all('a')
-                    for link in link_elements:
-                        host = link.text.strip()
-                        download_url = link.get('href', '')
-                        direct_url = None
-
-                        # Resolve berbagai jenis host
-                        if 'filemoon' in host.lower() or 'filemoon' in download_url.lower():
-                            direct_url = self.resolve_filemoon_url(download_url)
-                        elif 'vidhidepro' in host.lower() or 'vidhidepro' in download_url.lower():
-                            direct_url = self.resolve_vidhidepro_url(download_url)
-                        elif 'krakenfiles' in host.lower() or 'krakenfiles' in download_url.lower():
-                            direct_url = self.resolve_krakenfiles_url(download_url)
-                        elif 'mega.' in host.lower() or 'mega.' in download_url.lower():
-                            direct_url = self.resolve_mega_url(download_url)
-                        elif 'pixeldrain' in host.lower() or 'pixeldrain' in download_url.lower():
-                            direct_url = self.resolve_pixeldrain_url(download_url)
-                        elif 'hellabyte' in host.lower() or 'hellabyte' in download_url.lower():
-                            # Hellabyte biasanya direct link
-                            direct_url = download_url
-                        elif 'buzzheavier' in host.lower() or 'buzzheavier' in download_url.lower():
-                            # Buzzheavier perlu resolving khusus
-                            direct_url = download_url  # Sementara gunakan direct
-
-                        if direct_url:
-                            direct_stream_urls.append({
-                                'quality': quality,
-                                'host': host if host else 'Unknown',
-                                'url': direct_url
-                            })
-                            all_stream_sources.append(direct_url)
-
-                        if download_url:
-                            links.append({
-                                'host': host,
-                                'url': download_url
-                            })
-
-                    download_links[quality] = links
-
-            # Gunakan direct_stream_urls sebagai fallback jika tidak ada stream_url
-            if not stream_url and direct_stream_urls:
-                # Prioritas: Filemoon > PixelDrain > lainnya
+        # Gunakan direct_stream_urls sebagai fallback jika tidak ada stream_url
+        if not stream_url and direct_stream_urls:
+            # Prioritas: Filemoon > PixelDrain > lainnya
+            for stream in direct_stream_urls:
+                if 'filemoon' in stream['host'].lower():
+                    stream_url = stream['url']
+                    logger.info(f"Using Filemoon direct stream URL as fallback: {stream_url}")
+                    break
+
+            if not stream_url:
                 for stream in direct_stream_urls:
-                    if 'filemoon' in stream['host'].lower():
+                    if 'pixeldrain' in stream['host'].lower():
                         stream_url = stream['url']
-                        logger.info(f"Using Filemoon direct stream URL as fallback: {stream_url}")
+                        logger.info(f"Using PixelDrain direct stream URL as fallback: {stream_url}")
                         break
-                
-                if not stream_url:
-                    for stream in direct_stream_urls:
-                        if 'pixeldrain' in stream['host'].lower():
-                            stream_url = stream['url']
-                            logger.info(f"Using PixelDrain direct stream URL as fallback: {stream_url}")
-                            break
-                
-                # Jika masih tidak ada, ambil URL pertama
-                if not stream_url:
-                    stream_url = direct_stream_urls[0]['url']
-                    logger.info(f"Using first direct stream URL as fallback: {stream_url}")
-
-            # Tambahkan AJAX URLs ke all_stream_sources
-            for ajax_stream in ajax_stream_urls:
-                all_stream_sources.append(ajax_stream['url'])
-
-            # Cari URL tambahan di script
-            scripts = soup.find_all('script')
-            for script in scripts:
-                if script.string:
-                    matches = re.findall(r'(https?://[^\s\'\"]+\.(mp4|m3u8))', script.string)
-                    for match in matches:
-                        all_stream_sources.append(match[0])
-
-            # Deduplikasi all_stream_sources
-            all_stream_sources = list(dict.fromkeys(all_stream_sources))
-
-            # Tambahkan stream_url ke all_stream_sources jika ada
-            if stream_url:
-                all_stream_sources.insert(0, stream_url)
 
-            logger.info(f"Stream URL: {stream_url}")
-            logger.info(f"Direct stream URLs: {json.dumps(direct_stream_urls, indent=2)}")
-            logger.info(f"AJAX stream URLs: {json.dumps(ajax_stream_urls, indent=2)}")
-            logger.info(f"All stream sources: {all_stream_sources}")
+            # Jika masih tidak ada, ambil URL pertama
+            if not stream_url:
+                stream_url = direct_stream_urls[0]['url']
+                logger.info(f"Using first direct stream URL as fallback: {stream_url}")
 
-            episode_data = {
-                'title': title,
-                'stream_url': stream_url,
-                'download_links': download_links,
-                'player_options': player_options,
-                'direct_stream_urls': direct_stream_urls,
-                'ajax_stream_urls': ajax_stream_urls,
-                'all_stream_sources': all_stream_sources
-            }
+        # Tambahkan AJAX URLs dan URL dari script ke all_stream_sources
+        for ajax_stream in ajax_stream_urls:
+            all_stream_sources.append(ajax_stream['url'])
+        all_stream_sources.extend(page['script_urls'])
 
-            logger.info(f"Successfully extracted streams for {title}")
-            return episode_data
+        # Deduplikasi all_stream_sources
+        all_stream_sources = list(dict.fromkeys(all_stream_sources))
 
-        except Exception as e:
-            logger.error(f"Error extracting episode streams: {e}")
-            return {}
+        # Tambahkan stream_url ke all_stream_sources jika ada
+        if stream_url:
+            all_stream_sources.insert(0, stream_url)
 
-    def search_anime(self, query):
-        """Search for anime by title"""
-        logger.info(f"Searching for anime: {query}")
-        encoded_query = urllib.parse.quote(query)
-        search_url = f"{self.base_url}/?s={encoded_query}"
+        logger.info(f"Stream URL: {stream_url}")
+        logger.info(f"Direct stream URLs: {json.dumps(direct_stream_urls, indent=2)}")
+        logger.info(f"AJAX stream URLs: {json.dumps(ajax_stream_urls, indent=2)}")
+        logger.info(f"All stream sources: {all_stream_sources}")
 
-        html = self.get_page(search_url)
-        if not html:
-            return []
+        return {
+            'title': page['title'],
+            'stream_url': stream_url,
+            'download_links': download_links,
+            'player_options': page['player_options'],
+            'direct_stream_urls': direct_stream_urls,
+            'ajax_stream_urls': ajax_stream_urls,
+            'all_stream_sources': all_stream_sources
+        }
 
-        soup = BeautifulSoup(html, 'html.parser')
-        search_results = []
+    def get_episode_streams(self, url, lazy=False):
+        """Extract streaming links for an episode, prioritizing .mp4 or .m3u8 formats with PixelDrain as the preferred host.
+
+        With lazy=True download links are not resolved here: links without a cached direct
+        URL get a resolve_token instead, for /resolve to turn into a direct URL on demand.
+        """
+        logger.info(f"Fetching episode streams from {url}...")
+        deadline = time.monotonic() + EPISODE_RESOLVE_DEADLINE
+        html = self.get_page(url)
+        if not html:
+            return {}
 
         try:
-            result_items = soup.select('.a-item')
-            if not result_items:
+            page = self.parse_episode_page(html)
+
+            stream_url = None
+            if page['iframe_src']:
+                stream_url = self.resolve_iframe_stream(page['iframe_src'])
+
+            ajax_stream_urls = self.fetch_ajax_stream_urls(page['ajax_requests'])
+
+            # Jika belum ada stream_url, gunakan yang pertama
+            if not stream_url and ajax_stream_urls:
+                stream_url = ajax_stream_urls[0]['url']
+                logger.info(f"Using AJAX stream URL as primary: {stream_url}")
+
+            if lazy:
+                resolved_urls, pending_resolutions = self.cached_download_urls(page), []
+            else:
+                resolved_urls, pending_resolutions = self.resolve_download_links(page, deadline)
+
+            episode_data = self.build_episode_data(page, stream_url, ajax_stream_urls, resolved_urls)
+            if lazy:
+                self.attach_resolve_tokens(episode_data['download_links'], self.download_link_jobs(page), resolved_urls)
+            episode_data['pending_resolutions'] = pending_resolutions
+            episode_data['skipped_hosters'] = self.skipped_hosters(page)
+            logger.info(f"Successfully extracted streams for {page['title']}")
+            return episode_data
+
+        except Exception as e:
+            logger.error(f"Error extracting episode streams: {e}")
+            return {}
+
+    def episode_stream_events(self, url, lazy=False):
+        """Yield (event, data) pairs for the streaming /episode-streams mode.
+
+        'episode' (title, download links, player options) comes first, then an 'ajax_stream' or
+        'direct_stream' record as each lookup finishes, and last a 'summary' holding the same
+        data as the non-streaming response. The iframe, AJAX and resolver requests all run at once.
+        """
+        logger.info(f"Streaming episode streams from {url}...")
+        deadline = time.monotonic() + EPISODE_RESOLVE_DEADLINE
+        html = self.get_page(url)
+        if not html:
+            yield 'summary', {}
+            return
+
+        page = self.parse_episode_page(html)
+        progress = EpisodeStreamProgress(self, page, lazy)
+        yield 'episode', progress.episode()
+
+        ajax_executor = shared_executor('ajax', AJAX_WORKERS)
+        ajax_deadline = time.monotonic() + AJAX_TIMEOUT
+        iframe_future = submit_traced(ajax_executor, self.resolve_iframe_stream, page['iframe_src']) if page['iframe_src'] else None
+        ajax_futures = {
+            submit_traced(ajax_executor, self.get_ajax_stream_url, option['post_id'], option['nume'], option['type'], AJAX_TIMEOUT): index
+            for index, option in enumerate(page['ajax_requests'])
+        }
+        resolve_futures = {}
+        for index, (quality, host, download_url, hoster) in enumerate(progress.jobs):
+            if lazy:
+                record = progress.direct_stream(index, progress.resolved_urls[index])
+            elif self.needs_resolving(hoster) and hoster_breakers.available(hoster):
+                resolve_futures[submit_traced(shared_executor('resolver', RESOLVER_WORKERS), self.resolve_download_url, host, download_url)] = index
+                continue
+            else:
+                record = progress.direct_stream(index, self.resolve_download_url(host, download_url))
+            if record:
+                yield 'direct_stream', record
+
+        pending = set(ajax_futures) | set(resolve_futures) | ({iframe_future} if iframe_future else set())
+        while pending:
+            waiting_on_ajax = not pending.isdisjoint(ajax_futures)
+            timeout = (min(ajax_deadline, deadline) if waiting_on_ajax else deadline) - time.monotonic()
+            done, pending = wait(pending, timeout=max(0, timeout), return_when=FIRST_COMPLETED)
+            if not done:
+                if waiting_on_ajax and time.monotonic() >= ajax_deadline and ajax_deadline < deadline:
+                    self.cancel_ajax_lookups(pending & ajax_futures.keys())
+                    pending -= ajax_futures.keys()
+                    continue
+                break
+            for future in done:
+                if future.exception() is not None:
+                    logger.error(f"Error while streaming episode lookups: {future.exception()}")
+                    continue
+                if future is iframe_future:
+                    progress.stream_url = future.result()
+                elif future in ajax_futures:
+                    record = progress.ajax_stream(ajax_futures[future], future.result())
+                    if record:
+                        yield 'ajax_stream', record
+                else:
+                    record = progress.direct_stream(resolve_futures[future], future.result())
+                    if record:
+                        yield 'direct_stream', record
+
+        self.cancel_ajax_lookups(pending & ajax_futures.keys())
+        pending_indexes = [resolve_futures[future] for future in pending if future in resolve_futures]
+        if pending_indexes:
+            logger.warning(f"{len(pending_indexes)} download links still resolving after the deadline")
+        yield 'summary', progress.summary(pending_indexes)
+
+    def search_url(self, query):
+        return f"{self.base_url}/?s={urllib.parse.quote(query)}"
+
+    def search_anime(self, query):
+        """Search for anime by title"""
+        logger.info(f"Searching for anime: {query}")
+        search_url = self.search_url(query)
+
+        html = self.get_page(search_url)
+        if not html:
+            return []
+        return self.parse_anime_search(html, query, search_url)
+
+    @timed_parse
+    def parse_anime_search(self, html, query, search_url):
+        """Parse anime search results"""
+        soup = self.soup(html)
+        search_results = []
+
+        try:
+            result_items = soup.select('.a-item')
+            if not result_items:
                 result_items = soup.select('.ml-item')
             if not result_items:
                 result_items = soup.select('.movies-list-full div[class*="item"]')
@@ -854,22 +3404,12 @@ class WinbuScraper:
             logger.error(f"HTML snippet: {html[:500]}..." if html else "No HTML content")
             return []
 
-    def get_release_schedule(self, day=None):
-        """Extract anime release schedule for a specific day or all days"""
-        logger.info(f"Fetching release schedule for day: {day if day else 'all days'}...")
-        schedule_url = f"{self.base_url}/jadwal-rilis"
-        html = self.get_page(schedule_url)
-        if not html:
-            return {} if not day else []
-
-        soup = BeautifulSoup(html, 'html.parser')
-        schedule_data = {}
-
-        # Get all available days from the UI
+    def parse_schedule_days(self, soup):
+        """Read the day tabs of the schedule page: (days, data-day values, active day), or None"""
         days_section = soup.find('div', id='the-days')
         if not days_section:
             logger.error("Days section not found")
-            return {} if not day else []
+            return None
 
         day_elements = days_section.find_all('div', class_='east_days_option')
         days = []
@@ -889,117 +3429,197 @@ class WinbuScraper:
                 if elem.get('class') and 'on' in elem.get('class'):
                     default_day = day_name
 
-        # Process each day or just the specified day
-        for day_name in days:
-            if day and day_name.lower() != day.lower():
-                continue
+        return days, day_data_values, default_day
+
+    def schedule_api_params(self, api_day_value):
+        """Query parameters for the wp-json all-schedule endpoint"""
+        return {'day': api_day_value, 'perpage': 20}
+
+    def parse_schedule_api_items(self, schedule_items, day_name):
+        """Convert all-schedule API items into schedule entries"""
+        day_schedule = []
+        if isinstance(schedule_items, list) and len(schedule_items) > 0:
+            logger.info(f"AJAX fetched {len(schedule_items)} items for {day_name}")
+            for item in schedule_items:
+                try:
+                    schedule_data_item = {
+                        'title': item.get('title', 'Unknown Title'),
+                        'url': item.get('url', ''),
+                        'time': item.get('east_time', 'N/A'),
+                        'rating': str(item.get('east_score', 'N/A')),
+                        'image_url': item.get('featured_img_src', ''),
+                        'day': day_name.capitalize()
+                    }
+                    day_schedule.append(schedule_data_item)
+                except Exception as e:
+                    logger.error(f"Error parsing AJAX schedule item for {day_name}: {e}")
+        else:
+            logger.warning(f"AJAX returned empty or invalid result for {day_name}")
+        return day_schedule
+
+    def fetch_schedule_api(self, day_name, api_day_value):
+        """Fetch one day's schedule from the wp-json all-schedule endpoint"""
+        ajax_url = f"{self.base_url}/wp-json/custom/v1/all-schedule"
+        try:
+            logger.info(f"Fetching schedule via AJAX for day: {day_name} (parameter: {api_day_value})")
+            response = self.http.get(
+                ajax_url,
+                headers=self.headers,
+                params=self.schedule_api_params(api_day_value),
+                timeout=10
+            )
 
-            day_schedule = []
-            api_day_value = day_data_values.get(day_name, day_name.lower())
+            if response.status_code == 200:
+                try:
+                    return self.parse_schedule_api_items(response.json(), day_name)
+                except ValueError as e:
+                    logger.warning(f"Failed to parse AJAX JSON response for {day_name}: {e}")
+            else:
+                logger.warning(f"AJAX request failed with status {response.status_code} for {day_name}")
 
-            # Try AJAX endpoint first
-            ajax_url = f"{self.base_url}/wp-json/custom/v1/all-schedule"
+        except Exception as e:
+            logger.warning(f"AJAX request failed for {day_name}: {e}, falling back to HTML parsing")
+        return []
+
+    @timed_parse
+    def parse_schedule_html(self, soup, day_name, default_day):
+        """Parse the schedule shown on the page, which is only available for the active day"""
+        day_schedule = []
+        logger.info(f"Falling back to HTML parsing for {day_name}")
+
+        # If we're looking for a day that isn't currently displayed, we need to parse the day's content
+        if day_name.lower() == default_day.lower():
+            # Parse the currently displayed day's schedule
             try:
-                logger.info(f"Fetching schedule via AJAX for day: {day_name} (parameter: {api_day_value})")
-                response = requests.get(
-                    ajax_url,
-                    headers=self.headers,
-                    params={'day': api_day_value, 'perpage': 20},
-                    timeout=10
-                )
+                schedule_section = soup.find('div', class_='result-schedule')
+                if schedule_section:
+                    anime_items = schedule_section.find_all('div', class_='ml-item')
 
-                if response.status_code == 200:
-                    try:
-                        schedule_items = response.json()
-                        if isinstance(schedule_items, list) and len(schedule_items) > 0:
-                            logger.info(f"AJAX fetched {len(schedule_items)} items for {day_name}")
-                            for item in schedule_items:
-                                try:
-                                    schedule_data_item = {
-                                        'title': item.get('title', 'Unknown Title'),
-                                        'url': item.get('url', ''),
-                                        'time': item.get('east_time', 'N/A'),
-                                        'rating': str(item.get('east_score', 'N/A')),
-                                        'image_url': item.get('featured_img_src', ''),
-                                        'day': day_name.capitalize()
-                                    }
-                                    day_schedule.append(schedule_data_item)
-                                except Exception as e:
-                                    logger.error(f"Error parsing AJAX schedule item for {day_name}: {e}")
-                        else:
-                            logger.warning(f"AJAX returned empty or invalid result for {day_name}")
-                    except ValueError as e:
-                        logger.warning(f"Failed to parse AJAX JSON response for {day_name}: {e}")
-                else:
-                    logger.warning(f"AJAX request failed with status {response.status_code} for {day_name}")
+                    for item in anime_items:
+                        try:
+                            link_element = item.find('a', class_='ml-mask')
+                            if not link_element:
+                                continue
+
+                            title = link_element.get('title', 'Unknown Title')
+                            url = link_element.get('href', '')
 
+                            img_element = link_element.find('img')
+                            image_url = img_element.get('src', '') if img_element else ''
+
+                            rating_element = item.find('div', class_='mli-mvi')
+                            rating = rating_element.text.strip() if rating_element else 'N/A'
+                            rating = rating.replace('★', '').strip() if '★' in rating else rating
+                            rating = rating.replace('i class="fa fa-star" aria-hidden="true"></i>', '').strip()
+
+                            time_element = item.find('span', class_='mli-waktu')
+                            time = time_element.text.strip() if time_element else 'N/A'
+                            time = time.replace('🕒', '').strip() if '🕒' in time else time
+                            time = time.replace('i class="fa fa-clock"></i>', '').strip()
+
+                            schedule_data_item = {
+                                'title': title,
+                                'url': url,
+                                'time': time,
+                                'rating': rating,
+                                'image_url': image_url,
+                                'day': day_name.capitalize()
+                            }
+                            day_schedule.append(schedule_data_item)
+                        except Exception as e:
+                            logger.error(f"Error parsing HTML schedule item for {day_name}: {e}")
             except Exception as e:
-                logger.warning(f"AJAX request failed for {day_name}: {e}, falling back to HTML parsing")
+                logger.error(f"Error parsing schedule HTML for {day_name}: {e}")
+        else:
+            logger.warning(f"Cannot parse HTML for {day_name} as it's not the currently active day")
+        return day_schedule
 
-            # Fallback to HTML parsing if AJAX fails or returns no data
-            if not day_schedule:
-                logger.info(f"Falling back to HTML parsing for {day_name}")
+    def schedule_url(self):
+        return f"{self.base_url}/jadwal-rilis"
 
-                # If we're looking for a day that isn't currently displayed, we need to parse the day's content
-                if day_name.lower() == default_day.lower():
-                    # Parse the currently displayed day's schedule
-                    try:
-                        schedule_section = soup.find('div', class_='result-schedule')
-                        if schedule_section:
-                            anime_items = schedule_section.find_all('div', class_='ml-item')
+    def fetch_schedule_soup(self):
+        html = self.get_page(self.schedule_url())
+        return self.soup(html) if html else None
 
-                            for item in anime_items:
-                                try:
-                                    link_element = item.find('a', class_='ml-mask')
-                                    if not link_element:
-                                        continue
-
-                                    title = link_element.get('title', 'Unknown Title')
-                                    url = link_element.get('href', '')
-
-                                    img_element = link_element.find('img')
-                                    image_url = img_element.get('src', '') if img_element else ''
-
-                                    rating_element = item.find('div', class_='mli-mvi')
-                                    rating = rating_element.text.strip() if rating_element else 'N/A'
-                                    rating = rating.replace('★', '').strip() if '★' in rating else rating
-                                    rating = rating.replace('i class="fa fa-star" aria-hidden="true"></i>', '').strip()
-
-                                    time_element = item.find('span', class_='mli-waktu')
-                                    time = time_element.text.strip() if time_element else 'N/A'
-                                    time = time.replace('🕒', '').strip() if '🕒' in time else time
-                                    time = time.replace('i class="fa fa-clock"></i>', '').strip()
-
-                                    schedule_data_item = {
-                                        'title': title,
-                                        'url': url,
-                                        'time': time,
-                                        'rating': rating,
-                                        'image_url': image_url,
-                                        'day': day_name.capitalize()
-                                    }
-                                    day_schedule.append(schedule_data_item)
-                                except Exception as e:
-                                    logger.error(f"Error parsing HTML schedule item for {day_name}: {e}")
-                    except Exception as e:
-                        logger.error(f"Error parsing schedule HTML for {day_name}: {e}")
-                else:
-                    logger.warning(f"Cannot parse HTML for {day_name} as it's not the currently active day")
+    def cached_schedule_tabs(self):
+        """The schedule page's (days, data-day values, active day), cached until the day rolls over"""
+        state, tabs = response_cache.lookup(('schedule-tabs', self.base_url))
+        return tabs if state == 'fresh' else None
 
-            schedule_data[day_name.capitalize()] = day_schedule
+    def store_schedule_tabs(self, tabs):
+        response_cache.set(('schedule-tabs', self.base_url), tabs, max(1, seconds_until_schedule_rollover()), stale_seconds=0)
 
+    def schedule_day_key(self, api_day_value):
+        return ('schedule-day', self.base_url, api_day_value)
+
+    def cached_schedule_day(self, api_day_value):
+        state, day_schedule = response_cache.lookup(self.schedule_day_key(api_day_value))
+        return day_schedule if state == 'fresh' else None
+
+    def store_schedule_day(self, api_day_value, day_schedule):
+        response_cache.set(self.schedule_day_key(api_day_value), day_schedule, schedule_ttl(day_schedule), stale_seconds=0)
+
+    def schedule_days_wanted(self, days, day):
+        return [day_name for day_name in days if not day or day_name.lower() == day.lower()]
+
+    def assemble_schedule(self, day, schedule_data):
         if day:
             return schedule_data.get(day.capitalize(), [])
         return schedule_data
 
+    def get_release_schedule(self, day=None):
+        """Extract anime release schedule for a specific day or all days.
+
+        Every requested day is fetched from the all-schedule API at once, so the full week
+        costs one round-trip. Days and the page's day tabs are cached until midnight WIB.
+        """
+        logger.info(f"Fetching release schedule for day: {day if day else 'all days'}...")
+        soup = None
+        tabs = self.cached_schedule_tabs()
+        if tabs is None:
+            # Get all available days from the UI
+            soup = self.fetch_schedule_soup()
+            tabs = self.parse_schedule_days(soup) if soup else None
+            if not tabs:
+                return {} if not day else []
+            self.store_schedule_tabs(tabs)
+        days, day_data_values, default_day = tabs
+
+        wanted = self.schedule_days_wanted(days, day)
+        api_day_values = {day_name: day_data_values.get(day_name, day_name.lower()) for day_name in wanted}
+        schedule_days = {day_name: self.cached_schedule_day(api_day_values[day_name]) for day_name in wanted}
+        executor = shared_executor('schedule', SCHEDULE_WORKERS)
+        futures = {
+            day_name: submit_traced(executor, self.fetch_schedule_api, day_name, api_day_values[day_name])
+            for day_name, day_schedule in schedule_days.items() if day_schedule is None
+        }
+
+        schedule_data = {}
+        for day_name in wanted:
+            day_schedule = schedule_days[day_name]
+            if day_schedule is None:
+                day_schedule = futures[day_name].result()
+                # Fallback to HTML parsing if AJAX fails or returns no data (the page only shows the active day)
+                if not day_schedule and (soup is not None or day_name == default_day):
+                    soup = soup or self.fetch_schedule_soup()
+                    day_schedule = self.parse_schedule_html(soup, day_name, default_day) if soup else []
+                self.store_schedule_day(api_day_values[day_name], day_schedule)
+            schedule_data[day_name.capitalize()] = day_schedule
+
+        return self.assemble_schedule(day, schedule_data)
+
     def get_genres(self):
         """Extract genres list from homepage sidebar"""
         logger.info("Fetching genres list...")
-        html = self.get_page(self.base_url)
-        if not html:
+        document = self.get_document(self.base_url)
+        if not document:
             return []
+        return self.parse_genres(document)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_genres(self, html):
+        """Parse the genres list from the homepage sidebar"""
+        soup = self.soup(html)
         genres_list = []
 
         try:
@@ -1050,24 +3670,26 @@ class WinbuScraper:
         logger.info(f"Found {len(genres_list)} genres")
         return genres_list
 
-    def get_genre_content(self, genre_url, page=1):
-        """Extract content from genre page"""
-        logger.info(f"Fetching genre content from: {genre_url}, page: {page}")
-        
+    def genre_page_url(self, genre_url, page):
         # Construct the URL with page parameter if needed
         if page > 1:
             if genre_url.endswith('/'):
-                url = f"{genre_url}page/{page}/"
-            else:
-                url = f"{genre_url}/page/{page}/"
-        else:
-            url = genre_url
-            
-        html = self.get_page(url)
+                return f"{genre_url}page/{page}/"
+            return f"{genre_url}/page/{page}/"
+        return genre_url
+
+    def get_genre_content(self, genre_url, page=1):
+        """Extract content from genre page"""
+        logger.info(f"Fetching genre content from: {genre_url}, page: {page}")
+        html = self.get_page(self.genre_page_url(genre_url, page))
         if not html:
             return {'content': [], 'current_page': page, 'total_pages': 1}
+        return self.parse_genre_content(html, page)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_genre_content(self, html, page):
+        """Parse a genre listing page"""
+        soup = self.soup(html, GENRE_CONTENT_SECTIONS)
         content_list = []
         
         try:
@@ -1155,47 +3777,50 @@ class WinbuScraper:
         }
 
 class KomikindoScraper:
-    def __init__(self):
-        self.base_url = "https://komikindo.ch"
+    user_agents = [
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/119.0',
+    ]
+
+    def __init__(self, http=None, html_parser=None):
+        self.base_url = os.environ.get('KOMIKINDO_BASE_URL', "https://komikindo.ch").rstrip('/')
+        self.http = http or http_pool
+        self.html_parser = resolve_html_parser(html_parser or os.environ.get('KOMIKINDO_HTML_PARSER', HTML_PARSER))
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-            'Referer': 'https://komikindo.ch/'
+            'Referer': f'{self.base_url}/'
         }
 
     def get_page(self, url):
         """Fetch page content with error handling, retry logic, and user-agent rotation"""
         max_retries = 3
         retry_delay = 2
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/119.0',
-        ]
 
         for attempt in range(max_retries):
             try:
-                # Rotate user-agent
-                self.headers['User-Agent'] = user_agents[attempt % len(user_agents)]
-                logger.info(f"Attempt {attempt + 1} to fetch URL: {url} with User-Agent: {self.headers['User-Agent']}")
-                time.sleep(1)
-                response = requests.get(url, headers=self.headers, timeout=10)
+                # Rotate user-agent (per request, scrapers are shared between threads)
+                headers = self.attempt_headers(attempt)
+                logger.info(f"Attempt {attempt + 1} to fetch URL: {url} with User-Agent: {headers['User-Agent']}")
+                response = self.http.get(url, headers=headers, timeout=10)
                 response.raise_for_status()
                 logger.info(f"Successfully fetched URL: {url}, Status Code: {response.status_code}")
-                
-                # Check if the response is HTML
-                content_type = response.headers.get('Content-Type', '')
-                if 'text/html' not in content_type.lower():
-                    logger.warning(f"Unexpected Content-Type: {content_type} for URL: {url}")
+
+                if not self.is_html_response(url, response.headers.get('Content-Type', '')):
                     return None
 
-                return response.text
+                return page_markup(response)
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                logger.warning(f"Not fetching {url}: {e}")
+                return None
             except requests.exceptions.RequestException as e:
                 logger.error(f"Error fetching {url}: {e}")
                 if attempt < max_retries - 1:
+                    metrics.inc('upstream_retries_total', host=host_of(url))
                     logger.info(f"Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
                     retry_delay *= 2
@@ -1203,20 +3828,47 @@ class KomikindoScraper:
                     logger.error(f"Failed to fetch {url} after {max_retries} attempts")
                     return None
 
+    def get_document(self, url):
+        """Fetch and parse a page through the shared page document cache"""
+        return page_documents.get(url, self.get_page, self.soup)
+
+    def soup(self, markup, sections=None):
+        """Parse a fetched page with this scraper's configured parser backend"""
+        return make_soup(markup, self.html_parser, sections)
+
+    def attempt_headers(self, attempt):
+        """Request headers for a retry attempt, rotating the User-Agent"""
+        headers = dict(self.headers)
+        headers['User-Agent'] = self.user_agents[attempt % len(self.user_agents)]
+        return headers
+
+    def is_html_response(self, url, content_type):
+        """Check if the response is HTML"""
+        if 'text/html' not in content_type.lower():
+            logger.warning(f"Unexpected Content-Type: {content_type} for URL: {url}")
+            return False
+        return True
+
+    def latest_comics_url(self, page):
+        return f"{self.base_url}/komik-terbaru/" if page == 1 else f"{self.base_url}/komik-terbaru/page/{page}/"
+
     def get_latest_comics(self, page=1):
         """Extract latest comic releases from Komikindo with pagination support"""
         logger.info(f"Fetching latest comics from page {page}...")
-        url = f"{self.base_url}/komik-terbaru/" if page == 1 else f"{self.base_url}/komik-terbaru/page/{page}/"
-
-        html = self.get_page(url)
+        # Page 1 is the same document popular comics are read from
+        html = self.get_document(self.latest_comics_url(page)) if page == 1 else self.get_page(self.latest_comics_url(page))
         if not html:
             return {
                 'comic_list': [],
                 'current_page': page,
                 'total_pages': 1
             }
+        return self.parse_latest_comics(html, page)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_latest_comics(self, html, page):
+        """Parse a /komik-terbaru/ listing page"""
+        soup = self.soup(html)
         comic_list = []
 
         try:
@@ -1296,11 +3948,15 @@ class KomikindoScraper:
     def get_popular_comics(self):
         """Extract popular comics from the sidebar"""
         logger.info("Fetching popular comics...")
-        html = self.get_page(f"{self.base_url}/komik-terbaru/")
-        if not html:
+        document = self.get_document(self.latest_comics_url(1))
+        if not document:
             return []
+        return self.parse_popular_comics(document)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_popular_comics(self, html):
+        """Parse the popular comics sidebar"""
+        soup = self.soup(html)
         popular_comics = []
 
         try:
@@ -1355,11 +4011,15 @@ class KomikindoScraper:
     def get_latest_collections(self):
         """Extract latest comic collections from the sidebar"""
         logger.info("Fetching latest comic collections...")
-        html = self.get_page(f"{self.base_url}/")  # Try homepage instead of komik-terbaru
-        if not html:
+        document = self.get_document(f"{self.base_url}/")  # Try homepage instead of komik-terbaru
+        if not document:
             return []
+        return self.parse_latest_collections(document)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_latest_collections(self, html):
+        """Parse the latest collections section of the homepage"""
+        soup = self.soup(html)
         latest_collections = []
 
         try:
@@ -1456,8 +4116,12 @@ class KomikindoScraper:
         html = self.get_page(url)
         if not html:
             return {}
+        return self.parse_comic_details(html)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_comic_details(self, html):
+        """Parse a comic detail page"""
+        soup = self.soup(html)
 
         try:
             # Extract title
@@ -1587,8 +4251,12 @@ class KomikindoScraper:
         if not html:
             logger.error(f"Failed to retrieve HTML content for {url}")
             return {}
+        return self.parse_chapter_images(html, url)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_chapter_images(self, html, url):
+        """Parse a chapter page into images, navigation and related chapters"""
+        soup = self.soup(html, CHAPTER_PAGE_SECTIONS)
 
         try:
             # Log the HTML content for debugging (first 500 characters)
@@ -1694,17 +4362,23 @@ class KomikindoScraper:
             logger.error(f"Error extracting chapter images: {e}")
             return {}
 
+    def search_url(self, query):
+        return f"{self.base_url}/?s={urllib.parse.quote(query)}"
+
     def search_comics(self, query):
         """Search for comics by title"""
         logger.info(f"Searching for comics: {query}")
-        encoded_query = urllib.parse.quote(query)
-        search_url = f"{self.base_url}/?s={encoded_query}"
+        search_url = self.search_url(query)
 
         html = self.get_page(search_url)
         if not html:
             return []
+        return self.parse_comic_search(html, query, search_url)
 
-        soup = BeautifulSoup(html, 'html.parser')
+    @timed_parse
+    def parse_comic_search(self, html, query, search_url):
+        """Parse comic search results"""
+        soup = self.soup(html)
         search_results = []
 
         try:
@@ -1755,134 +4429,1040 @@ class KomikindoScraper:
             logger.error(f"HTML snippet: {html[:500]}..." if html else "No HTML content")
             return []
 
-# Initialize scrapers
-winbu_scraper = WinbuScraper()
-komikindo_scraper = KomikindoScraper()
+class AsyncResponse:
+    """Fully read aiohttp response exposing the parts of the requests.Response API the scrapers use"""
+
+    def __init__(self, url, status_code, headers, content, encoding):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise AsyncFetchError(f"{self.status_code} Error for url: {self.url}")
+
+class AsyncFetchError(Exception):
+    """Raised for upstream HTTP errors in the asyncio scrapers"""
+
+class AsyncHttpPool:
+    """aiohttp counterpart of HttpSessionPool: one ClientSession with a bounded connector per event loop"""
+
+    def __init__(self, pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_MAXSIZE):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._lock = Lock()
+        self._host_stats = {}
+
+    def session(self):
+        """Return the running event loop's ClientSession, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # A session is bound to the loop that created it; forget those of loops that have ended
+            for ended in [other for other in self._sessions if other.is_closed()]:
+                del self._sessions[ended]
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_connections * self.pool_maxsize,
+                    limit_per_host=self.pool_maxsize
+                )
+                session = self._sessions[loop] = aiohttp.ClientSession(connector=connector)
+        return session
+
+    async def request(self, method, url, timeout=10, sink=None, check=None, **kwargs):
+        """Send a request and return the fully read AsyncResponse.
+
+        With sink, the body is handed to sink(chunk) as it arrives and the response's content stays empty.
+        check(status, content_type) runs before any of the body is read. An exception from check or
+        sink stops the download and is re-raised after the host's breaker records the response's
+        status, since a rejection by the caller is not a failure of the host.
+        """
+        host = urllib.parse.urlparse(url).netloc.lower()
+        url, headers = redirect_upstream(url, kwargs.pop('headers', None))
+        if not host_breakers.allow(host):
+            raise CircuitOpenError(f"Circuit breaker open for {host}, skipping {method} {url}")
+        try:
+            await rate_limiter.wait_async(host)
+        except (asyncio.CancelledError, UpstreamBusyError):
+            host_breakers.release(host)
+            raise
+        start = time.perf_counter()
+        rejected = None
+        try:
+            with trace_span('fetch', host=host, method=method):
+                async with self.session().request(method, url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+                    received = 0
+                    if sink is None:
+                        content = await response.read()
+                        received = len(content)
+                    else:
+                        content = b''
+                        try:
+                            if check is not None:
+                                check(response.status, response.headers.get('Content-Type', ''))
+                        except Exception as e:
+                            rejected = e
+                        else:
+                            async for chunk in response.content.iter_chunked(IMAGE_CHUNK_BYTES):
+                                received += len(chunk)
+                                try:
+                                    sink(chunk)
+                                except Exception as e:
+                                    rejected = e
+                                    break
+                    result = AsyncResponse(str(response.url), response.status, response.headers, content, response.charset)
+        except asyncio.CancelledError:
+            # The caller gave up (client disconnect, deadline): not the host's fault, but a
+            # half-open breaker must get its probe slot back
+            host_breakers.release(host)
+            raise
+        except Exception as e:
+            record_upstream(host, True)
+            if isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError)):
+                self._record(host, error=True)
+                metrics.inc('upstream_requests_total', host=host, outcome='error')
+            raise
+        finally:
+            metrics.observe('upstream_request_duration_seconds', time.perf_counter() - start, host=host)
+        record_upstream(host, upstream_failed(result.status_code))
+        self._record(host, error=False)
+        metrics.inc('upstream_requests_total', host=host, outcome='ok' if result.status_code < 400 else f"http_{result.status_code}")
+        metrics.inc('upstream_response_bytes_total', received, host=host)
+        if rejected is not None:
+            raise rejected
+        return result
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def head(self, url, **kwargs):
+        return await self.request('HEAD', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    def _record(self, host, error):
+        with self._lock:
+            stats = self._host_stats.setdefault(host, {'requests': 0, 'errors': 0})
+            stats['requests'] += 1
+            if error:
+                stats['errors'] += 1
+
+    def stats(self):
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self._host_stats.items()}
+        return {
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'hosts': hosts
+        }
 
-@app.route('/')
-def index():
-    return "I am alive!"
+    async def close(self):
+        """Close the running event loop's session"""
+        with self._lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
 
-@app.route('/top-anime', methods=['GET'])
-def top_anime():
-    try:
-        result = winbu_scraper.get_top_anime()
-        return jsonify({
-            "success": True,
-            "data": result
-        })
-    except Exception as e:
-        logger.error(f"Error in top-anime endpoint: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+# Exceptions treated as retryable fetch failures by the asyncio scrapers
+ASYNC_FETCH_ERRORS = (AsyncFetchError, CircuitOpenError, asyncio.TimeoutError) + ((aiohttp.ClientError,) if aiohttp else ())
 
-@app.route('/latest-anime', methods=['GET'])
-def latest_anime():
-    try:
-        page = request.args.get('page', 1, type=int)
-        result = winbu_scraper.get_latest_anime(page)
-        if not isinstance(result, dict) or 'anime_list' not in result:
-            logger.error("Invalid result structure from get_latest_anime")
-            result = {
-                'anime_list': [],
-                'current_page': page,
-                'total_pages': 1
-            }
-        return jsonify({
-            "success": True,
-            "data": result
-        })
-    except Exception as e:
-        logger.error(f"Error in latest-anime endpoint: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e),
-            "data": {
-                'anime_list': [],
-                'current_page': request.args.get('page', 1, type=int),
-                'total_pages': 1
-            }
-        }), 500
+class AsyncWinbuScraper(WinbuScraper):
+    """WinbuScraper with non-blocking fetches, sharing all parsing with the sync scraper"""
 
-@app.route('/anime-details', methods=['GET'])
-def anime_details():
-    try:
-        url = request.args.get('url')
-        if not url:
-            return jsonify({
-                "success": False,
-                "error": "Missing 'url' parameter"
-            }), 400
+    def __init__(self, http=None, html_parser=None):
+        super().__init__(http=http or async_http_pool, html_parser=html_parser)
+        self.background_tasks = set()
 
-        result = winbu_scraper.get_anime_details(url)
-        return jsonify({
-            "success": True,
-            "data": result
-        })
-    except Exception as e:
-        logger.error(f"Error in anime-details endpoint: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+    async def get_page(self, url):
+        """Fetch page content with error handling and retry logic"""
+        max_retries = 3
+        retry_delay = 2
 
-@app.route('/episode-streams', methods=['GET'])
-def episode_streams():
-    try:
-        url = request.args.get('url')
-        if not url:
-            return jsonify({
-                "success": False,
-                "error": "Missing 'url' parameter"
-            }), 400
+        for attempt in range(max_retries):
+            try:
+                response = await self.http.get(url, headers=self.headers, timeout=10)
+                response.raise_for_status()
+                return page_markup(response)
+            except CircuitOpenError as e:
+                logger.warning(f"Not fetching {url}: {e}")
+                return None
+            except ASYNC_FETCH_ERRORS as e:
+                logger.error(f"Error fetching {url}: {e}")
+                if attempt < max_retries - 1:
+                    metrics.inc('upstream_retries_total', host=host_of(url))
+                    logger.info(f"Retrying in {retry_delay} seconds...")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+                else:
+                    logger.error(f"Failed to fetch {url} after {max_retries} attempts")
+                    return None
 
-        result = winbu_scraper.get_episode_streams(url)
-        return jsonify({
-            "success": True,
-            "data": result
-        })
-    except Exception as e:
-        logger.error(f"Error in episode-streams endpoint: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+    async def get_document(self, url):
+        return await page_documents.get_async(url, self.get_page, self.soup)
 
-@app.route('/search', methods=['GET'])
-def search():
-    try:
-        query = request.args.get('query')
-        if not query:
-            return jsonify({
-                "success": False,
-                "error": "Missing 'query' parameter"
-            }), 400
+    async def check_stream_url(self, stream_url):
+        response = await self.http.head(stream_url, headers=self.headers, allow_redirects=True, timeout=10)
+        content_type = response.headers.get('Content-Type', '').lower()
+        if self.is_stream_content_type(content_type):
+            return content_type
+        logger.warning(f"Invalid Content-Type for {stream_url}: {content_type}")
+        return None
 
-        logger.info(f"Search request received for query: '{query}'")
-        result = winbu_scraper.search_anime(query)
-        logger.info(f"Returning {len(result)} search results")
-        return jsonify({
-            "success": True,
-            "data": result
-        })
-    except Exception as e:
-        logger.error(f"Error in search endpoint: {e}")
-        return jsonify({
-            "success": False,
-            "error": str(e)
-        }), 500
+    async def resolve_video_tag(self, soup, label):
+        stream_url, source_type = self.find_video_source(soup)
+        if not stream_url:
+            return None
+        if source_type in DIRECT_SOURCE_TYPES:
+            logger.info(f"Found {label} video source: {stream_url}")
+            return stream_url
+        content_type = await self.check_stream_url(stream_url)
+        if content_type:
+            logger.info(f"Found {label} video source (Content-Type: {content_type}): {stream_url}")
+            return stream_url
+        return None
+
+    async def resolve_script_urls(self, soup, label):
+        for stream_url in self.find_script_stream_urls(soup):
+            content_type = await self.check_stream_url(stream_url)
+            if content_type:
+                logger.info(f"Found {label} stream URL in script (Content-Type: {content_type}): {stream_url}")
+                return stream_url
+        return None
+
+    async def resolve_krakenfiles_url(self, url):
+        try:
+            html = await self.get_page(url)
+            if not html:
+                logger.warning(f"Failed to fetch Krakenfiles page: {url}")
+                return None
 
-@app.route('/release-schedule', methods=['GET'])
-def release_schedule():
-    try:
-        day = request.args.get('day')
-        result = winbu_scraper.get_release_schedule(day)
-        return jsonify({
+            soup = self.soup(html, HOSTER_PAGE_SECTIONS)
+            stream_url = await self.resolve_video_tag(soup, 'Krakenfiles')
+            if stream_url:
+                return stream_url
+
+            embed_url = self.find_krakenfiles_embed(soup)
+            if embed_url:
+                embed_html = await self.get_page(embed_url)
+                if embed_html:
+                    embed_soup = self.soup(embed_html, HOSTER_PAGE_SECTIONS)
+                    stream_url = await self.resolve_video_tag(embed_soup, 'Krakenfiles embed') or await self.resolve_script_urls(embed_soup, 'Krakenfiles embed')
+                    if stream_url:
+                        return stream_url
+
+            stream_url = await self.resolve_script_urls(soup, 'Krakenfiles main page')
+            if stream_url:
+                return stream_url
+
+            logger.warning(f"No .mp4 or .m3u8 URL found for Krakenfiles: {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Error resolving Krakenfiles URL {url}: {e}")
+            return None
+
+    async def resolve_mega_url(self, url):
+        try:
+            html = await self.get_page(url)
+            if not html:
+                logger.warning(f"Failed to fetch Mega page: {url}")
+                return None
+
+            soup = self.soup(html, HOSTER_PAGE_SECTIONS)
+            stream_url = await self.resolve_video_tag(soup, 'Mega') or await self.resolve_script_urls(soup, 'Mega')
+            if stream_url:
+                return stream_url
+
+            logger.warning(f"No .mp4 or .m3u8 URL found for Mega: {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Error resolving Mega URL {url}: {e}")
+            return None
+
+    async def resolve_pixeldrain_url(self, url):
+        try:
+            direct_url = self.pixeldrain_api_url(url)
+            if direct_url:
+                response = await self.http.head(direct_url, headers=self.headers, allow_redirects=True, timeout=10)
+                content_type = response.headers.get('Content-Type', '').lower()
+                return self.check_pixeldrain_response(direct_url, response.status_code, content_type)
+            logger.warning(f"Invalid PixelDrain URL format: {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Error resolving PixelDrain URL {url}: {e}")
+            return None
+
+    async def resolve_filemoon_url(self, url):
+        try:
+            html = await self.get_page(url)
+            if not html:
+                logger.warning(f"Failed to fetch Filemoon page: {url}")
+                return None
+
+            stream_url = self.parse_filemoon_page(html)
+            if stream_url:
+                return stream_url
+
+            logger.warning(f"No stream URL found for Filemoon: {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Error resolving Filemoon URL {url}: {e}")
+            return None
+
+    async def resolve_vidhidepro_url(self, url):
+        try:
+            html = await self.get_page(url)
+            if not html:
+                logger.warning(f"Failed to fetch VidHidePro page: {url}")
+                return None
+
+            stream_url = self.parse_vidhidepro_page(html)
+            if stream_url:
+                return stream_url
+
+            logger.warning(f"No stream URL found for VidHidePro: {url}")
+            return None
+        except Exception as e:
+            logger.error(f"Error resolving VidHidePro URL {url}: {e}")
+            return None
+
+    async def resolve_download_url(self, host, download_url):
+        hoster = self.classify_download_host(host, download_url)
+        if hoster in DIRECT_LINK_HOSTERS:
+            return download_url
+        if not hoster:
+            return None
+        state, direct_url = stream_cache.lookup((hoster, download_url))
+        if state == 'fresh':
+            return direct_url
+        if not hoster_breakers.allow(hoster):
+            logger.warning(f"Skipping {hoster} link, circuit breaker open: {download_url}")
+            return None
+        start = time.perf_counter()
+        failures = []
+        token = upstream_failures.set(failures)
+        try:
+            with trace_span(f"resolve:{hoster}", url=download_url):
+                direct_url = await getattr(self, f"resolve_{hoster}_url")(download_url)
+        except asyncio.CancelledError:
+            hoster_breakers.release(hoster)  # the caller gave up; hand a half-open probe back
+            raise
+        except Exception:
+            hoster_breakers.record(hoster, failed=True)
+            raise
+        finally:
+            upstream_failures.reset(token)
+        hoster_breakers.record(hoster, failed=bool(failures) and not direct_url)
+        record_resolution(hoster, direct_url, time.perf_counter() - start)
+        stream_cache.set((hoster, download_url), direct_url, stream_cache_ttl(hoster, direct_url))
+        return direct_url
+
+    async def resolve_download_links(self, page, deadline):
+        """Resolve download links as concurrent tasks (at most RESOLVER_WORKERS at a time) until the deadline"""
+        jobs = self.download_link_jobs(page)
+        resolved_urls = [None] * len(jobs)
+        semaphore = asyncio.Semaphore(RESOLVER_WORKERS)
+
+        async def resolve(host, download_url):
+            async with semaphore:
+                return await self.resolve_download_url(host, download_url)
+
+        tasks = {}
+        for index, (quality, host, download_url, hoster) in enumerate(jobs):
+            if self.needs_resolving(hoster) and hoster_breakers.available(hoster):
+                tasks[asyncio.ensure_future(resolve(host, download_url))] = index
+            else:
+                resolved_urls[index] = await self.resolve_download_url(host, download_url)
+
+        done, not_done = set(), set()
+        if tasks:
+            done, not_done = await asyncio.wait(tasks, timeout=max(0, deadline - time.monotonic()))
+        for task in done:
+            if task.exception() is None:
+                resolved_urls[tasks[task]] = task.result()
+            else:
+                logger.error(f"Error resolving download link: {task.exception()}")
+
+        pending_resolutions = []
+        for task in sorted(not_done, key=tasks.get):
+            # Let unfinished resolutions complete in the background instead of cancelling them
+            self.background_tasks.add(task)
+            task.add_done_callback(self.background_tasks.discard)
+            quality, host, download_url, _ = jobs[tasks[task]]
+            pending_resolutions.append(self.pending_resolution(quality, host, download_url))
+        if pending_resolutions:
+            logger.warning(f"{len(pending_resolutions)} download links still resolving after the deadline")
+
+        return resolved_urls, pending_resolutions
+
+    async def get_ajax_stream_url(self, post_id, nume, stream_type="urliframe", timeout=10):
+        try:
+            ajax_url = f"{self.base_url}/wp-admin/admin-ajax.php"
+            ajax_data = self.ajax_request_data(post_id, nume, stream_type)
+
+            with trace_span('ajax', nume=nume):
+                response = await self.http.post(ajax_url, data=ajax_data, headers=self.headers, timeout=timeout)
+                return self.parse_ajax_stream_response(response.status_code, response.text, post_id, nume)
+        except Exception as e:
+            logger.error(f"Error getting AJAX stream URL: {e}")
+            return None
+
+    async def fetch_ajax_stream_urls(self, ajax_requests):
+        async def lookup(option):
+            try:
+                return await asyncio.wait_for(
+                    self.get_ajax_stream_url(option['post_id'], option['nume'], option['type'], AJAX_TIMEOUT),
+                    timeout=AJAX_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"AJAX stream URL lookup timed out for post {option['post_id']}, nume {option['nume']}")
+                return None
+
+        ajax_urls = await asyncio.gather(*(lookup(option) for option in ajax_requests))
+        return self.collect_ajax_stream_urls(ajax_requests, ajax_urls)
+
+    async def resolve_iframe_stream(self, iframe_src):
+        response = await self.http.head(iframe_src, headers=self.headers, allow_redirects=True, timeout=10)
+        content_type = response.headers.get('Content-Type', '').lower()
+        return self.check_iframe_response(response.url, content_type)
+
+    async def get_top_anime(self):
+        logger.info("Fetching top anime list...")
+        document = await self.get_document(self.base_url)
+        if not document:
+            return []
+        return self.parse_top_anime(document)
+
+    async def get_latest_anime(self, page=1):
+        logger.info(f"Fetching latest anime releases from page {page}...")
+        html = await self.get_page(self.latest_anime_url(page))
+        if not html:
+            return {
+                'anime_list': [],
+                'current_page': page,
+                'total_pages': 1
+            }
+        return self.parse_latest_anime(html, page)
+
+    async def get_anime_details(self, url):
+        logger.info(f"Fetching anime details from {url}...")
+        html = await self.get_page(url)
+        if not html:
+            logger.error("Failed to fetch page content")
+            return {}
+        return self.parse_anime_details(html)
+
+    async def get_episode_streams(self, url, lazy=False):
+        logger.info(f"Fetching episode streams from {url}...")
+        deadline = time.monotonic() + EPISODE_RESOLVE_DEADLINE
+        html = await self.get_page(url)
+        if not html:
+            return {}
+
+        try:
+            page = self.parse_episode_page(html)
+
+            stream_url = None
+            if page['iframe_src']:
+                stream_url = await self.resolve_iframe_stream(page['iframe_src'])
+
+            ajax_stream_urls = await self.fetch_ajax_stream_urls(page['ajax_requests'])
+            if not stream_url and ajax_stream_urls:
+                stream_url = ajax_stream_urls[0]['url']
+                logger.info(f"Using AJAX stream URL as primary: {stream_url}")
+
+            if lazy:
+                resolved_urls, pending_resolutions = self.cached_download_urls(page), []
+            else:
+                resolved_urls, pending_resolutions = await self.resolve_download_links(page, deadline)
+
+            episode_data = self.build_episode_data(page, stream_url, ajax_stream_urls, resolved_urls)
+            if lazy:
+                self.attach_resolve_tokens(episode_data['download_links'], self.download_link_jobs(page), resolved_urls)
+            episode_data['pending_resolutions'] = pending_resolutions
+            episode_data['skipped_hosters'] = self.skipped_hosters(page)
+            logger.info(f"Successfully extracted streams for {page['title']}")
+            return episode_data
+
+        except Exception as e:
+            logger.error(f"Error extracting episode streams: {e}")
+            return {}
+
+    async def episode_stream_events(self, url, lazy=False):
+        logger.info(f"Streaming episode streams from {url}...")
+        deadline = time.monotonic() + EPISODE_RESOLVE_DEADLINE
+        html = await self.get_page(url)
+        if not html:
+            yield 'summary', {}
+            return
+
+        page = self.parse_episode_page(html)
+        progress = EpisodeStreamProgress(self, page, lazy)
+        yield 'episode', progress.episode()
+
+        semaphore = asyncio.Semaphore(RESOLVER_WORKERS)
+
+        async def resolve(host, download_url):
+            async with semaphore:
+                return await self.resolve_download_url(host, download_url)
+
+        ajax_deadline = time.monotonic() + AJAX_TIMEOUT
+        iframe_task = asyncio.ensure_future(self.resolve_iframe_stream(page['iframe_src'])) if page['iframe_src'] else None
+        ajax_tasks = {
+            asyncio.ensure_future(self.get_ajax_stream_url(option['post_id'], option['nume'], option['type'], AJAX_TIMEOUT)): index
+            for index, option in enumerate(page['ajax_requests'])
+        }
+        resolve_tasks = {}
+        for index, (quality, host, download_url, hoster) in enumerate(progress.jobs):
+            if lazy:
+                record = progress.direct_stream(index, progress.resolved_urls[index])
+            elif self.needs_resolving(hoster) and hoster_breakers.available(hoster):
+                resolve_tasks[asyncio.ensure_future(resolve(host, download_url))] = index
+                continue
+            else:
+                record = progress.direct_stream(index, await self.resolve_download_url(host, download_url))
+            if record:
+                yield 'direct_stream', record
+
+        pending = set(ajax_tasks) | set(resolve_tasks) | ({iframe_task} if iframe_task else set())
+        try:
+            while pending:
+                waiting_on_ajax = not pending.isdisjoint(ajax_tasks)
+                timeout = (min(ajax_deadline, deadline) if waiting_on_ajax else deadline) - time.monotonic()
+                done, pending = await asyncio.wait(pending, timeout=max(0, timeout), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if waiting_on_ajax and time.monotonic() >= ajax_deadline and ajax_deadline < deadline:
+                        logger.warning(f"{len(pending & ajax_tasks.keys())} AJAX stream URL lookups timed out")
+                        for task in pending & ajax_tasks.keys():
+                            task.cancel()
+                        pending -= ajax_tasks.keys()
+                        continue
+                    break
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        logger.error(f"Error while streaming episode lookups: {task.exception()}")
+                        continue
+                    if task is iframe_task:
+                        progress.stream_url = task.result()
+                    elif task in ajax_tasks:
+                        record = progress.ajax_stream(ajax_tasks[task], task.result())
+                        if record:
+                            yield 'ajax_stream', record
+                    else:
+                        record = progress.direct_stream(resolve_tasks[task], task.result())
+                        if record:
+                            yield 'direct_stream', record
+        finally:
+            for task in pending:
+                if task in resolve_tasks:
+                    # Let unfinished resolutions complete in the background so the stream cache gets them
+                    self.background_tasks.add(task)
+                    task.add_done_callback(self.background_tasks.discard)
+                else:
+                    task.cancel()
+
+        pending_indexes = [resolve_tasks[task] for task in pending if task in resolve_tasks]
+        if pending_indexes:
+            logger.warning(f"{len(pending_indexes)} download links still resolving after the deadline")
+        yield 'summary', progress.summary(pending_indexes)
+
+    async def search_anime(self, query):
+        logger.info(f"Searching for anime: {query}")
+        search_url = self.search_url(query)
+        html = await self.get_page(search_url)
+        if not html:
+            return []
+        return self.parse_anime_search(html, query, search_url)
+
+    async def fetch_schedule_api(self, day_name, api_day_value):
+        ajax_url = f"{self.base_url}/wp-json/custom/v1/all-schedule"
+        try:
+            logger.info(f"Fetching schedule via AJAX for day: {day_name} (parameter: {api_day_value})")
+            response = await self.http.get(ajax_url, headers=self.headers, params=self.schedule_api_params(api_day_value), timeout=10)
+
+            if response.status_code == 200:
+                try:
+                    return self.parse_schedule_api_items(response.json(), day_name)
+                except ValueError as e:
+                    logger.warning(f"Failed to parse AJAX JSON response for {day_name}: {e}")
+            else:
+                logger.warning(f"AJAX request failed with status {response.status_code} for {day_name}")
+
+        except Exception as e:
+            logger.warning(f"AJAX request failed for {day_name}: {e}, falling back to HTML parsing")
+        return []
+
+    async def fetch_schedule_soup(self):
+        html = await self.get_page(self.schedule_url())
+        return self.soup(html) if html else None
+
+    async def get_release_schedule(self, day=None):
+        logger.info(f"Fetching release schedule for day: {day if day else 'all days'}...")
+        soup = None
+        tabs = self.cached_schedule_tabs()
+        if tabs is None:
+            soup = await self.fetch_schedule_soup()
+            tabs = self.parse_schedule_days(soup) if soup else None
+            if not tabs:
+                return {} if not day else []
+            self.store_schedule_tabs(tabs)
+        days, day_data_values, default_day = tabs
+
+        wanted = self.schedule_days_wanted(days, day)
+        api_day_values = {day_name: day_data_values.get(day_name, day_name.lower()) for day_name in wanted}
+        schedule_days = {day_name: self.cached_schedule_day(api_day_values[day_name]) for day_name in wanted}
+        missing = [day_name for day_name, day_schedule in schedule_days.items() if day_schedule is None]
+        fetched = await asyncio.gather(*(self.fetch_schedule_api(day_name, api_day_values[day_name]) for day_name in missing))
+
+        schedule_data = {}
+        for day_name in wanted:
+            day_schedule = schedule_days[day_name]
+            if day_schedule is None:
+                day_schedule = fetched[missing.index(day_name)]
+                if not day_schedule and (soup is not None or day_name == default_day):
+                    soup = soup or await self.fetch_schedule_soup()
+                    day_schedule = self.parse_schedule_html(soup, day_name, default_day) if soup else []
+                self.store_schedule_day(api_day_values[day_name], day_schedule)
+            schedule_data[day_name.capitalize()] = day_schedule
+
+        return self.assemble_schedule(day, schedule_data)
+
+    async def get_genres(self):
+        logger.info("Fetching genres list...")
+        document = await self.get_document(self.base_url)
+        if not document:
+            return []
+        return self.parse_genres(document)
+
+    async def get_genre_content(self, genre_url, page=1):
+        logger.info(f"Fetching genre content from: {genre_url}, page: {page}")
+        html = await self.get_page(self.genre_page_url(genre_url, page))
+        if not html:
+            return {'content': [], 'current_page': page, 'total_pages': 1}
+        return self.parse_genre_content(html, page)
+
+class AsyncKomikindoScraper(KomikindoScraper):
+    """KomikindoScraper with non-blocking fetches, sharing all parsing with the sync scraper"""
+
+    def __init__(self, http=None, html_parser=None):
+        super().__init__(http=http or async_http_pool, html_parser=html_parser)
+
+    async def get_page(self, url):
+        """Fetch page content with error handling, retry logic, and user-agent rotation"""
+        max_retries = 3
+        retry_delay = 2
+
+        for attempt in range(max_retries):
+            try:
+                headers = self.attempt_headers(attempt)
+                logger.info(f"Attempt {attempt + 1} to fetch URL: {url} with User-Agent: {headers['User-Agent']}")
+                response = await self.http.get(url, headers=headers, timeout=10)
+                response.raise_for_status()
+                logger.info(f"Successfully fetched URL: {url}, Status Code: {response.status_code}")
+
+                if not self.is_html_response(url, response.headers.get('Content-Type', '')):
+                    return None
+
+                return page_markup(response)
+            except CircuitOpenError as e:
+                logger.warning(f"Not fetching {url}: {e}")
+                return None
+            except ASYNC_FETCH_ERRORS as e:
+                logger.error(f"Error fetching {url}: {e}")
+                if attempt < max_retries - 1:
+                    metrics.inc('upstream_retries_total', host=host_of(url))
+                    logger.info(f"Retrying in {retry_delay} seconds...")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+                else:
+                    logger.error(f"Failed to fetch {url} after {max_retries} attempts")
+                    return None
+
+    async def get_document(self, url):
+        return await page_documents.get_async(url, self.get_page, self.soup)
+
+    async def get_latest_comics(self, page=1):
+        logger.info(f"Fetching latest comics from page {page}...")
+        html = await self.get_document(self.latest_comics_url(page)) if page == 1 else await self.get_page(self.latest_comics_url(page))
+        if not html:
+            return {
+                'comic_list': [],
+                'current_page': page,
+                'total_pages': 1
+            }
+        return self.parse_latest_comics(html, page)
+
+    async def get_popular_comics(self):
+        logger.info("Fetching popular comics...")
+        document = await self.get_document(self.latest_comics_url(1))
+        if not document:
+            return []
+        return self.parse_popular_comics(document)
+
+    async def get_latest_collections(self):
+        logger.info("Fetching latest comic collections...")
+        document = await self.get_document(f"{self.base_url}/")
+        if not document:
+            return []
+        return self.parse_latest_collections(document)
+
+    async def get_comic_details(self, url):
+        logger.info(f"Fetching comic details from {url}...")
+        html = await self.get_page(url)
+        if not html:
+            return {}
+        return self.parse_comic_details(html)
+
+    async def get_chapter_images(self, url):
+        logger.info(f"Attempting to fetch chapter images from {url}")
+        html = await self.get_page(url)
+        if not html:
+            logger.error(f"Failed to retrieve HTML content for {url}")
+            return {}
+        return self.parse_chapter_images(html, url)
+
+    async def search_comics(self, query):
+        logger.info(f"Searching for comics: {query}")
+        search_url = self.search_url(query)
+        html = await self.get_page(search_url)
+        if not html:
+            return []
+        return self.parse_comic_search(html, query, search_url)
+
+# Initialize scrapers
+winbu_scraper = WinbuScraper()
+komikindo_scraper = KomikindoScraper()
+
+# Keys the cache warmer can keep fresh, matching the cache keys their routes use.
+# CACHE_WARM_KEYS names them, with an optional argument: latest-anime:2.
+# /release-schedule has no entry: its per-day caches expire at midnight WIB on their own
+WARM_TARGETS = {
+    'top-anime': lambda arg: (('top-anime',), winbu_scraper.get_top_anime, CACHE_TTLS['top-anime'], bool),
+    'latest-anime': lambda arg: (
+        ('latest-anime', int(arg or 1)), lambda: winbu_scraper.get_latest_anime(int(arg or 1)),
+        CACHE_TTLS['latest-anime'], has_list_items('anime_list')
+    ),
+    'genres': lambda arg: (('genres',), winbu_scraper.get_genres, CACHE_TTLS['genres'], bool),
+    'popular-comics': lambda arg: (('popular-comics',), komikindo_scraper.get_popular_comics, CACHE_TTLS['popular-comics'], bool),
+    'latest-collections': lambda arg: (('latest-collections',), komikindo_scraper.get_latest_collections, CACHE_TTLS['latest-collections'], bool)
+}
+
+def configure_cache_warmer(spec):
+    for item in spec.split(','):
+        name, _, arg = item.strip().partition(':')
+        if not name:
+            continue
+        if name not in WARM_TARGETS:
+            logger.warning(f"Unknown cache warm key {name!r}, expected one of {', '.join(WARM_TARGETS)}")
+            continue
+        cache_warmer.add(item.strip(), *WARM_TARGETS[name](arg or None))
+
+configure_cache_warmer(CACHE_WARM_KEYS)
+
+# Async scrapers used by the aiohttp server
+async_http_pool = AsyncHttpPool()
+async_winbu_scraper = AsyncWinbuScraper()
+async_komikindo_scraper = AsyncKomikindoScraper()
+
+def upstream_busy_response(e):
+    """503 for a request the upstream rate limiter refused to queue, with Retry-After"""
+    logger.warning(f"Refusing {request.path} request: {e}")
+    return jsonify({
+        "success": False,
+        "error": str(e)
+    }), 503, {'Retry-After': str(e.retry_after)}
+
+def chapter_url_from_input(chapter_input):
+    """Turn a chapter URL or slug into a full chapter URL, or None if the URL is invalid"""
+    # Determine if the input is a full URL or just a slug
+    if chapter_input.startswith('https://'):
+        # It's a full URL, parse and validate it
+        parsed_url = urllib.parse.urlparse(chapter_input)
+        if not parsed_url.scheme or not parsed_url.netloc:
+            logger.error(f"Invalid URL provided: {chapter_input}")
+            return None
+        return chapter_input.rstrip('/')
+    # It's a slug, reconstruct the full URL
+    return f"{komikindo_scraper.base_url}/{chapter_input.strip('/')}/"
+
+@api.route('/')
+def index():
+    return "I am alive!"
+
+@api.route('/top-anime', methods=['GET'])
+def top_anime():
+    try:
+        result = response_cache.get_or_compute(('top-anime',), winbu_scraper.get_top_anime, CACHE_TTLS['top-anime'])
+        return jsonify({
+            "success": True,
+            "data": result
+        })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in top-anime endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+def latest_anime_page(page):
+    return response_cache.get_or_compute(
+        ('latest-anime', page),
+        lambda: winbu_scraper.get_latest_anime(page),
+        CACHE_TTLS['latest-anime'],
+        cacheable=has_list_items('anime_list')
+    )
+
+def page_range_arg():
+    """?pages=1-5 as a list of pages, or a 400 response for a malformed range"""
+    try:
+        return parse_page_range(request.args.get('pages')), None
+    except ValueError as e:
+        return None, (jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400)
+
+@api.route('/latest-anime', methods=['GET'])
+def latest_anime():
+    pages, error_response = page_range_arg()
+    if error_response:
+        return error_response
+    try:
+        page = request.args.get('page', 1, type=int)
+        if pages:
+            result = fetch_page_range(latest_anime_page, pages, 'anime_list')
+        else:
+            result = latest_anime_page(page)
+        if not isinstance(result, dict) or 'anime_list' not in result:
+            logger.error("Invalid result structure from get_latest_anime")
+            result = {
+                'anime_list': [],
+                'current_page': page,
+                'total_pages': 1
+            }
+        return jsonify({
+            "success": True,
+            "data": result
+        })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in latest-anime endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "data": {
+                'anime_list': [],
+                'current_page': request.args.get('page', 1, type=int),
+                'total_pages': 1
+            }
+        }), 500
+
+@api.route('/anime-details', methods=['GET'])
+def anime_details():
+    try:
+        url = request.args.get('url')
+        if not url:
+            return jsonify({
+                "success": False,
+                "error": "Missing 'url' parameter"
+            }), 400
+
+        result = winbu_scraper.get_anime_details(url)
+        return jsonify({
+            "success": True,
+            "data": result
+        })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in anime-details endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+# Streaming /episode-streams: ?stream=ndjson|sse, or an Accept header naming either type
+EPISODE_STREAM_FORMATS = {'ndjson': 'application/x-ndjson', 'sse': 'text/event-stream'}
+# Proxies such as nginx buffer responses unless told otherwise, which would hold the events back
+STREAM_RESPONSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def episode_stream_format(stream_arg, accept):
+    """The streaming format a request asks for, or None for the plain JSON response"""
+    if stream_arg:
+        if stream_arg not in EPISODE_STREAM_FORMATS:
+            raise ValueError(f"'stream' must be one of: {', '.join(EPISODE_STREAM_FORMATS)}")
+        return stream_arg
+    for stream_format, mimetype in EPISODE_STREAM_FORMATS.items():
+        if mimetype in accept:
+            return stream_format
+    return None
+
+def format_stream_event(stream_format, event, data):
+    if stream_format == 'sse':
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({'event': event, 'data': data}) + '\n'
+
+def episode_resolve_lazy(resolve_arg):
+    """Whether ?resolve= (or EPISODE_RESOLVE_MODE when absent) asks for lazy resolution"""
+    mode = (resolve_arg or EPISODE_RESOLVE_MODE).lower()
+    if mode not in ('eager', 'lazy'):
+        raise ValueError("'resolve' must be 'eager' or 'lazy'")
+    return mode == 'lazy'
+
+def episode_stream_response(url, stream_format, lazy):
+    def generate():
+        try:
+            for event, data in winbu_scraper.episode_stream_events(url, lazy):
+                yield format_stream_event(stream_format, event, data)
+        except Exception as e:
+            logger.error(f"Error streaming episode streams: {e}")
+            yield format_stream_event(stream_format, 'error', {'error': str(e)})
+
+    return flask.Response(flask.stream_with_context(generate()), mimetype=EPISODE_STREAM_FORMATS[stream_format], headers=STREAM_RESPONSE_HEADERS)
+
+@api.route('/episode-streams', methods=['GET'])
+def episode_streams():
+    try:
+        url = request.args.get('url')
+        if not url:
+            return jsonify({
+                "success": False,
+                "error": "Missing 'url' parameter"
+            }), 400
+
+        try:
+            stream_format = episode_stream_format(request.args.get('stream'), request.headers.get('Accept', ''))
+            lazy = episode_resolve_lazy(request.args.get('resolve'))
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        if stream_format:
+            return episode_stream_response(url, stream_format, lazy)
+
+        if lazy:
+            result = scrape_flights.do(('episode-streams-lazy', url), lambda: winbu_scraper.get_episode_streams(url, lazy=True))
+        else:
+            result = scrape_flights.do(('episode-streams', url), lambda: winbu_scraper.get_episode_streams(url))
+        return jsonify({
+            "success": True,
+            "data": result
+        })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in episode-streams endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+def resolved_link(quality, host, download_url, direct_url):
+    return {
+        'quality': quality,
+        'host': host if host else 'Unknown',
+        'download_url': download_url,
+        'url': direct_url
+    }
+
+def redirect_requested(args):
+    """?redirect=1 on /resolve answers with a 302 to the direct URL, so a player can use the /resolve URL as its source"""
+    return args.get('redirect', '').lower() in ('1', 'true')
+
+@api.route('/resolve', methods=['GET'])
+def resolve():
+    """Resolve one download link from a lazy /episode-streams response into a direct URL"""
+    token = request.args.get('token')
+    if not token:
+        return jsonify({
+            "success": False,
+            "error": "Missing 'token' parameter"
+        }), 400
+    try:
+        quality, host, download_url = read_resolve_token(token)
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+    try:
+        direct_url = scrape_flights.do(('resolve', download_url), lambda: winbu_scraper.resolve_download_url(host, download_url))
+        if not direct_url:
+            return jsonify({
+                "success": False,
+                "error": f"Could not resolve the {host} link"
+            }), 502
+        if redirect_requested(request.args):
+            return flask.redirect(direct_url)
+        return jsonify({
+            "success": True,
+            "data": resolved_link(quality, host, download_url, direct_url)
+        })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in resolve endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api.route('/search', methods=['GET'])
+def search():
+    try:
+        query = request.args.get('query')
+        if not query:
+            return jsonify({
+                "success": False,
+                "error": "Missing 'query' parameter"
+            }), 400
+
+        logger.info(f"Search request received for query: '{query}'")
+        result = winbu_scraper.search_anime(query)
+        logger.info(f"Returning {len(result)} search results")
+        return jsonify({
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in search endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api.route('/release-schedule', methods=['GET'])
+def release_schedule():
+    try:
+        day = request.args.get('day')
+        # Not cached per route: the scraper caches each day and the day tabs until midnight WIB,
+        # and a route-level entry would keep serving yesterday's week past the rollover
+        result = winbu_scraper.get_release_schedule(day)
+        return jsonify({
+            "success": True,
+            "data": result
+        })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in release-schedule endpoint: {e}")
         return jsonify({
@@ -1890,11 +5470,17 @@ def release_schedule():
             "error": str(e)
         }), 500
 
-@app.route('/latest-comics', methods=['GET'])
+@api.route('/latest-comics', methods=['GET'])
 def latest_comics():
+    pages, error_response = page_range_arg()
+    if error_response:
+        return error_response
     try:
         page = request.args.get('page', 1, type=int)
-        result = komikindo_scraper.get_latest_comics(page)
+        if pages:
+            result = fetch_page_range(komikindo_scraper.get_latest_comics, pages, 'comic_list')
+        else:
+            result = komikindo_scraper.get_latest_comics(page)
         if not isinstance(result, dict) or 'comic_list' not in result:
             logger.error("Invalid result structure from get_latest_comics")
             result = {
@@ -1906,6 +5492,8 @@ def latest_comics():
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in latest-comics endpoint: {e}")
         return jsonify({
@@ -1918,14 +5506,16 @@ def latest_comics():
             }
         }), 500
 
-@app.route('/popular-comics', methods=['GET'])
+@api.route('/popular-comics', methods=['GET'])
 def popular_comics():
     try:
-        result = komikindo_scraper.get_popular_comics()
+        result = response_cache.get_or_compute(('popular-comics',), komikindo_scraper.get_popular_comics, CACHE_TTLS['popular-comics'])
         return jsonify({
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in popular-comics endpoint: {e}")
         return jsonify({
@@ -1933,14 +5523,16 @@ def popular_comics():
             "error": str(e)
         }), 500
 
-@app.route('/latest-collections', methods=['GET'])
+@api.route('/latest-collections', methods=['GET'])
 def latest_collections():
     try:
-        result = komikindo_scraper.get_latest_collections()
+        result = response_cache.get_or_compute(('latest-collections',), komikindo_scraper.get_latest_collections, CACHE_TTLS['latest-collections'])
         return jsonify({
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in latest-collections endpoint: {e}")
         return jsonify({
@@ -1948,7 +5540,7 @@ def latest_collections():
             "error": str(e)
         }), 500
 
-@app.route('/comic-details', methods=['GET'])
+@api.route('/comic-details', methods=['GET'])
 def comic_details():
     try:
         url = request.args.get('url')
@@ -1963,6 +5555,8 @@ def comic_details():
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in comic-details endpoint: {e}")
         return jsonify({
@@ -1970,7 +5564,7 @@ def comic_details():
             "error": str(e)
         }), 500
 
-@app.route('/chapter-images', methods=['GET'])
+@api.route('/chapter-images', methods=['GET'])
 def chapter_images():
     try:
         chapter_input = request.args.get('url')
@@ -1981,21 +5575,13 @@ def chapter_images():
                 "error": "Missing 'url' parameter"
             }), 400
 
-        # Determine if the input is a full URL or just a slug
-        if chapter_input.startswith('https://'):
-            # It's a full URL, parse and validate it
-            parsed_url = urllib.parse.urlparse(chapter_input)
-            if not parsed_url.scheme or not parsed_url.netloc:
-                logger.error(f"Invalid URL provided: {chapter_input}")
-                return jsonify({
-                    "success": False,
-                    "error": "Invalid URL provided"
-                }), 400
-            chapter_url = chapter_input.rstrip('/')
-        else:
-            # It's a slug, reconstruct the full URL
-            chapter_url = f"https://komikindo.ch/{chapter_input.strip('/')}/"
-
+        chapter_url = chapter_url_from_input(chapter_input)
+        if not chapter_url:
+            return jsonify({
+                "success": False,
+                "error": "Invalid URL provided"
+            }), 400
+
         logger.debug(f"Constructed chapter_url: {chapter_url}")
 
         # Validate the constructed URL
@@ -2008,7 +5594,7 @@ def chapter_images():
             }), 500
 
         logger.info(f"Fetching chapter images from: {chapter_url}")
-        result = komikindo_scraper.get_chapter_images(chapter_url)
+        result = scrape_flights.do(('chapter-images', chapter_url), lambda: komikindo_scraper.get_chapter_images(chapter_url))
         
         # Check if the result is empty or indicates a failure
         if not result or not isinstance(result, dict) or not result.get('images'):
@@ -2020,10 +5606,14 @@ def chapter_images():
             }), 500
 
         logger.info(f"Successfully fetched chapter images for URL: {chapter_url}")
+        if image_proxy_requested(request.args):
+            result = proxied_chapter_images(result, IMAGE_PROXY_BASE_URL or request.host_url.rstrip('/'))
         return jsonify({
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in chapter-images endpoint: {e}")
         return jsonify({
@@ -2032,7 +5622,81 @@ def chapter_images():
             "data": {}
         }), 500
 
-@app.route('/search-comics', methods=['GET'])
+def image_proxy_requested(args):
+    """?proxy_images=1 on /chapter-images points the image URLs at /image-proxy (IMAGE_PROXY_REWRITE sets the default)"""
+    value = args.get('proxy_images')
+    if value is None:
+        return IMAGE_PROXY_REWRITE
+    return value.lower() in ('1', 'true')
+
+def proxied_chapter_images(result, proxy_base):
+    """Copy of a chapter result whose proxiable image URLs go through /image-proxy; the upstream URL stays in original_url.
+
+    The result may be shared with coalesced callers, so it is copied rather than changed in place.
+    """
+    images = []
+    for image in result.get('images') or []:
+        if image_proxy_allowed(image.get('url', '')):
+            image = dict(image, url=f"{proxy_base}/image-proxy?{urllib.parse.urlencode({'url': image['url']})}", original_url=image['url'])
+        images.append(image)
+    return dict(result, images=images)
+
+def image_request_headers():
+    # Komikindo's CDN refuses hotlinked images without its own Referer
+    return dict(komikindo_scraper.headers, Accept='image/avif,image/webp,image/*,*/*;q=0.8')
+
+@api.route('/image-proxy', methods=['GET'])
+def image_proxy():
+    """Serve a comic image from the on-disk image cache, fetching it on a miss. Supports Range and conditional requests."""
+    image_url = request.args.get('url')
+    if not image_url:
+        return jsonify({
+            "success": False,
+            "error": "Missing 'url' parameter"
+        }), 400
+    if not image_proxy_allowed(image_url):
+        return jsonify({
+            "success": False,
+            "error": "Image host is not allowed"
+        }), 403
+
+    def fetch():
+        return scrape_flights.do(('image-proxy', image_url), lambda: image_cache.fetch(image_url, image_request_headers()))
+
+    def send(cached):
+        path, meta = cached
+        # send_file answers Range and If-None-Match/If-Modified-Since itself, and hands the file to the
+        # server's wsgi.file_wrapper, which gunicorn sends with sendfile()
+        return flask.send_file(
+            path,
+            mimetype=meta['content_type'],
+            download_name=os.path.basename(urllib.parse.urlsplit(image_url).path) or None,
+            conditional=True,
+            max_age=IMAGE_CACHE_TTL
+        )
+
+    try:
+        cached = image_cache.lookup(image_url) or fetch()
+        try:
+            return send(cached)
+        except FileNotFoundError:
+            logger.info(f"Cached image for {image_url} was evicted before it could be sent, fetching it again")
+            return send(fetch())
+    except ImageFetchError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), e.status
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
+    except Exception as e:
+        logger.error(f"Error in image-proxy endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api.route('/search-comics', methods=['GET'])
 def search_comics():
     try:
         query = request.args.get('query')
@@ -2049,6 +5713,8 @@ def search_comics():
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in search-comics endpoint: {e}")
         return jsonify({
@@ -2056,14 +5722,16 @@ def search_comics():
             "error": str(e)
         }), 500
 
-@app.route('/genres', methods=['GET'])
+@api.route('/genres', methods=['GET'])
 def genres():
     try:
-        result = winbu_scraper.get_genres()
+        result = response_cache.get_or_compute(('genres',), winbu_scraper.get_genres, CACHE_TTLS['genres'])
         return jsonify({
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in genres endpoint: {e}")
         return jsonify({
@@ -2071,8 +5739,11 @@ def genres():
             "error": str(e)
         }), 500
 
-@app.route('/genre-content', methods=['GET'])
+@api.route('/genre-content', methods=['GET'])
 def genre_content():
+    pages, error_response = page_range_arg()
+    if error_response:
+        return error_response
     try:
         genre_url = request.args.get('url')
         page = request.args.get('page', 1, type=int)
@@ -2083,11 +5754,16 @@ def genre_content():
                 "error": "Missing 'url' parameter"
             }), 400
         
-        result = winbu_scraper.get_genre_content(genre_url, page)
+        if pages:
+            result = fetch_page_range(lambda page: winbu_scraper.get_genre_content(genre_url, page), pages, 'content')
+        else:
+            result = winbu_scraper.get_genre_content(genre_url, page)
         return jsonify({
             "success": True,
             "data": result
         })
+    except UpstreamBusyError as e:
+        return upstream_busy_response(e)
     except Exception as e:
         logger.error(f"Error in genre-content endpoint: {e}")
         return jsonify({
@@ -2095,7 +5771,188 @@ def genre_content():
             "error": str(e)
         }), 500
 
-@app.route('/api/app_version', methods=['GET'])
+@api.route('/cache-info', methods=['GET'])
+def cache_info():
+    """Get response cache, stream cache and request coalescing counters"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": {
+                "response_cache": response_cache.info(),
+                "stream_cache": stream_cache.info(),
+                "coalesced_requests": scrape_flights.info(),
+                "page_documents": page_documents.info(),
+                "warmer": cache_warmer.info(),
+                "image_cache": image_cache.info()
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error in cache-info endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api.route('/clear-stream-cache', methods=['POST'])
+def clear_stream_cache():
+    """Drop all cached hoster resolutions, e.g. after a hoster changes its page layout"""
+    try:
+        cleared = stream_cache.info()['entries']
+        stream_cache.clear()
+        return jsonify({
+            "success": True,
+            "data": {
+                "cleared_entries": cleared
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error in clear-stream-cache endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of request, upstream, resolver, parser and cache metrics"""
+    return flask.Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/pool-stats', methods=['GET'])
+def pool_stats():
+    """Get shared HTTP connection pool statistics"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": dict(http_pool.stats(), rate_limits=rate_limiter.info())
+        })
+    except Exception as e:
+        logger.error(f"Error in pool-stats endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api.route('/circuit-breakers', methods=['GET'])
+def circuit_breakers():
+    """Get the state of every upstream host and file hoster circuit breaker"""
+    try:
+        return jsonify({
+            "success": True,
+            "data": circuit_breaker_status()
+        })
+    except Exception as e:
+        logger.error(f"Error in circuit-breakers endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+# POST /batch: several GET endpoints answered in one round-trip (e.g. the app's home screen)
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', 20))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 8))  # sub-requests running at once per process
+BATCH_TIMEOUT = float(os.environ.get('BATCH_TIMEOUT', 25))  # seconds per batch; unfinished items are answered with 504
+BATCH_EXCLUDED_PATHS = ('/batch', '/metrics', '/image-proxy')  # /image-proxy answers with image bytes, not JSON
+
+def parse_batch_items(payload):
+    """Validate a /batch body into [(id, path, params)], raising ValueError with a message for the client.
+
+    The body is a list (or {"requests": [...]}) of "/path?query" strings or
+    {"id": ..., "endpoint": "/path", "params": {...}} objects.
+    """
+    items = payload.get('requests') if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        raise ValueError("Body must be a JSON list of requests or an object with a 'requests' list")
+    if len(items) > BATCH_MAX_REQUESTS:
+        raise ValueError(f"At most {BATCH_MAX_REQUESTS} requests per batch")
+
+    parsed = []
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            item = {'endpoint': item}
+        if not isinstance(item, dict) or not isinstance(item.get('endpoint'), str):
+            raise ValueError(f"Request {index} needs an 'endpoint' string")
+        if not isinstance(item.get('params') or {}, dict):
+            raise ValueError(f"Request {index}: 'params' must be an object")
+        endpoint = urllib.parse.urlsplit(item['endpoint'])
+        path = '/' + endpoint.path.lstrip('/')
+        if path.rstrip('/') in BATCH_EXCLUDED_PATHS:
+            raise ValueError(f"Request {index}: {path} cannot be batched")
+        params = dict(urllib.parse.parse_qsl(endpoint.query))
+        params.update({str(name): str(value) for name, value in (item.get('params') or {}).items()})
+        if 'stream' in params:
+            raise ValueError(f"Request {index}: streamed responses cannot be batched")
+        parsed.append((item.get('id', index), path, params))
+    return parsed
+
+def batch_item_result(item_id, path, params, status, body):
+    metrics.inc('batch_items_total', status=status)
+    return {'id': item_id, 'endpoint': path, 'params': params, 'status': status, 'body': body}
+
+def batch_item_headers():
+    """Headers for sub-requests: they carry the batch's trace id so their traces and logs line up with it"""
+    current = current_trace.get()
+    return {'X-Trace-Id': current[0].trace_id} if current is not None else {}
+
+def run_batch_item(flask_app, path, params, deadline):
+    """Run one GET sub-request through the app like a direct request, returning (status, body).
+
+    Upstream calls the item makes after the batch's deadline fail fast, so a timed-out item
+    frees its worker thread instead of finishing a scrape nobody will read.
+    """
+    upstream_deadline.set(deadline)
+    with trace_span('batch-item', endpoint=path):
+        # A fresh app context gives the sub-request its own flask.g instead of sharing the batch request's
+        with flask_app.app_context(), flask_app.test_request_context(path, method='GET', query_string=params, headers=batch_item_headers()):
+            try:
+                # Includes the before/after request hooks, so the item gets metrics and its own trace
+                response = flask_app.full_dispatch_request()
+            except Exception as e:
+                logger.error(f"Error in batched {path}: {e}")
+                return 500, {"success": False, "error": str(e)}
+            body = response.get_json(silent=True)
+            return response.status_code, body if body is not None else response.get_data(as_text=True)
+
+@api.route('/batch', methods=['POST'])
+def batch():
+    """Run several GET endpoints concurrently and return each one's status and body; one failing item does not fail the batch"""
+    try:
+        items = parse_batch_items(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+    try:
+        flask_app = flask.current_app._get_current_object()
+        executor = shared_executor('batch', BATCH_WORKERS)
+        deadline = time.monotonic() + BATCH_TIMEOUT
+        futures = [submit_traced(executor, run_batch_item, flask_app, path, params, deadline) for _, path, params in items]
+        done, not_done = wait(futures, timeout=BATCH_TIMEOUT)
+        for future in not_done:
+            future.cancel()  # items still queued never start; running ones stop at their next upstream call
+
+        results = []
+        for (item_id, path, params), future in zip(items, futures):
+            if future not in done:
+                status, body = 504, {"success": False, "error": f"Timed out after {BATCH_TIMEOUT:g} seconds"}
+            elif future.exception() is not None:
+                status, body = 500, {"success": False, "error": str(future.exception())}
+            else:
+                status, body = future.result()
+            results.append(batch_item_result(item_id, path, params, status, body))
+        return jsonify({
+            "success": True,
+            "data": results
+        })
+    except Exception as e:
+        logger.error(f"Error in batch endpoint: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+@api.route('/api/app_version', methods=['GET'])
 def get_app_version():
     """Get the latest app version information"""
     try:
@@ -2110,7 +5967,7 @@ def get_app_version():
             "message": str(e)
         }), 500
 
-@app.route('/api/update', methods=['POST'])
+@api.route('/api/update', methods=['POST'])
 def update_app_version():
     """Update app version information"""
     try:
@@ -2160,11 +6017,7 @@ def update_app_version():
             "message": str(e)
         }), 500
 
-@app.route('/extract', methods=['GET', 'POST'])
-def extract_stream():
-    """Extract stream URL from embed URL or comic data."""
-    if request.method == 'GET':
-        return '''
+EXTRACT_FORM_HTML = '''
         <!DOCTYPE html>
         <html>
         <head>
@@ -2195,48 +6048,8 @@ def extract_stream():
         </html>
         '''
 
-    try:
-        if request.is_json:
-            data = request.get_json()
-        else:
-            data = request.form
-
-        if not data or 'embed_url' not in data:
-            return jsonify({"error": "Missing embed_url in request"}), 400
-
-        embed_url = data['embed_url']
-        result_type = None
-        result = None
-
-        if 'winbu.tv' in embed_url:
-            if '/anime/' in embed_url and not '/episode' in embed_url:
-                result = winbu_scraper.get_anime_details(embed_url)
-                result_type = "anime_details"
-            elif '/episode' in embed_url:
-                result = winbu_scraper.get_episode_streams(embed_url)
-                result_type = "episode_streams"
-            else:
-                query = embed_url.split('/')[-1] if '/' in embed_url else embed_url
-                result = winbu_scraper.search_anime(query)
-                result_type = "search_results"
-        elif 'komikindo.ch' in embed_url: 
-            if '/komik/' in embed_url:
-                result = komikindo_scraper.get_comic_details(embed_url)
-                result_type = "comic_details"
-            elif 'chapter-' in embed_url:
-                result = komikindo_scraper.get_chapter_images(embed_url)
-                result_type = "chapter_images"
-            else:
-                query = embed_url.split('/')[-1] if '/' in embed_url else embed_url
-                result = komikindo_scraper.search_comics(query)
-                result_type = "comic_search_results"
-        else:
-            # Treat as a search query for comics
-            result = komikindo_scraper.search_comics(embed_url)
-            result_type = "comic_search_results"
-
-        if not request.is_json:
-            return f'''
+def extract_result_html(result_type, result):
+    return f'''
             <!DOCTYPE html>
             <html>
             <head>
@@ -2265,16 +6078,8 @@ def extract_stream():
             </html>
             '''
 
-        return jsonify({
-            "success": True,
-            "type": result_type,
-            "data": result
-        })
-    except Exception as e:
-        logger.error(f"Error in extract endpoint: {e}")
-        error_response = {"error": str(e)}
-        if not request.is_json:
-            return f'''
+def extract_error_html(message):
+    return f'''
             <!DOCTYPE html>
             <html>
             <head>
@@ -2291,7 +6096,7 @@ def extract_stream():
                 <div class="container">
                     <h1>Error</h1>
                     <div class="error">
-                        <p>{str(e)}</p>
+                        <p>{message}</p>
                     </div>
                     <div class="back-button"><a href="/extract">← Back to Extractor</a>
                     </div>
@@ -2299,15 +6104,597 @@ def extract_stream():
             </body>
             </html>
             '''
+
+def extract_job(embed_url, anime, comics):
+    """Pick what /extract scrapes for embed_url: (result type, zero-argument call on the anime or comic scraper)"""
+    if 'winbu.tv' in embed_url:
+        if '/anime/' in embed_url and not '/episode' in embed_url:
+            return "anime_details", lambda: anime.get_anime_details(embed_url)
+        elif '/episode' in embed_url:
+            return "episode_streams", lambda: anime.get_episode_streams(embed_url)
+        else:
+            query = embed_url.split('/')[-1] if '/' in embed_url else embed_url
+            return "search_results", lambda: anime.search_anime(query)
+    elif 'komikindo.ch' in embed_url: 
+        if '/komik/' in embed_url:
+            return "comic_details", lambda: comics.get_comic_details(embed_url)
+        elif 'chapter-' in embed_url:
+            return "chapter_images", lambda: comics.get_chapter_images(embed_url)
+        else:
+            query = embed_url.split('/')[-1] if '/' in embed_url else embed_url
+            return "comic_search_results", lambda: comics.search_comics(query)
+    else:
+        # Treat as a search query for comics
+        return "comic_search_results", lambda: comics.search_comics(embed_url)
+
+@api.route('/extract', methods=['GET', 'POST'])
+def extract_stream():
+    """Extract stream URL from embed URL or comic data."""
+    if request.method == 'GET':
+        return EXTRACT_FORM_HTML
+
+    try:
+        if request.is_json:
+            data = request.get_json()
+        else:
+            data = request.form
+
+        if not data or 'embed_url' not in data:
+            return jsonify({"error": "Missing embed_url in request"}), 400
+
+        embed_url = data['embed_url']
+        result_type, scrape = extract_job(embed_url, winbu_scraper, komikindo_scraper)
+        result = scrape()
+
+        if not request.is_json:
+            return extract_result_html(result_type, result)
+
+        return jsonify({
+            "success": True,
+            "type": result_type,
+            "data": result
+        })
+    except Exception as e:
+        logger.error(f"Error in extract endpoint: {e}")
+        error_response = {"error": str(e)}
+        if not request.is_json:
+            return extract_error_html(str(e))
         return jsonify(error_response), 500
 
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found_error(error):
     return jsonify({
         "error": "Not Found",
         "message": "The requested URL was not found on the server."
     }), 404
 
+def create_app():
+    """Build the Flask application serving the API blueprint.
+
+    Production servers load it as a factory (gunicorn -c gunicorn.conf.py, which
+    points at backup:create_app()); python app.py uses the module-level app below.
+    """
+    flask_app = Flask(__name__)
+    CORS(flask_app, expose_headers=['Server-Timing', 'X-Trace-Id'])  # Enable CORS for all routes
+    flask_app.json = TracedJSONProvider(flask_app)
+    flask_app.register_blueprint(api)
+    return flask_app
+
+app = create_app()
+
+# Asyncio server (python app.py --async): same JSON contracts as the Flask routes above,
+# but upstream I/O never blocks a thread, so one process can hold hundreds of in-flight requests
+def async_json(payload, status=200, headers=None):
+    with trace_span('serialize'):
+        return web.json_response(payload, status=status, headers=headers)
+
+CORS_EXPOSE_HEADERS = 'Server-Timing, X-Trace-Id'
+CORS_ALLOW_METHODS = 'DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT'
+
+def async_cors_headers(request):
+    """The CORS headers flask_cors adds to Flask responses: any origin may read them, timing headers included"""
+    origin = request.headers.get('Origin')
+    if origin is None:
+        return {'Access-Control-Allow-Origin': '*', 'Access-Control-Expose-Headers': CORS_EXPOSE_HEADERS}
+    return {'Access-Control-Allow-Origin': origin, 'Access-Control-Expose-Headers': CORS_EXPOSE_HEADERS, 'Vary': 'Origin'}
+
+def async_error(endpoint, e, **extra):
+    if isinstance(e, UpstreamBusyError):
+        logger.warning(f"Refusing {endpoint} request: {e}")
+        return async_json(dict({"success": False, "error": str(e)}, **extra), status=503, headers={'Retry-After': str(e.retry_after)})
+    logger.error(f"Error in {endpoint} endpoint: {e}")
+    return async_json(dict({"success": False, "error": str(e)}, **extra), status=500)
+
+def async_missing(param):
+    return async_json({"success": False, "error": f"Missing '{param}' parameter"}, status=400)
+
+def async_int_arg(request, name, default):
+    try:
+        return int(request.query.get(name, default))
+    except ValueError:
+        return default
+
+async def async_top_anime(request):
+    try:
+        result = await response_cache.get_or_compute_async(('top-anime',), async_winbu_scraper.get_top_anime, CACHE_TTLS['top-anime'])
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('top-anime', e)
+
+def async_page_range_arg(request):
+    try:
+        return parse_page_range(request.query.get('pages')), None
+    except ValueError as e:
+        return None, async_json({"success": False, "error": str(e)}, status=400)
+
+async def async_latest_anime_page(page):
+    return await response_cache.get_or_compute_async(
+        ('latest-anime', page),
+        lambda: async_winbu_scraper.get_latest_anime(page),
+        CACHE_TTLS['latest-anime'],
+        cacheable=has_list_items('anime_list')
+    )
+
+async def async_latest_anime(request):
+    page = async_int_arg(request, 'page', 1)
+    pages, error_response = async_page_range_arg(request)
+    if error_response:
+        return error_response
+    try:
+        if pages:
+            result = await fetch_page_range_async(async_latest_anime_page, pages, 'anime_list')
+        else:
+            result = await async_latest_anime_page(page)
+        if not isinstance(result, dict) or 'anime_list' not in result:
+            logger.error("Invalid result structure from get_latest_anime")
+            result = {'anime_list': [], 'current_page': page, 'total_pages': 1}
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('latest-anime', e, data={'anime_list': [], 'current_page': page, 'total_pages': 1})
+
+async def async_anime_details(request):
+    url = request.query.get('url')
+    if not url:
+        return async_missing('url')
+    try:
+        return async_json({"success": True, "data": await async_winbu_scraper.get_anime_details(url)})
+    except Exception as e:
+        return async_error('anime-details', e)
+
+async def async_episode_stream_response(request, url, stream_format, lazy):
+    response = web.StreamResponse(headers=dict(STREAM_RESPONSE_HEADERS, **{'Content-Type': EPISODE_STREAM_FORMATS[stream_format]}))
+    trace = current_trace.get()
+    if trace is not None:
+        response.headers['X-Trace-Id'] = trace[0].trace_id
+    response.headers.update(async_cors_headers(request))  # sent before the middleware sees the response
+    await response.prepare(request)
+    try:
+        async for event, data in async_winbu_scraper.episode_stream_events(url, lazy):
+            await response.write(format_stream_event(stream_format, event, data).encode())
+    except ConnectionResetError:
+        raise  # the client went away; nothing left to write to
+    except Exception as e:
+        logger.error(f"Error streaming episode streams: {e}")
+        await response.write(format_stream_event(stream_format, 'error', {'error': str(e)}).encode())
+    await response.write_eof()
+    return response
+
+async def async_episode_streams(request):
+    url = request.query.get('url')
+    if not url:
+        return async_missing('url')
+    try:
+        stream_format = episode_stream_format(request.query.get('stream'), request.headers.get('Accept', ''))
+        lazy = episode_resolve_lazy(request.query.get('resolve'))
+    except ValueError as e:
+        return async_json({"success": False, "error": str(e)}, status=400)
+    if stream_format:
+        return await async_episode_stream_response(request, url, stream_format, lazy)
+    try:
+        if lazy:
+            result = await scrape_flights.do_async(('episode-streams-lazy', url), lambda: async_winbu_scraper.get_episode_streams(url, lazy=True))
+        else:
+            result = await scrape_flights.do_async(('episode-streams', url), lambda: async_winbu_scraper.get_episode_streams(url))
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('episode-streams', e)
+
+async def async_resolve(request):
+    token = request.query.get('token')
+    if not token:
+        return async_missing('token')
+    try:
+        quality, host, download_url = read_resolve_token(token)
+    except ValueError as e:
+        return async_json({"success": False, "error": str(e)}, status=400)
+    try:
+        direct_url = await scrape_flights.do_async(('resolve', download_url), lambda: async_winbu_scraper.resolve_download_url(host, download_url))
+        if not direct_url:
+            return async_json({"success": False, "error": f"Could not resolve the {host} link"}, status=502)
+        if redirect_requested(request.query):
+            raise web.HTTPFound(direct_url)
+        return async_json({"success": True, "data": resolved_link(quality, host, download_url, direct_url)})
+    except web.HTTPException:
+        raise
+    except Exception as e:
+        return async_error('resolve', e)
+
+async def async_search(request):
+    query = request.query.get('query')
+    if not query:
+        return async_missing('query')
+    try:
+        return async_json({"success": True, "data": await async_winbu_scraper.search_anime(query)})
+    except Exception as e:
+        return async_error('search', e)
+
+async def async_release_schedule(request):
+    try:
+        day = request.query.get('day')
+        result = await async_winbu_scraper.get_release_schedule(day)  # cached per day inside the scraper
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('release-schedule', e)
+
+async def async_latest_comics(request):
+    page = async_int_arg(request, 'page', 1)
+    pages, error_response = async_page_range_arg(request)
+    if error_response:
+        return error_response
+    try:
+        if pages:
+            result = await fetch_page_range_async(async_komikindo_scraper.get_latest_comics, pages, 'comic_list')
+        else:
+            result = await async_komikindo_scraper.get_latest_comics(page)
+        if not isinstance(result, dict) or 'comic_list' not in result:
+            logger.error("Invalid result structure from get_latest_comics")
+            result = {'comic_list': [], 'current_page': page, 'total_pages': 1}
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('latest-comics', e, data={'comic_list': [], 'current_page': page, 'total_pages': 1})
+
+async def async_popular_comics(request):
+    try:
+        result = await response_cache.get_or_compute_async(('popular-comics',), async_komikindo_scraper.get_popular_comics, CACHE_TTLS['popular-comics'])
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('popular-comics', e)
+
+async def async_latest_collections(request):
+    try:
+        result = await response_cache.get_or_compute_async(('latest-collections',), async_komikindo_scraper.get_latest_collections, CACHE_TTLS['latest-collections'])
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('latest-collections', e)
+
+async def async_comic_details(request):
+    url = request.query.get('url')
+    if not url:
+        return async_missing('url')
+    try:
+        return async_json({"success": True, "data": await async_komikindo_scraper.get_comic_details(url)})
+    except Exception as e:
+        return async_error('comic-details', e)
+
+async def async_chapter_images(request):
+    chapter_input = request.query.get('url')
+    if not chapter_input:
+        logger.error("Missing 'url' parameter in chapter-images request")
+        return async_missing('url')
+    try:
+        chapter_url = chapter_url_from_input(chapter_input)
+        if not chapter_url:
+            return async_json({"success": False, "error": "Invalid URL provided"}, status=400)
+
+        result = await scrape_flights.do_async(('chapter-images', chapter_url), lambda: async_komikindo_scraper.get_chapter_images(chapter_url))
+        if not result or not isinstance(result, dict) or not result.get('images'):
+            logger.warning(f"No images found for chapter URL: {chapter_url}")
+            return async_json({"success": False, "error": "Failed to fetch chapter images", "data": {}}, status=500)
+        if image_proxy_requested(request.query):
+            result = proxied_chapter_images(result, IMAGE_PROXY_BASE_URL or str(request.url.origin()))
+        return async_json({"success": True, "data": result})
+    except UpstreamBusyError as e:
+        return async_error('chapter-images', e, data={})
+    except Exception as e:
+        logger.error(f"Error in chapter-images endpoint: {e}")
+        return async_json({"success": False, "error": f"Server error: {str(e)}", "data": {}}, status=500)
+
+async def async_image_proxy(request):
+    image_url = request.query.get('url')
+    if not image_url:
+        return async_missing('url')
+    if not image_proxy_allowed(image_url):
+        return async_json({"success": False, "error": "Image host is not allowed"}, status=403)
+    try:
+        cached = image_cache.lookup(image_url)
+        if cached is None:
+            cached = await scrape_flights.do_async(('image-proxy', image_url), lambda: image_cache.fetch_async(image_url, image_request_headers()))
+        path, meta = cached
+        # FileResponse handles Range and conditional requests and uses loop.sendfile(). lookup() and
+        # fetch_async() leave the image just used, so eviction spares it until FileResponse opens it
+        return web.FileResponse(path, headers={
+            'Content-Type': meta['content_type'],
+            'Cache-Control': f"public, max-age={IMAGE_CACHE_TTL}"
+        })
+    except ImageFetchError as e:
+        return async_json({"success": False, "error": str(e)}, status=e.status)
+    except Exception as e:
+        return async_error('image-proxy', e)
+
+async def async_search_comics(request):
+    query = request.query.get('query')
+    if not query:
+        return async_missing('query')
+    try:
+        return async_json({"success": True, "data": await async_komikindo_scraper.search_comics(query)})
+    except Exception as e:
+        return async_error('search-comics', e)
+
+async def async_genres(request):
+    try:
+        result = await response_cache.get_or_compute_async(('genres',), async_winbu_scraper.get_genres, CACHE_TTLS['genres'])
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('genres', e)
+
+async def async_genre_content(request):
+    genre_url = request.query.get('url')
+    if not genre_url:
+        return async_missing('url')
+    pages, error_response = async_page_range_arg(request)
+    if error_response:
+        return error_response
+    try:
+        if pages:
+            result = await fetch_page_range_async(lambda page: async_winbu_scraper.get_genre_content(genre_url, page), pages, 'content')
+        else:
+            result = await async_winbu_scraper.get_genre_content(genre_url, async_int_arg(request, 'page', 1))
+        return async_json({"success": True, "data": result})
+    except Exception as e:
+        return async_error('genre-content', e)
+
+async def run_async_batch_item(request, path, params):
+    sub_request = request.clone(rel_url=request.rel_url.with_path(path).with_query(params), headers=batch_item_headers())
+    with trace_span('batch-item', endpoint=path):
+        try:
+            match_info = await request.app.router.resolve(sub_request)
+            sub_request._match_info = match_info  # what aiohttp's own dispatch sets; the metrics middleware reads the route from it
+            handler = match_info.handler
+            # Run the app's middlewares too, so the item gets metrics and its own trace like a direct request
+            for middleware in reversed(request.app.middlewares):
+                handler = functools.partial(middleware, handler=handler)
+            response = await handler(sub_request)
+        except web.HTTPException as e:
+            return e.status, {"success": False, "error": e.reason}
+        except Exception as e:
+            logger.error(f"Error in batched {path}: {e}")
+            return 500, {"success": False, "error": str(e)}
+    if response.content_type == 'application/json':
+        return response.status, json.loads(response.text)
+    return response.status, response.text
+
+async def async_batch(request):
+    # aiohttp refuses to clone a request once its body is read, so keep an unread GET copy for the sub-requests
+    template = request.clone(method='GET')
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None  # same answer as Flask's get_json(silent=True)
+    try:
+        items = parse_batch_items(payload)
+    except ValueError as e:
+        return async_json({"success": False, "error": str(e)}, status=400)
+
+    tasks = [asyncio.ensure_future(run_async_batch_item(template, path, params)) for _, path, params in items]
+    done, not_done = await asyncio.wait(tasks, timeout=BATCH_TIMEOUT)
+    for task in not_done:
+        task.cancel()  # shared single-flight fetches keep running for their other callers
+
+    results = []
+    for (item_id, path, params), task in zip(items, tasks):
+        if task not in done:
+            status, body = 504, {"success": False, "error": f"Timed out after {BATCH_TIMEOUT:g} seconds"}
+        else:
+            status, body = task.result()
+        results.append(batch_item_result(item_id, path, params, status, body))
+    return async_json({"success": True, "data": results})
+
+async def async_index(request):
+    return web.Response(text="I am alive!")
+
+async def close_async_http_pool(app):
+    await async_http_pool.close()
+
+async def async_metrics(request):
+    return web.Response(text=metrics.render(), content_type='text/plain', headers={'X-Metrics-Format': 'prometheus-0.0.4'})
+
+async def async_circuit_breakers(request):
+    return async_json({"success": True, "data": circuit_breaker_status()})
+
+async def async_cache_info(request):
+    try:
+        return async_json({
+            "success": True,
+            "data": {
+                "response_cache": response_cache.info(),
+                "stream_cache": stream_cache.info(),
+                "coalesced_requests": scrape_flights.info(),
+                "page_documents": page_documents.info(),
+                "warmer": cache_warmer.info(),
+                "image_cache": image_cache.info()
+            }
+        })
+    except Exception as e:
+        return async_error('cache-info', e)
+
+async def async_clear_stream_cache(request):
+    try:
+        cleared = stream_cache.info()['entries']
+        stream_cache.clear()
+        return async_json({"success": True, "data": {"cleared_entries": cleared}})
+    except Exception as e:
+        return async_error('clear-stream-cache', e)
+
+async def async_pool_stats(request):
+    try:
+        return async_json({"success": True, "data": dict(async_http_pool.stats(), rate_limits=rate_limiter.info())})
+    except Exception as e:
+        return async_error('pool-stats', e)
+
+async def async_get_app_version(request):
+    global app_version_data
+    try:
+        app_version_data = load_app_version()
+        return async_json(app_version_data)
+    except Exception as e:
+        logger.error(f"Error in app_version endpoint: {e}")
+        return async_json({"error": "Failed to get app version", "message": str(e)}, status=500)
+
+async def async_update_app_version(request):
+    global app_version_data
+    try:
+        if request.content_type != 'application/json':
+            return async_json({"error": "Invalid request format", "message": "Request must be JSON"}, status=400)
+        data = await request.json()
+        if not all(key in data for key in ['version', 'download_url', 'changelog']):
+            return async_json({
+                "error": "Missing required fields",
+                "message": "version, download_url, and changelog are required"
+            }, status=400)
+        app_version_data = {
+            "version": data['version'],
+            "download_url": data['download_url'],
+            "changelog": data['changelog']
+        }
+        if save_app_version(app_version_data):
+            logger.info(f"App version updated to {data['version']}")
+            return async_json({"success": True, "message": "App version updated successfully", "data": app_version_data})
+        return async_json({"error": "Failed to save version data", "message": "Could not write to version file"}, status=500)
+    except Exception as e:
+        logger.error(f"Error in update endpoint: {e}")
+        return async_json({"error": "Failed to update app version", "message": str(e)}, status=500)
+
+async def async_extract(request):
+    if request.method == 'GET':
+        return web.Response(text=EXTRACT_FORM_HTML, content_type='text/html')
+    is_json = request.content_type == 'application/json'
+    try:
+        data = await request.json() if is_json else await request.post()
+        if not data or 'embed_url' not in data:
+            return async_json({"error": "Missing embed_url in request"}, status=400)
+        result_type, scrape = extract_job(data['embed_url'], async_winbu_scraper, async_komikindo_scraper)
+        result = await scrape()
+        if not is_json:
+            return web.Response(text=extract_result_html(result_type, result), content_type='text/html')
+        return async_json({"success": True, "type": result_type, "data": result})
+    except Exception as e:
+        logger.error(f"Error in extract endpoint: {e}")
+        if not is_json:
+            return web.Response(text=extract_error_html(str(e)), content_type='text/html')
+        return async_json({"error": str(e)}, status=500)
+
+def create_async_app():
+    """Build the aiohttp application serving the scraper endpoints"""
+    if web is None:
+        raise RuntimeError("aiohttp is required for the async server (pip install aiohttp)")
+
+    @web.middleware
+    async def cors(request, handler):
+        if request.method == 'OPTIONS' and not isinstance(request.match_info.http_exception, web.HTTPNotFound):
+            response = web.Response()  # preflight (or plain OPTIONS), answered for every route like Flask does
+            if 'Access-Control-Request-Method' in request.headers:
+                response.headers['Access-Control-Allow-Methods'] = CORS_ALLOW_METHODS
+            if 'Access-Control-Request-Headers' in request.headers:
+                response.headers['Access-Control-Allow-Headers'] = request.headers['Access-Control-Request-Headers']
+        else:
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                e.headers.update(async_cors_headers(request))  # e.g. the /resolve redirect
+                raise
+        if not response.prepared:
+            response.headers.update(async_cors_headers(request))
+        return response
+
+    @web.middleware
+    async def json_not_found(request, handler):
+        try:
+            return await handler(request)
+        except web.HTTPNotFound:
+            return async_json({
+                "error": "Not Found",
+                "message": "The requested URL was not found on the server."
+            }, status=404)
+
+    @web.middleware
+    async def record_request_metrics(request, handler):
+        cache_warmer.start()
+        started = time.perf_counter()
+        trace, token = start_trace(request.headers)
+        status = 500
+        try:
+            response = await handler(request)
+            status = response.status
+            trace.root.finish()
+            if response.prepared:
+                return response  # streamed: the headers are already sent
+            response.headers['X-Trace-Id'] = trace.trace_id
+            response.headers['Server-Timing'] = trace.server_timing()
+            response.headers['Timing-Allow-Origin'] = '*'
+            if trace_debug_requested(request.query) and isinstance(response, web.Response) and response.content_type == 'application/json':
+                payload = json.loads(response.text)
+                if isinstance(payload, dict):
+                    payload['trace'] = trace.to_dict()
+                    response.text = json.dumps(payload)
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        except asyncio.CancelledError:
+            status = 499  # the client (or a timed-out batch) gave up; not a server error
+            raise
+        finally:
+            end_trace(token)
+            resource = request.match_info.route.resource
+            route = resource.canonical if resource is not None else 'unmatched'
+            metrics.observe('http_request_duration_seconds', time.perf_counter() - started, route=route)
+            metrics.inc('http_requests_total', route=route, method=request.method, status=status)
+
+    async_app = web.Application(middlewares=[record_request_metrics, cors, json_not_found])
+    async_app.router.add_get('/', async_index)
+    async_app.router.add_get('/metrics', async_metrics)
+    async_app.router.add_get('/circuit-breakers', async_circuit_breakers)
+    async_app.router.add_get('/cache-info', async_cache_info)
+    async_app.router.add_post('/clear-stream-cache', async_clear_stream_cache)
+    async_app.router.add_get('/pool-stats', async_pool_stats)
+    async_app.router.add_get('/api/app_version', async_get_app_version)
+    async_app.router.add_post('/api/update', async_update_app_version)
+    async_app.router.add_get('/extract', async_extract)
+    async_app.router.add_post('/extract', async_extract)
+    async_app.router.add_post('/batch', async_batch)
+    async_app.router.add_get('/top-anime', async_top_anime)
+    async_app.router.add_get('/latest-anime', async_latest_anime)
+    async_app.router.add_get('/anime-details', async_anime_details)
+    async_app.router.add_get('/episode-streams', async_episode_streams)
+    async_app.router.add_get('/resolve', async_resolve)
+    async_app.router.add_get('/search', async_search)
+    async_app.router.add_get('/release-schedule', async_release_schedule)
+    async_app.router.add_get('/latest-comics', async_latest_comics)
+    async_app.router.add_get('/popular-comics', async_popular_comics)
+    async_app.router.add_get('/latest-collections', async_latest_collections)
+    async_app.router.add_get('/comic-details', async_comic_details)
+    async_app.router.add_get('/chapter-images', async_chapter_images)
+    async_app.router.add_get('/image-proxy', async_image_proxy)
+    async_app.router.add_get('/search-comics', async_search_comics)
+    async_app.router.add_get('/genres', async_genres)
+    async_app.router.add_get('/genre-content', async_genre_content)
+    async_app.on_cleanup.append(close_async_http_pool)
+    return async_app
+
 if __name__ == '__main__':
-    keep_alive()  # Start keep-alive server
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    if '--async' in sys.argv:
+        # Serve the scraper endpoints from the asyncio server instead of Flask
+        web.run_app(create_async_app(), host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
+    else:
+        keep_alive()  # Start keep-alive server
+        app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
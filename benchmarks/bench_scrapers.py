@@ -0,0 +1,191 @@
+"""Time and memory-profile every scraper extraction method on the saved fixture pages.
+
+Usage:
+    python benchmarks/bench_scrapers.py [--parser auto] [--repeat 20] [--output report.json]
+    python benchmarks/bench_scrapers.py --compare old-report.json [--threshold 20]
+
+No network is used: parse_* methods are fed the fixture bytes directly, and the
+resolvers that need follow-up requests run against FixtureHttp. The JSON report carries
+the commit, Python/BeautifulSoup versions and parser so runs can be compared across
+commits; --compare exits non-zero when any case's median slows down by more than
+--threshold percent.
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import bs4
+
+from fixture_http import REPO_DIR, FixtureHttp, fixture, load_backup, reset_caches
+
+WINBU_SEARCH_URL = 'https://winbu.tv/?s=judul'
+KOMIKINDO_SEARCH_URL = 'https://komikindo.ch/?s=judul'
+CHAPTER_URL = 'https://komikindo.ch/komik-judul-chapter-12'
+
+
+def parse_schedule_page(winbu, page):
+    """The HTML half of get_release_schedule: day tabs, then every day's fallback list"""
+    soup = winbu.soup(page)
+    days, _, default_day = winbu.parse_schedule_days(soup)
+    return {day_name: winbu.parse_schedule_html(soup, day_name, default_day) for day_name in days}
+
+
+# (case name, fixture page, call taking (winbu, komikindo, page markup))
+CASES = (
+    ('winbu.parse_top_anime', 'winbu_home.html', lambda w, k, page: w.parse_top_anime(page)),
+    ('winbu.parse_genres', 'winbu_home.html', lambda w, k, page: w.parse_genres(page)),
+    ('winbu.parse_latest_anime', 'winbu_animedonghua.html', lambda w, k, page: w.parse_latest_anime(page, 1)),
+    ('winbu.parse_anime_details', 'winbu_anime_detail.html', lambda w, k, page: w.parse_anime_details(page)),
+    ('winbu.parse_episode_page', 'winbu_episode.html', lambda w, k, page: w.parse_episode_page(page)),
+    ('winbu.parse_schedule_html', 'winbu_jadwal_rilis.html', lambda w, k, page: parse_schedule_page(w, page)),
+    ('winbu.parse_schedule_api_items', 'winbu_schedule_api.json', lambda w, k, page: w.parse_schedule_api_items(json.loads(page), 'Rabu')),
+    ('winbu.parse_genre_content', 'winbu_genre.html', lambda w, k, page: w.parse_genre_content(page, 2)),
+    ('winbu.parse_anime_search', 'winbu_search.html', lambda w, k, page: w.parse_anime_search(page, 'judul', WINBU_SEARCH_URL)),
+    ('winbu.parse_filemoon_page', 'host_filemoon.html', lambda w, k, page: w.parse_filemoon_page(page)),
+    ('winbu.resolve_krakenfiles_url', 'host_krakenfiles.html', lambda w, k, page: w.resolve_krakenfiles_url('https://krakenfiles.com/view/x/file.html')),
+    ('winbu.resolve_mega_url', 'host_mega.html', lambda w, k, page: w.resolve_mega_url('https://mega.nz/file/x')),
+    ('komikindo.parse_latest_comics', 'komikindo_terbaru.html', lambda w, k, page: k.parse_latest_comics(page, 1)),
+    ('komikindo.parse_popular_comics', 'komikindo_terbaru.html', lambda w, k, page: k.parse_popular_comics(page)),
+    ('komikindo.parse_latest_collections', 'komikindo_home.html', lambda w, k, page: k.parse_latest_collections(page)),
+    ('komikindo.parse_comic_details', 'komikindo_comic_detail.html', lambda w, k, page: k.parse_comic_details(page)),
+    ('komikindo.parse_chapter_images', 'komikindo_chapter.html', lambda w, k, page: k.parse_chapter_images(page, CHAPTER_URL)),
+    ('komikindo.parse_comic_search', 'komikindo_search.html', lambda w, k, page: k.parse_comic_search(page, 'judul', KOMIKINDO_SEARCH_URL)),
+)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_case(backup, call, winbu, komikindo, page, repeat, warmup):
+    for _ in range(warmup):
+        call(winbu, komikindo, page)
+
+    timings = []
+    for _ in range(repeat):
+        reset_caches(backup)
+        start = time.perf_counter()
+        call(winbu, komikindo, page)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    reset_caches(backup)
+    tracemalloc.start()
+    call(winbu, komikindo, page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+
+def run(parser, repeat, warmup, selected=None):
+    backup = load_backup()
+    logging.disable(logging.CRITICAL)
+    http = FixtureHttp()
+    winbu = backup.WinbuScraper(http=http, html_parser=parser)
+    komikindo = backup.KomikindoScraper(http=http, html_parser=parser)
+
+    results = {}
+    for name, page_name, call in CASES:
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        page = fixture(page_name)
+        if page_name.endswith('.html'):
+            page = backup.PageMarkup(page, 'UTF-8')
+        results[name] = dict(run_case(backup, call, winbu, komikindo, page, repeat, warmup), fixture=page_name, bytes=len(page))
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'beautifulsoup': bs4.__version__,
+            'parser': winbu.html_parser,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare(old_report, new_report, threshold):
+    """Print median deltas per case; return the names of cases that regressed beyond threshold"""
+    print(f"comparing {old_report['meta'].get('commit')} ({old_report['meta'].get('parser')}) "
+          f"-> {new_report['meta'].get('commit')} ({new_report['meta'].get('parser')})")
+    if old_report['meta'].get('parser') != new_report['meta'].get('parser'):
+        print("  warning: the reports were made with different parsers")
+    regressions = []
+    for name, new in new_report['results'].items():
+        old = old_report['results'].get(name)
+        if not old:
+            print(f"  {name:<40} new case")
+            continue
+        change = 100 * (new['median_ms'] / old['median_ms'] - 1) if old['median_ms'] else 0.0
+        memory_change = 100 * (new['peak_kib'] / old['peak_kib'] - 1) if old['peak_kib'] else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"  {name:<40} {old['median_ms']:>9} -> {new['median_ms']:>9} ms ({change:+.1f}%)  "
+              f"mem {memory_change:+.1f}%{flag}")
+    return regressions
+
+
+def print_report(report):
+    meta = report['meta']
+    print(f"commit {meta['commit']}  python {meta['python']}  bs4 {meta['beautifulsoup']}  "
+          f"parser {meta['parser']}  {meta['repeat']} runs")
+    print(f"{'case':<40}{'median ms':>11}{'p95 ms':>10}{'peak KiB':>10}")
+    for name, result in report['results'].items():
+        print(f"{name:<40}{result['median_ms']:>11}{result['p95_ms']:>10}{result['peak_kib']:>10}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--parser', default=None, help="html.parser, lxml, ... (default: HTML_PARSER / auto)")
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    arg_parser.add_argument('--warmup', type=int, default=2)
+    arg_parser.add_argument('--case', action='append', help="only run cases whose name contains this text")
+    arg_parser.add_argument('--output', help="write the JSON report to this file")
+    arg_parser.add_argument('--compare', help="earlier JSON report to compare medians against")
+    arg_parser.add_argument('--threshold', type=float, default=20.0, help="allowed median slowdown in percent")
+    args = arg_parser.parse_args()
+
+    report = run(args.parser, args.repeat, args.warmup, args.case)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than {args.threshold}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
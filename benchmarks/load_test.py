@@ -0,0 +1,112 @@
+"""Drive the API with concurrent clients and report throughput and tail latency.
+
+Usage: python benchmarks/load_test.py [--base-url http://127.0.0.1:5000] [--concurrency 32]
+                                      [--duration 30] [--path /top-anime --path ...] [--output report.json]
+
+Meant to run against an API whose upstream hosts point at benchmarks/mock_upstream.py,
+so the numbers reflect this server rather than winbu.tv or komikindo.ch.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+import requests
+
+DEFAULT_PATHS = (
+    '/top-anime',
+    '/latest-anime?page=1',
+    '/genres',
+    '/release-schedule?day=rabu',
+    '/anime-details?url=https://winbu.tv/anime/judul-1/',
+    '/episode-streams?url=https://winbu.tv/judul-1-episode-5/',
+    '/popular-comics',
+    '/latest-comics?page=1',
+    '/chapter-images?url=komik-judul-chapter-12',
+)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_load(base_url, paths, concurrency, duration, timeout):
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    latencies = {path: [] for path in paths}
+    statuses = {}
+
+    def client(offset):
+        session = requests.Session()
+        index = offset
+        while time.monotonic() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                status = session.get(base_url + path, timeout=timeout).status_code
+            except requests.exceptions.RequestException:
+                status = 'error'
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies[path].append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    every_latency = [value for values in latencies.values() for value in values]
+
+    def summary(values):
+        if not values:
+            return {'requests': 0}
+        return {
+            'requests': len(values),
+            'p50_ms': round(statistics.median(values), 1),
+            'p95_ms': round(percentile(values, 0.95), 1),
+            'p99_ms': round(percentile(values, 0.99), 1),
+            'max_ms': round(max(values), 1)
+        }
+
+    return {
+        'base_url': base_url,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 1),
+        'requests_per_second': round(len(every_latency) / elapsed, 1),
+        'statuses': statuses,
+        'overall': summary(every_latency),
+        'paths': {path: summary(values) for path, values in latencies.items()}
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    arg_parser.add_argument('--concurrency', type=int, default=32)
+    arg_parser.add_argument('--duration', type=float, default=30)
+    arg_parser.add_argument('--timeout', type=float, default=30)
+    arg_parser.add_argument('--path', action='append', help="endpoint to request (repeatable)")
+    arg_parser.add_argument('--output', help="write the JSON report to this file")
+    args = arg_parser.parse_args()
+
+    report = run_load(args.base_url.rstrip('/'), tuple(args.path or DEFAULT_PATHS), args.concurrency, args.duration, args.timeout)
+    overall = report['overall']
+    print(f"{report['requests_per_second']} req/s over {report['duration_s']}s with {args.concurrency} clients, "
+          f"p50 {overall.get('p50_ms')} ms, p95 {overall.get('p95_ms')} ms, p99 {overall.get('p99_ms')} ms")
+    print(f"statuses: {report['statuses']}")
+    for path, result in report['paths'].items():
+        print(f"  {path:<60} n={result['requests']:<6} p50={result.get('p50_ms')} p99={result.get('p99_ms')}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
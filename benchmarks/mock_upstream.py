@@ -0,0 +1,221 @@
+"""Local stand-in for winbu.tv, komikindo.ch and the file hosts, for load-testing the API offline.
+
+Usage:
+    python benchmarks/mock_upstream.py [--port 8800] [--latency-ms 150] [--jitter-ms 50]
+                                       [--error-rate 0.01] [--rate-limit-rate 0.02]
+                                       [--host-latency filemoon.sx=800 ...]
+
+Then start the API with every upstream host pointed at the mock:
+
+    UPSTREAM_HOST_OVERRIDES='*=http://127.0.0.1:8800' python backup.py
+
+The original host arrives in the Host header and picks the site. The mock serves:
+- the saved fixture pages for winbu.tv and komikindo.ch
+- admin-ajax.php player lookups and wp-json/custom/v1/all-schedule
+- Pixeldrain, Krakenfiles, Filemoon and Mega pages, plus small media and image bodies
+
+Sites can also be reached under a path prefix, e.g.
+WINBU_BASE_URL=http://127.0.0.1:8800/winbu.tv. In that mode, site links in the served pages
+are rewritten to the same prefix form. Hoster resolvers build absolute hoster URLs, so
+they still need UPSTREAM_HOST_OVERRIDES.
+
+GET /__mock__/stats returns request counts per host and status; POST /__mock__/reset clears them.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fixture_http import route_fixture
+
+SITE_HOSTS = ('winbu.tv', 'komikindo.ch')
+MEDIA_TYPES = {
+    '.mp4': 'video/mp4',
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp'
+}
+MEDIA_BODY = bytes(range(256)) * 256  # 64 KiB stand-in for video segments and chapter images
+
+
+class MockSettings:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit_rate=0.0, host_latency_ms=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.host_latency_ms = host_latency_ms or {}
+
+    def delay(self, host):
+        latency = self.host_latency_ms.get(host, self.latency_ms)
+        return max(0.0, latency + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+
+class MockStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def record(self, host, status):
+        with self._lock:
+            per_host = self.counts.setdefault(host, {})
+            per_host[str(status)] = per_host.get(str(status), 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(statuses) for host, statuses in self.counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+
+def media_response(path):
+    for extension, content_type in MEDIA_TYPES.items():
+        if path.lower().endswith(extension):
+            return 200, MEDIA_BODY, content_type
+    if path.startswith('/api/file/'):  # Pixeldrain file API
+        return 200, MEDIA_BODY, 'video/mp4'
+    return None
+
+
+def rewrite_site_links(body, base):
+    """Point absolute site links at the mock's path-prefix form (http://mock/winbu.tv/...)"""
+    for host in SITE_HOSTS:
+        body = body.replace(f'https://{host}'.encode(), f'{base}/{host}'.encode())
+    return body
+
+
+class MockUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real sites
+    settings = MockSettings()
+    stats = MockStats()
+
+    def log_message(self, format, *args):
+        pass
+
+    def resolve_target(self):
+        """Return (upstream host, path, query dict, prefixed) for this request"""
+        parsed = urllib.parse.urlsplit(self.path)
+        host = (self.headers.get('Host') or '').split(':')[0].lower()
+        path = parsed.path
+        prefixed = False
+        first_segment = path.lstrip('/').split('/', 1)[0].lower()
+        if first_segment in SITE_HOSTS:
+            host = first_segment
+            path = '/' + path.lstrip('/')[len(first_segment):].lstrip('/')
+            prefixed = True
+        return host, path, dict(urllib.parse.parse_qsl(parsed.query)), prefixed
+
+    def read_form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return dict(urllib.parse.parse_qsl(self.rfile.read(length).decode('utf-8', 'replace')))
+
+    def send_body(self, status, body, content_type, extra_headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def handle_control(self, path):
+        if path == '/__mock__/stats':
+            self.send_body(200, json.dumps(self.stats.snapshot(), sort_keys=True).encode(), 'application/json')
+            return True
+        if path == '/__mock__/reset' and self.command == 'POST':
+            self.stats.reset()
+            self.send_body(204, b'', 'text/plain')
+            return True
+        return False
+
+    def handle_upstream(self):
+        form = self.read_form() if self.command == 'POST' else {}
+        host, path, query, prefixed = self.resolve_target()
+        if path.startswith('/__mock__/') and self.handle_control(path):
+            return
+
+        delay = self.settings.delay(host)
+        if delay:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < self.settings.rate_limit_rate:
+            self.stats.record(host, 429)
+            self.send_body(429, b'Too Many Requests', 'text/plain', {'Retry-After': '1'})
+            return
+        if roll < self.settings.rate_limit_rate + self.settings.error_rate:
+            status = random.choice((500, 502, 503))
+            self.stats.record(host, status)
+            self.send_body(status, b'upstream error', 'text/plain')
+            return
+
+        response = media_response(path) if host not in SITE_HOSTS else None
+        status, body, content_type = response or route_fixture(self.command, host, path, query, form)
+        if prefixed and content_type.startswith('text/html'):
+            body = rewrite_site_links(body, f"http://{self.headers.get('Host', '127.0.0.1')}")
+        self.stats.record(host, status)
+        self.send_body(status, body, content_type)
+
+    do_GET = handle_upstream
+    do_HEAD = handle_upstream
+    do_POST = handle_upstream
+
+
+def parse_host_latency(values):
+    latencies = {}
+    for value in values or []:
+        host, _, milliseconds = value.partition('=')
+        latencies[host.strip().lower()] = float(milliseconds)
+    return latencies
+
+
+def serve(port, settings, host='127.0.0.1'):
+    """Start the mock in a background thread and return the server (call shutdown() to stop)"""
+    MockUpstreamHandler.settings = settings
+    server = ThreadingHTTPServer((host, port), MockUpstreamHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8800)
+    arg_parser.add_argument('--latency-ms', type=float, default=0, help="added to every response")
+    arg_parser.add_argument('--jitter-ms', type=float, default=0, help="random +/- spread around the latency")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 5xx")
+    arg_parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="fraction answered with 429")
+    arg_parser.add_argument('--host-latency', action='append', metavar='HOST=MS', help="per-host latency override")
+    args = arg_parser.parse_args()
+
+    settings = MockSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        host_latency_ms=parse_host_latency(args.host_latency)
+    )
+    MockUpstreamHandler.settings = settings
+    server = ThreadingHTTPServer((args.host, args.port), MockUpstreamHandler)
+    server.daemon_threads = True
+    print(f"mock upstream on http://{args.host}:{args.port}")
+    print(f"  UPSTREAM_HOST_OVERRIDES='*=http://{args.host}:{args.port}'")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
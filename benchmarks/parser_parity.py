@@ -0,0 +1,61 @@
+"""Check that every scraper get_* method returns identical output on each HTML parser backend.
+
+Usage: python benchmarks/parser_parity.py [parser ...]
+
+Runs fixture_http.SCENARIOS once per installed backend (html.parser, lxml, html5lib by
+default) and compares each result with html.parser's. Exits non-zero on any difference.
+"""
+import difflib
+import json
+import logging
+import sys
+
+from fixture_http import SCENARIOS, build_scrapers, load_backup, reset_caches
+
+REFERENCE_PARSER = 'html.parser'
+DEFAULT_PARSERS = ('html.parser', 'lxml', 'html5lib')
+
+
+def run_scenarios(backup, html_parser):
+    reset_caches(backup)
+    scrapers = build_scrapers(backup, html_parser=html_parser)
+    results = []
+    for scraper_name, method, args in SCENARIOS:
+        result = getattr(scrapers[scraper_name], method)(*args)
+        results.append((f"{scraper_name}.{method}{args}", json.dumps(result, indent=1, sort_keys=True, ensure_ascii=False)))
+    return results
+
+
+def main(parsers):
+    backup = load_backup()
+    logging.disable(logging.CRITICAL)
+    installed = [name for name in parsers if backup.builder_registry.lookup(name)]
+    skipped = [name for name in parsers if name not in installed]
+    if skipped:
+        print(f"skipping parsers that are not installed: {', '.join(skipped)}")
+
+    reference = run_scenarios(backup, REFERENCE_PARSER)
+    failures = 0
+    for parser in installed:
+        if parser == REFERENCE_PARSER:
+            continue
+        for (label, expected), (_, actual) in zip(reference, run_scenarios(backup, parser)):
+            if expected == actual:
+                continue
+            failures += 1
+            print(f"MISMATCH {parser}: {label}")
+            sys.stdout.writelines(difflib.unified_diff(
+                expected.splitlines(keepends=True), actual.splitlines(keepends=True),
+                REFERENCE_PARSER, parser, n=2
+            ))
+        print(f"{parser}: {len(reference)} scenarios compared against {REFERENCE_PARSER}")
+
+    if failures:
+        print(f"{failures} scenario(s) differ")
+        return 1
+    print("all backends agree")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:] or DEFAULT_PARSERS))
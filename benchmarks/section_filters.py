@@ -0,0 +1,83 @@
+"""Measure what the per-extractor section filters save on the saved fixture pages.
+
+Usage: python benchmarks/section_filters.py [--parser lxml] [--repeat 30]
+
+For each extractor that declares sections, parses its fixture page once as a full document
+and once limited to those sections, reporting median parse time, peak traced memory and the
+number of Tag objects built.
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from fixture_http import fixture, load_backup
+
+# (extractor, fixture page, name of the SectionStrainer in backup.py)
+FILTERED_PAGES = (
+    ('parse_episode_page', 'winbu_episode.html', 'EPISODE_PAGE_SECTIONS'),
+    ('parse_genre_content', 'winbu_genre.html', 'GENRE_CONTENT_SECTIONS'),
+    ('parse_chapter_images', 'komikindo_chapter.html', 'CHAPTER_PAGE_SECTIONS'),
+    ('resolve_krakenfiles_url', 'host_krakenfiles.html', 'HOSTER_PAGE_SECTIONS'),
+    ('resolve_filemoon_url', 'host_filemoon.html', 'HOSTER_PAGE_SECTIONS'),
+)
+
+
+def measure_parse(backup, markup, parser, sections, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backup.make_soup(markup, parser, sections)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    soup = backup.make_soup(markup, parser, sections)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'peak_kib': round(peak / 1024, 1),
+        'tags': len(soup.find_all(True))
+    }
+
+
+def measure(parser, repeat):
+    backup = load_backup()
+    parser = backup.resolve_html_parser(parser)
+    results = []
+    for extractor, page, strainer_name in FILTERED_PAGES:
+        markup = backup.PageMarkup(fixture(page), 'UTF-8')
+        full = measure_parse(backup, markup, parser, None, repeat)
+        filtered = measure_parse(backup, markup, parser, getattr(backup, strainer_name), repeat)
+        results.append({
+            'extractor': extractor,
+            'fixture': page,
+            'bytes': len(markup),
+            'full': full,
+            'sections': filtered,
+            'time_saved_pct': round(100 * (1 - filtered['median_ms'] / full['median_ms']), 1),
+            'memory_saved_pct': round(100 * (1 - filtered['peak_kib'] / full['peak_kib']), 1)
+        })
+    return parser, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--parser', default='auto')
+    arg_parser.add_argument('--repeat', type=int, default=30)
+    args = arg_parser.parse_args()
+
+    parser, results = measure(args.parser, args.repeat)
+    print(f"parser: {parser}, {args.repeat} runs per page")
+    print(f"{'extractor':<26}{'full ms':>9}{'sect ms':>9}{'saved':>8}{'full KiB':>10}{'sect KiB':>10}{'saved':>8}{'tags':>12}")
+    for row in results:
+        full, filtered = row['full'], row['sections']
+        print(
+            f"{row['extractor']:<26}{full['median_ms']:>9}{filtered['median_ms']:>9}{row['time_saved_pct']:>7}%"
+            f"{full['peak_kib']:>10}{filtered['peak_kib']:>10}{row['memory_saved_pct']:>7}%"
+            f"{full['tags']:>6}->{filtered['tags']:<5}"
+        )
+
+
+if __name__ == '__main__':
+    main()
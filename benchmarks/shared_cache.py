@@ -0,0 +1,128 @@
+"""Compare the per-process ResponseCache with the SQLite SharedCache across worker processes.
+
+Usage: python benchmarks/shared_cache.py [--workers 4] [--requests 400] [--keys 40]
+                                         [--upstream-ms 50] [--payload-kib 20] [--output report.json]
+
+Each worker process plays one gunicorn worker. It calls get_or_compute on random keys, and
+every compute sleeps --upstream-ms to stand in for a page fetch and parse. The report shows
+how many computes (upstream fetches) each backend needed, the hit rate, and call latency.
+A second phase starts every worker on the same cold key at once to check that the shared
+cache computes it only once.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from fixture_http import load_backup
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def make_cache(backup, backend, path):
+    if backend == 'shared':
+        return backup.SharedCache(path, 'bench')
+    return backup.ResponseCache()
+
+
+def worker(backend, path, seed, requests_per_worker, keys, upstream_ms, payload, start_at, barrier, results):
+    backup = load_backup()
+    cache = make_cache(backup, backend, path)
+    rng = random.Random(seed)
+    computes = 0
+
+    def compute():
+        nonlocal computes
+        computes += 1
+        time.sleep(upstream_ms / 1000)
+        return payload
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+
+    latencies = []
+    for _ in range(requests_per_worker):
+        key = ('bench', rng.randrange(keys))
+        start = time.perf_counter()
+        cache.get_or_compute(key, compute, ttl=300)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    # Stampede: every worker asks for the same cold key at the same moment
+    barrier.wait()
+    before = computes
+    cache.get_or_compute(('stampede',), compute, ttl=300)
+    results.put({'computes': computes, 'stampede_computes': computes - before, 'latencies': latencies})
+
+
+def run(backend, workers, requests_per_worker, keys, upstream_ms, payload):
+    path = os.path.join(tempfile.mkdtemp(prefix='shared-cache-bench-'), 'cache.sqlite')
+    if backend == 'shared':
+        make_cache(load_backup(), backend, path)  # create the schema before the workers race for it
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    barrier = context.Barrier(workers)
+    start_at = time.time() + 1.0
+    processes = [
+        context.Process(target=worker, args=(backend, path, seed, requests_per_worker, keys, upstream_ms, payload, start_at, barrier, results))
+        for seed in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = [value for result in collected for value in result['latencies']]
+    total_requests = workers * requests_per_worker
+    computes = sum(result['computes'] - result['stampede_computes'] for result in collected)
+    hits = [value for value in latencies if value < upstream_ms * 0.5]
+    return {
+        'backend': backend,
+        'requests': total_requests,
+        'upstream_computes': computes,
+        'hit_rate': round(1 - computes / total_requests, 3),
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'hit_p50_ms': round(statistics.median(hits), 3) if hits else None,
+        'stampede_computes': sum(result['stampede_computes'] for result in collected)
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--workers', type=int, default=4)
+    arg_parser.add_argument('--requests', type=int, default=400, help="get_or_compute calls per worker")
+    arg_parser.add_argument('--keys', type=int, default=40, help="distinct cache keys")
+    arg_parser.add_argument('--upstream-ms', type=float, default=50, help="cost of one compute")
+    arg_parser.add_argument('--payload-kib', type=int, default=20, help="approximate cached value size")
+    arg_parser.add_argument('--output', help="write the JSON report to this file")
+    args = arg_parser.parse_args()
+
+    payload = {'items': [{'title': f'Judul {index}', 'url': f'https://winbu.tv/anime/judul-{index}/'} for index in range(args.payload_kib * 16)]}
+    load_backup()
+    logging.disable(logging.CRITICAL)
+
+    report = {'workers': args.workers, 'keys': args.keys, 'upstream_ms': args.upstream_ms, 'payload_bytes': len(json.dumps(payload)), 'results': []}
+    print(f"{args.workers} workers x {args.requests} calls over {args.keys} keys, {args.upstream_ms:g} ms per compute, "
+          f"{report['payload_bytes'] // 1024} KiB values")
+    print(f"{'backend':<10}{'computes':>10}{'hit rate':>10}{'p50 ms':>10}{'p99 ms':>10}{'hit p50 ms':>12}{'stampede':>10}")
+    for backend in ('process', 'shared'):
+        result = run(backend, args.workers, args.requests, args.keys, args.upstream_ms, payload)
+        report['results'].append(result)
+        print(f"{backend:<10}{result['upstream_computes']:>10}{result['hit_rate']:>10}{result['p50_ms']:>10}"
+              f"{result['p99_ms']:>10}{str(result['hit_p50_ms']):>12}{result['stampede_computes']:>10}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
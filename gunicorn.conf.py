@@ -0,0 +1,57 @@
+"""Production server settings for the scraper API.
+
+    gunicorn -c gunicorn.conf.py
+
+Pre-forks WEB_CONCURRENCY worker processes. Each worker runs GUNICORN_THREADS request threads
+(gthread), which suits this I/O-bound API: a request mostly waits on winbu.tv, komikindo.ch
+and the file hosts. Set GUNICORN_WORKER_CLASS=aiohttp.GunicornWebWorker to serve the
+asyncio app (create_async_app) instead of the Flask app.
+
+Graceful reload: `kill -HUP <master pid>` starts new workers with the current code, then
+stops the old ones after their in-flight requests finish (up to GUNICORN_GRACEFUL_TIMEOUT).
+The app is loaded in each worker, not preloaded in the master, so a reload picks up code changes.
+
+Listing and stream-resolution caches are shared by all workers via SHARED_CACHE_PATH
+(a SQLite file in WAL mode). Page documents, metrics and circuit breakers stay per worker.
+One worker runs the cache warmer for the shared cache, elected with an flock on
+`<SHARED_CACHE_PATH>.warmer.lock`.
+"""
+import multiprocessing
+import os
+import secrets
+import tempfile
+
+here = os.path.dirname(os.path.abspath(__file__))
+# The scraper is shipped as backup.py and deployed renamed to app.py
+app_module = os.environ.get('APP_MODULE') or ('app' if os.path.exists(os.path.join(here, 'app.py')) else 'backup')
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if 'aiohttp' in worker_class:
+    wsgi_app = f'{app_module}:create_async_app()'
+else:
+    wsgi_app = f'{app_module}:create_app()'
+
+chdir = here
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', 5000)}")
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# /episode-streams can take EPISODE_RESOLVE_DEADLINE (12 s) plus get_page retries; leave headroom
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Worker recycling is off by default: a restarted worker drops its keep-alive client
+# connections and starts with empty caches. Set GUNICORN_MAX_REQUESTS to cap a slow leak.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+preload_app = False
+
+# Workers share one result cache file unless SHARED_CACHE_PATH says otherwise ('' turns it off)
+os.environ.setdefault('SHARED_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'aniwantv-shared-cache.sqlite'))
+# /resolve tokens must verify in whichever worker gets the request; the master's secret survives reloads
+os.environ.setdefault('RESOLVE_TOKEN_SECRET', secrets.token_hex(32))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')